@@ -0,0 +1,410 @@
+"""
+Albion Scanner - Batch Session Analysis
+Analyze a whole directory of captured sessions in parallel: every file is
+reduced to a mergeable partial aggregate in a worker process, the partials
+are merged into one result, and per-file results are cached so unchanged
+files are skipped on the next run
+"""
+
+import os
+import sys
+import time
+import pickle
+import argparse
+from pathlib import Path
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from albion_stream_analysis import CaptureStreamReader
+from albion_columnar_capture import ColumnarCapture
+from albion_stream_stats import StreamStatistics
+
+# Bump when SessionAggregate changes so stale cache entries are ignored
+AGGREGATE_VERSION = 2
+
+DEFAULT_PATTERNS = (
+    'albion_analysis_*.json',
+    'albion_world_state_*.json',
+    'albion_packets_*.jsonl',
+    'albion_packets_*.acap',
+    'albion_header_stats_*.json',
+)
+
+# One parser session writes a packet log plus analysis/header-stats
+# summaries with the same timestamp suffix; the summaries repeat what the
+# log contains, so they only count for sessions without a packet log
+PACKET_LOG_PREFIX = 'albion_packets_'
+SUMMARY_PREFIXES = ('albion_analysis_', 'albion_header_stats_')
+
+# Position grid geometry (world units), shared by every partial
+GRID_CELL_SIZE = 50.0
+GRID_MIN = -5000.0
+GRID_CELLS = int((5000.0 - GRID_MIN) / GRID_CELL_SIZE)
+
+
+class SessionAggregate:
+    """Mergeable per-file (or merged) analysis result"""
+
+    def __init__(self):
+        self.files = 0
+        self.packets = 0
+        self.headers = Counter()
+        self.sizes = Counter()
+        self.directions = Counter()
+        self.names = Counter()
+        self.entities = set()
+        self.mobs = set()
+        self.positions = 0
+        self.positions_outside = 0
+        # Sparse position grid: flat cell index -> count
+        self.cells = Counter()
+        # Merged header sketches saved by long captures (albion_header_stats_*)
+        self.header_stats = None
+        self.errors = []
+
+    def add_positions(self, xs, ys):
+        """Bin world positions into the shared grid"""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        if not xs.size:
+            return
+        cols = np.floor((xs - GRID_MIN) / GRID_CELL_SIZE).astype(np.int64)
+        rows = np.floor((ys - GRID_MIN) / GRID_CELL_SIZE).astype(np.int64)
+        inside = (cols >= 0) & (cols < GRID_CELLS) & (rows >= 0) & (rows < GRID_CELLS)
+
+        cells, counts = np.unique(rows[inside] * GRID_CELLS + cols[inside], return_counts=True)
+        self.cells.update(dict(zip(cells.tolist(), counts.tolist())))
+        self.positions += int(xs.size)
+        self.positions_outside += int(xs.size - inside.sum())
+
+    def merge(self, other):
+        """Fold another partial into this one"""
+        self.files += other.files
+        self.packets += other.packets
+        self.headers.update(other.headers)
+        self.sizes.update(other.sizes)
+        self.directions.update(other.directions)
+        self.names.update(other.names)
+        self.entities |= other.entities
+        self.mobs |= other.mobs
+        self.positions += other.positions
+        self.positions_outside += other.positions_outside
+        self.cells.update(other.cells)
+        if other.header_stats is not None:
+            if self.header_stats is None:
+                # Never merge into another partial's object, it may be cached
+                self.header_stats = StreamStatistics(**other.header_stats.params)
+            self.header_stats.merge(other.header_stats)
+        self.errors.extend(other.errors)
+        return self
+
+    def position_grid(self):
+        """Dense (rows, cols) count grid of all binned positions"""
+        grid = np.zeros(GRID_CELLS * GRID_CELLS, dtype=np.int64)
+        if self.cells:
+            grid[np.fromiter(self.cells.keys(), dtype=np.int64)] = list(self.cells.values())
+        return grid.reshape(GRID_CELLS, GRID_CELLS)
+
+    def report(self):
+        """Print the merged session summary"""
+        print(f"\n📚 BATCH SESSION ANALYSIS")
+        print("=" * 50)
+        print(f"📁 Files: {self.files}")
+        print(f"📦 Packets: {self.packets}")
+        print(f"👥 Entities seen: {len(self.entities)} players, {len(self.mobs)} mobs")
+
+        if self.headers:
+            total = sum(self.headers.values())
+            print(f"\n📋 Most common headers:")
+            for header, count in self.headers.most_common(10):
+                print(f"   {header}: {count} packets ({count / total * 100:.1f}%)")
+
+        if self.header_stats is not None and self.header_stats.packets:
+            print(f"\n📈 Sketched headers ({self.header_stats.packets} packets):")
+            for item in self.header_stats.top('header', 10):
+                print(f"   {item['key']}: ~{item['count']} packets ({item['share'] * 100:.1f}%)")
+
+        if self.sizes:
+            sizes = np.fromiter(self.sizes.keys(), dtype=np.float64)
+            counts = np.fromiter(self.sizes.values(), dtype=np.float64)
+            print(f"\n📏 Payload sizes: {int(sizes.min())}-{int(sizes.max())} bytes, "
+                  f"average {np.average(sizes, weights=counts):.1f}")
+
+        if self.directions:
+            print(f"\n📡 Traffic direction:")
+            total = sum(self.directions.values())
+            for direction, count in self.directions.most_common():
+                print(f"   {direction}: {count} packets ({count / total * 100:.1f}%)")
+
+        if self.names:
+            print(f"\n🏆 Most frequent names ({len(self.names)} unique):")
+            for name, count in self.names.most_common(10):
+                print(f"   {name}: {count} times")
+
+        if self.positions:
+            print(f"\n🎯 Positions: {self.positions} ({self.positions_outside} outside grid)")
+            print(f"🔥 Busiest areas:")
+            for cell, count in self.cells.most_common(5):
+                row, col = divmod(cell, GRID_CELLS)
+                x = GRID_MIN + (col + 0.5) * GRID_CELL_SIZE
+                y = GRID_MIN + (row + 0.5) * GRID_CELL_SIZE
+                print(f"   ({x:.0f}, {y:.0f}): {count} positions")
+
+        if self.errors:
+            print(f"\n⚠️ {len(self.errors)} files failed:")
+            for filename, error in self.errors[:10]:
+                print(f"   {filename}: {error}")
+
+
+# ----------------------------------------------------------------------
+# Map step: one file -> one partial aggregate
+# ----------------------------------------------------------------------
+
+def aggregate_packet(aggregate, packet, xs, ys):
+    """Add one packet dict (parser/JSONL format) to a partial"""
+    aggregate.packets += 1
+    aggregate.headers[packet.get('analysis', {}).get('header', '')] += 1
+    aggregate.sizes[packet.get('payload_length', 0)] += 1
+    aggregate.directions[packet.get('direction', 'unknown')] += 1
+
+    parsed = packet.get('parsed_data', {})
+    for pos in parsed.get('positions', ()):
+        xs.append(pos['x'])
+        ys.append(pos['y'])
+        if pos.get('player_id'):
+            aggregate.entities.add(pos['player_id'])
+    aggregate.names.update(parsed.get('names', ()))
+
+
+def aggregate_metadata(aggregate, metadata, xs, ys):
+    """Add the summary sections of analysis / world state exports"""
+    # albion_analysis_*.json (AlbionPacketParser.save_analysis_to_file)
+    if not aggregate.packets:
+        aggregate.packets = metadata.get('total_packets', 0)
+        aggregate.headers.update(metadata.get('packet_patterns', {}))
+    parsed = metadata.get('parsed_data', {})
+    for pos in parsed.get('positions', ()):
+        xs.append(pos['x'])
+        ys.append(pos['y'])
+    aggregate.names.update(parsed.get('names', ()))
+
+    # albion_header_stats_*.json (StreamStatistics.save)
+    if 'trackers' in metadata and 'params' in metadata:
+        aggregate.header_stats = StreamStatistics.from_state(metadata)
+        return
+
+    # albion_world_state_*.json (AlbionProtocolDecoder.export_world_data)
+    for player in (metadata.get('players') or {}).values():
+        aggregate.entities.add(player.get('id'))
+        if player.get('name'):
+            aggregate.names[player['name']] += 1
+        if player.get('position'):
+            xs.append(player['position'].get('x', 0.0))
+            ys.append(player['position'].get('y', 0.0))
+    for mob in (metadata.get('mobs') or {}).values():
+        aggregate.mobs.add(mob.get('id'))
+        if mob.get('position'):
+            xs.append(mob['position'].get('x', 0.0))
+            ys.append(mob['position'].get('y', 0.0))
+
+
+def aggregate_columnar(aggregate, path):
+    """Add a columnar capture using its memory-mapped columns"""
+    capture = ColumnarCapture(path)
+    aggregate.packets += len(capture)
+
+    headers, counts = np.unique(capture.header, return_counts=True)
+    aggregate.headers.update({capture.header_hex(h): int(c) for h, c in zip(headers, counts)})
+    sizes, counts = np.unique(capture.length, return_counts=True)
+    aggregate.sizes.update(dict(zip(sizes.tolist(), counts.tolist())))
+    counts = np.bincount(capture.direction, minlength=len(capture.directions))
+    aggregate.directions.update({d: int(c) for d, c in zip(capture.directions, counts) if c})
+
+    aggregate.names.update(capture.iter_names())
+    entities = np.unique(capture.position_entities())
+    aggregate.entities.update(entities[entities != 0].tolist())
+    aggregate.add_positions(capture.pos_x, capture.pos_y)
+
+
+def analyze_file(path):
+    """Map step: reduce one session file to a SessionAggregate"""
+    aggregate = SessionAggregate()
+    aggregate.files = 1
+    try:
+        if os.path.isdir(path):
+            aggregate_columnar(aggregate, path)
+        else:
+            xs, ys = [], []
+            reader = CaptureStreamReader(path)
+            for packet in reader:
+                aggregate_packet(aggregate, packet, xs, ys)
+            aggregate_metadata(aggregate, reader.metadata, xs, ys)
+            aggregate.add_positions(xs, ys)
+    except Exception as e:
+        aggregate.errors.append((os.path.basename(path), str(e)))
+    return aggregate
+
+
+# ----------------------------------------------------------------------
+# Per-file result cache
+# ----------------------------------------------------------------------
+
+def file_signature(path):
+    """(mtime_ns, size) identifying the current version of a file or capture dir"""
+    if os.path.isdir(path):
+        stats = [os.stat(os.path.join(path, name)) for name in sorted(os.listdir(path))]
+        return (max((s.st_mtime_ns for s in stats), default=0), sum(s.st_size for s in stats))
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class BatchResultCache:
+    """Pickled map of absolute path -> (signature, partial aggregate)"""
+
+    def __init__(self, cache_file='albion_batch_cache.pkl'):
+        self.cache_file = cache_file
+        self.entries = {}
+        self.dirty = False
+        self.load()
+
+    def load(self):
+        if not self.cache_file or not os.path.exists(self.cache_file):
+            return
+        try:
+            with open(self.cache_file, 'rb') as f:
+                data = pickle.load(f)
+            if data.get('version') == AGGREGATE_VERSION:
+                self.entries = data['entries']
+        except Exception as e:
+            print(f"⚠️ Ignoring unreadable batch cache: {e}")
+
+    def get(self, path, signature):
+        entry = self.entries.get(path)
+        if entry and entry[0] == signature:
+            return entry[1]
+        return None
+
+    def put(self, path, signature, aggregate):
+        # Failed files are retried next time instead of being cached
+        if not aggregate.errors:
+            self.entries[path] = (signature, aggregate)
+            self.dirty = True
+
+    def save(self):
+        if not self.cache_file or not self.dirty:
+            return
+        temp_file = self.cache_file + '.tmp'
+        with open(temp_file, 'wb') as f:
+            pickle.dump({'version': AGGREGATE_VERSION, 'entries': self.entries}, f,
+                        protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_file, self.cache_file)
+        self.dirty = False
+
+
+# ----------------------------------------------------------------------
+# Driver
+# ----------------------------------------------------------------------
+
+def find_session_files(directory, patterns=DEFAULT_PATTERNS):
+    """Session files in a directory, sorted by name"""
+    found = set()
+    for pattern in patterns:
+        found.update(Path(directory).glob(pattern))
+    return sorted(str(path.resolve()) for path in found)
+
+
+def session_of(path, prefix):
+    """Session timestamp of a file named <prefix><timestamp>.<ext>, or None"""
+    name = os.path.basename(path)
+    if not name.startswith(prefix):
+        return None
+    return name[len(prefix):].split('.', 1)[0]
+
+
+def skip_duplicate_summaries(files):
+    """Split files into (to analyze, skipped summaries of sessions with a packet log)"""
+    logged = {session_of(path, PACKET_LOG_PREFIX) for path in files} - {None}
+    kept, skipped = [], []
+    for path in files:
+        if any(session_of(path, prefix) in logged for prefix in SUMMARY_PREFIXES):
+            skipped.append(path)
+        else:
+            kept.append(path)
+    return kept, skipped
+
+
+def run_batch_analysis(directory='.', workers=None, patterns=DEFAULT_PATTERNS,
+                       cache_file='albion_batch_cache.pkl'):
+    """Analyze every session file in a directory; returns (aggregate, run stats)"""
+    files, skipped = skip_duplicate_summaries(find_session_files(directory, patterns))
+    cache = BatchResultCache(cache_file)
+    total = SessionAggregate()
+    stats = {'files': len(files), 'skipped': len(skipped), 'cached': 0, 'analyzed': 0,
+             'failed': 0, 'seconds': 0.0}
+    start = time.time()
+
+    pending = {}
+    for path in files:
+        signature = file_signature(path)
+        cached = cache.get(path, signature)
+        if cached is not None:
+            total.merge(cached)
+            stats['cached'] += 1
+        else:
+            pending[path] = signature
+
+    if pending:
+        workers = workers or os.cpu_count() or 1
+        print(f"⚙️ Analyzing {len(pending)} files with {workers} workers "
+              f"({stats['cached']} cached)...")
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(analyze_file, path): path for path in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                path = futures[future]
+                partial = future.result()
+                cache.put(path, pending[path], partial)
+                total.merge(partial)
+                stats['analyzed'] += 1
+                stats['failed'] += bool(partial.errors)
+                if done % 50 == 0:
+                    print(f"   ... {done}/{len(pending)} files")
+
+    cache.save()
+    stats['seconds'] = time.time() - start
+    return total, stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Parallel analysis of captured Albion sessions')
+    parser.add_argument('directory', nargs='?', default='.')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Worker processes (default: CPU count)')
+    parser.add_argument('--cache-file', default='albion_batch_cache.pkl')
+    parser.add_argument('--no-cache', action='store_true', help='Ignore and do not write the cache')
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.directory):
+        print(f"❌ Not a directory: {args.directory}")
+        sys.exit(1)
+
+    total, stats = run_batch_analysis(
+        args.directory,
+        workers=args.workers,
+        cache_file=None if args.no_cache else args.cache_file
+    )
+    if not stats['files']:
+        print("❌ No Albion session files found")
+        return
+
+    total.report()
+    print(f"\n⏱️ {stats['files']} files in {stats['seconds']:.1f}s "
+          f"({stats['analyzed']} analyzed, {stats['cached']} from cache, {stats['failed']} failed)")
+    if stats['skipped']:
+        print(f"   {stats['skipped']} analysis/header stats files skipped, "
+              f"their sessions are counted from the packet log")
+
+
+if __name__ == '__main__':
+    main()
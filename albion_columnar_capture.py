@@ -0,0 +1,268 @@
+"""
+Albion Scanner - Columnar Capture Format
+Compact on-disk capture layout for offline analysis: fixed-width per-packet
+columns, one contiguous payload blob with an offsets array, and extracted
+positions as float32 columns. Every column is a raw little-endian array that
+is memory-mapped on load, so analyses run as vectorized NumPy operations.
+
+Layout of a capture directory (<name>.acap/):
+    meta.json            column dtypes, row counts, capture info (written last)
+    timestamp.bin        float64[n]   unix time
+    direction.bin        uint8[n]     index into DIRECTIONS
+    length.bin           uint32[n]    payload length
+    header.bin           uint32[n]    first 4 payload bytes, big endian
+    payload_offsets.bin  uint64[n+1]  payload i = payload.bin[off[i]:off[i+1]]
+    payload.bin          uint8[...]
+    pos_packet.bin       uint32[m]    packet row of each position
+    pos_offset.bin       uint16[m]    byte offset of the position in the payload
+    pos_x/pos_y/pos_z.bin float32[m]
+    name_packet.bin      uint32[k]    packet row of each name
+    name_offsets.bin     uint64[k+1]  utf-8 name i = names.bin[off[i]:off[i+1]]
+    names.bin            uint8[...]
+"""
+
+import os
+import json
+from datetime import datetime
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+DIRECTIONS = ('incoming', 'outgoing', 'unknown')
+DIRECTION_CODES = {name: code for code, name in enumerate(DIRECTIONS)}
+
+COLUMNS = {
+    'timestamp': '<f8',
+    'direction': 'u1',
+    'length': '<u4',
+    'header': '<u4',
+    'payload_offsets': '<u8',
+    'payload': 'u1',
+    'pos_packet': '<u4',
+    'pos_offset': '<u2',
+    'pos_x': '<f4',
+    'pos_y': '<f4',
+    'pos_z': '<f4',
+    'name_packet': '<u4',
+    'name_offsets': '<u8',
+    'names': 'u1',
+}
+
+
+def parse_timestamp(value):
+    """Unix time from a float or an ISO timestamp string (NaN if unknown)"""
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return float('nan')
+
+
+class ColumnarCaptureWriter:
+    """Append packets to a columnar capture, flushing columns in batches"""
+
+    def __init__(self, path, flush_every=4096, capture_info=None):
+        self.path = path
+        self.flush_every = flush_every
+        self.capture_info = capture_info or {}
+        os.makedirs(path, exist_ok=True)
+
+        # Start from empty column files
+        for column in COLUMNS:
+            open(self.column_path(column), 'wb').close()
+
+        self.packet_count = 0
+        self.position_count = 0
+        self.name_count = 0
+        self.payload_size = 0
+        self.names_size = 0
+        self.closed = False
+
+        self.reset_buffers()
+        # The offsets arrays carry one leading 0 entry
+        self.buffers['payload_offsets'].append(0)
+        self.buffers['name_offsets'].append(0)
+
+    def column_path(self, column):
+        return os.path.join(self.path, f'{column}.bin')
+
+    def reset_buffers(self):
+        self.buffers = {column: [] for column in COLUMNS if column not in ('payload', 'names')}
+        self.payload_buffer = bytearray()
+        self.names_buffer = bytearray()
+        self.buffered = 0
+
+    def append(self, timestamp, direction, payload, positions=(), names=()):
+        """Add one packet with its extracted positions and names"""
+        buffers = self.buffers
+        row = self.packet_count
+
+        buffers['timestamp'].append(parse_timestamp(timestamp))
+        buffers['direction'].append(DIRECTION_CODES.get(direction, DIRECTION_CODES['unknown']))
+        buffers['length'].append(len(payload))
+        buffers['header'].append(int.from_bytes(payload[:4].ljust(4, b'\x00'), 'big'))
+        self.payload_buffer += payload
+        self.payload_size += len(payload)
+        buffers['payload_offsets'].append(self.payload_size)
+
+        for pos in positions:
+            buffers['pos_packet'].append(row)
+            buffers['pos_offset'].append(pos.get('offset', 0))
+            buffers['pos_x'].append(pos['x'])
+            buffers['pos_y'].append(pos['y'])
+            buffers['pos_z'].append(pos['z'])
+            self.position_count += 1
+
+        for name in names:
+            encoded = name.encode('utf-8')
+            buffers['name_packet'].append(row)
+            self.names_buffer += encoded
+            self.names_size += len(encoded)
+            buffers['name_offsets'].append(self.names_size)
+            self.name_count += 1
+
+        self.packet_count += 1
+        self.buffered += 1
+        if self.buffered >= self.flush_every:
+            self.flush()
+
+    def append_parsed(self, parsed, payload=None):
+        """Add a packet dict as produced by AlbionPacketParser.parse_packet"""
+        if payload is None:
+            payload = bytes.fromhex(parsed.get('payload_hex', ''))
+        parsed_data = parsed.get('parsed_data', {})
+        self.append(
+            parsed.get('timestamp'),
+            parsed.get('direction', 'unknown'),
+            payload,
+            parsed_data.get('positions', ()),
+            parsed_data.get('names', ())
+        )
+
+    def flush(self):
+        """Append buffered rows to the column files"""
+        for column, values in self.buffers.items():
+            if values:
+                with open(self.column_path(column), 'ab') as f:
+                    np.asarray(values, dtype=COLUMNS[column]).tofile(f)
+        for column, data in (('payload', self.payload_buffer), ('names', self.names_buffer)):
+            if data:
+                with open(self.column_path(column), 'ab') as f:
+                    f.write(data)
+        self.reset_buffers()
+
+    def close(self):
+        """Flush remaining rows and write meta.json, completing the capture"""
+        if self.closed:
+            return
+        self.flush()
+        meta = {
+            'format': 'albion-columnar-capture',
+            'version': FORMAT_VERSION,
+            'packet_count': self.packet_count,
+            'position_count': self.position_count,
+            'name_count': self.name_count,
+            'directions': list(DIRECTIONS),
+            'columns': COLUMNS,
+            'capture_info': self.capture_info,
+        }
+        with open(os.path.join(self.path, 'meta.json'), 'w') as f:
+            json.dump(meta, f, indent=2)
+        self.closed = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class ColumnarCapture:
+    """Read-only, memory-mapped view of a columnar capture directory"""
+
+    def __init__(self, path):
+        self.path = path
+        meta_path = os.path.join(path, 'meta.json')
+        if not os.path.isfile(meta_path):
+            raise ValueError(f"{path}: not a complete columnar capture (missing meta.json)")
+        with open(meta_path, 'r') as f:
+            self.meta = json.load(f)
+        if self.meta.get('version') != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported capture version {self.meta.get('version')}")
+
+        self.packet_count = self.meta['packet_count']
+        self.position_count = self.meta['position_count']
+        self.name_count = self.meta['name_count']
+        self.directions = tuple(self.meta['directions'])
+
+        for column, dtype in self.meta['columns'].items():
+            setattr(self, column, self.map_column(column, dtype))
+
+    def map_column(self, column, dtype):
+        """Memory-map one column file (empty files map to empty arrays)"""
+        filename = os.path.join(self.path, f'{column}.bin')
+        if os.path.getsize(filename) == 0:
+            return np.empty(0, dtype=dtype)
+        return np.memmap(filename, dtype=dtype, mode='r')
+
+    def __len__(self):
+        return self.packet_count
+
+    def get_payload(self, row):
+        """Raw payload bytes of one packet"""
+        return bytes(self.payload[self.payload_offsets[row]:self.payload_offsets[row + 1]])
+
+    def get_name(self, index):
+        """Decoded player name by name index"""
+        start, end = self.name_offsets[index], self.name_offsets[index + 1]
+        return bytes(self.names[start:end]).decode('utf-8')
+
+    def iter_names(self):
+        for index in range(self.name_count):
+            yield self.get_name(index)
+
+    def positions(self):
+        """(m, 3) float32 array of every extracted position"""
+        return np.column_stack((self.pos_x, self.pos_y, self.pos_z))
+
+    def position_entities(self):
+        """Entity id of each position: the uint32 just before it in the payload"""
+        entities = np.zeros(self.position_count, dtype=np.uint32)
+        offsets = self.pos_offset.astype(np.int64)
+        valid = offsets >= 4
+        if valid.any():
+            starts = self.payload_offsets[self.pos_packet[valid]].astype(np.int64) + offsets[valid] - 4
+            raw = np.asarray(self.payload)[starts[:, None] + np.arange(4)]
+            entities[valid] = np.ascontiguousarray(raw).view('<u4').ravel()
+        return entities
+    
+    @staticmethod
+    def header_hex(header):
+        """Header code as the hex string used by the JSON formats"""
+        return f'{int(header):08x}'
+
+
+def convert_to_columnar(source, destination=None, flush_every=4096):
+    """Convert a JSON/JSON Lines capture with payload_hex into a columnar capture"""
+    from albion_stream_analysis import CaptureStreamReader
+
+    if destination is None:
+        destination = os.path.splitext(source)[0] + '.acap'
+
+    reader = CaptureStreamReader(source)
+    skipped = 0
+    with ColumnarCaptureWriter(destination, flush_every=flush_every) as writer:
+        for packet in reader:
+            if 'payload_hex' not in packet:
+                skipped += 1
+                continue
+            writer.append_parsed(packet)
+        writer.capture_info = {key: value for key, value in reader.metadata.items()
+                               if key != 'packets'}
+        writer.capture_info['source'] = os.path.basename(source)
+
+    if skipped:
+        print(f"⚠️ Skipped {skipped} packets without payload_hex")
+    return destination
@@ -0,0 +1,198 @@
+"""
+Albion Scanner - Console Renderer
+Per-packet console output without a blocking write per packet: 'lines' mode
+prints every event as before, 'panel' mode aggregates events and redraws a
+fixed status panel (rates, top talkers, recent events) at a configurable
+refresh rate with a single write, 'quiet' mode only keeps the counters (for
+headless runs that report them as metrics). Every mode can also append each
+event line to a log file from a background writer thread
+"""
+
+import os
+import sys
+import time
+import threading
+from collections import Counter, deque
+from albion_stream_stats import SpaceSaving
+
+CONSOLE_MODES = ('lines', 'panel', 'quiet')
+CLEAR_SCREEN = '\x1b[H\x1b[J'  # cursor home + clear to end
+
+
+class EventLog:
+    """Append-only text log written by a background thread"""
+
+    def __init__(self, filename, max_pending=100000, flush_interval=1.0):
+        self.filename = filename
+        self.max_pending = max_pending
+        self.flush_interval = flush_interval
+        self.pending = deque()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.stats = {'written': 0, 'dropped': 0}
+        self.file = open(filename, 'a', encoding='utf-8')
+        self.thread = threading.Thread(target=self.run, name='event-log', daemon=True)
+        self.thread.start()
+
+    def write(self, line):
+        """Queue a line (never blocks; drops when max_pending lines are waiting)"""
+        if len(self.pending) >= self.max_pending:
+            self.stats['dropped'] += 1
+            return
+        self.pending.append(line)
+
+    def run(self):
+        while True:
+            with self.condition:
+                self.condition.wait(self.flush_interval)
+                closed = self.closed
+            lines = []
+            for _ in range(len(self.pending)):
+                lines.append(self.pending.popleft())
+            if lines:
+                self.file.write('\n'.join(lines) + '\n')
+                self.file.flush()
+                self.stats['written'] += len(lines)
+            if closed:
+                break
+
+    def close(self):
+        """Write what is queued and close the file"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+        self.thread.join()
+        self.file.close()
+
+
+class ConsoleRenderer:
+    """Event sink for scanner output
+
+    event() is called once per packet with its formatted line, a kind
+    (packet type / pattern) for the counters, an optional talker (endpoint,
+    player or sender) and a size. In panel mode the panel is redrawn at most
+    refresh_rate times per second, from event() or tick().
+    """
+
+    def __init__(self, title, mode='lines', refresh_rate=2.0, top=5, recent=8,
+                 event_log=None, stream=None):
+        if mode not in CONSOLE_MODES:
+            raise ValueError(f"unknown console mode {mode!r}")
+        self.title = title
+        self.mode = mode
+        self.refresh_interval = 1.0 / refresh_rate if refresh_rate > 0 else 0.0
+        self.top = top
+        self.stream = stream or sys.stdout
+        self.log = EventLog(event_log) if event_log else None
+
+        self.started = time.time()
+        self.events = 0
+        self.bytes = 0
+        self.kinds = Counter()
+        self.talkers = SpaceSaving(k=64)  # fixed memory however many players/endpoints
+        self.recent = deque(maxlen=recent)
+        self.info = {}  # extra "label: value" lines set by the owner
+
+        self.last_render = 0.0
+        self.last_events = 0
+        self.rate = 0.0
+        self.renders = 0
+
+        # Redraw in place on terminals (Windows 10+ consoles understand ANSI
+        # once virtual terminal processing has been switched on)
+        self.ansi = hasattr(self.stream, 'isatty') and self.stream.isatty()
+        if self.ansi and mode == 'panel' and sys.platform.startswith('win'):
+            os.system('')
+
+    def event(self, kind, line, talker=None, size=0):
+        """Record one event (prints it right away in lines mode)"""
+        if self.log is not None:
+            self.log.write(line)
+        if self.mode == 'lines':
+            print(line, file=self.stream)
+            return
+
+        self.events += 1
+        self.bytes += size or 0
+        self.kinds[kind] += 1
+        if talker is not None:
+            self.talkers.add(talker)
+        self.recent.append(line)
+
+        if self.mode == 'panel':
+            now = time.time()
+            if now - self.last_render >= self.refresh_interval:
+                self.render(now)
+
+    def set_info(self, label, value):
+        """Show an extra status line on the panel"""
+        self.info[label] = value
+
+    def tick(self):
+        """Redraw if due (for callers with a periodic hook and idle periods)"""
+        if self.mode == 'panel':
+            now = time.time()
+            if now - self.last_render >= self.refresh_interval:
+                self.render(now)
+
+    def render(self, now=None):
+        """Redraw the status panel with one write"""
+        now = now or time.time()
+        interval = now - self.last_render if self.last_render else now - self.started
+        if interval > 0:
+            self.rate = (self.events - self.last_events) / interval
+        self.last_render = now
+        self.last_events = self.events
+        self.renders += 1
+
+        self.stream.write((CLEAR_SCREEN if self.ansi else '\n') + self.format_panel(now))
+        self.stream.flush()
+
+    def format_panel(self, now):
+        elapsed = max(now - self.started, 1e-6)
+        lines = [
+            f"📡 {self.title} | {time.strftime('%H:%M:%S')} | up {elapsed:.0f}s",
+            "=" * 70,
+            f"Events: {self.events} | {self.rate:.1f}/s now | {self.events / elapsed:.1f}/s avg | "
+            f"{self.bytes / 1024:.1f} KB"
+        ]
+        for label, value in self.info.items():
+            lines.append(f"{label}: {value}")
+
+        if self.kinds:
+            lines.append("-" * 70)
+            lines.append(" | ".join(f"{kind}: {count}" for kind, count in self.kinds.most_common()))
+
+        if self.talkers.counters:
+            lines.append("-" * 70)
+            lines.append("Top talkers:")
+            for talker, count, _ in self.talkers.top(self.top):
+                lines.append(f"  {str(talker):<40} {count:>8} ({count / self.events * 100:.1f}%)")
+
+        lines.append("-" * 70)
+        lines.append("Recent events:")
+        lines.extend(f"  {line}" for line in self.recent)
+        return '\n'.join(lines) + '\n'
+
+    def get_stats(self, top=None):
+        """Event counters as plain data (lines mode does not count)"""
+        elapsed = max(time.time() - self.started, 1e-6)
+        return {
+            'mode': self.mode,
+            'events': self.events,
+            'bytes': self.bytes,
+            'events_per_second': self.events / elapsed,
+            'kinds': dict(self.kinds),
+            'top_talkers': [{'talker': str(talker), 'count': count, 'error': error}
+                            for talker, count, error in self.talkers.top(top or self.top)],
+            'event_log': dict(self.log.stats) if self.log is not None else None
+        }
+
+    def close(self):
+        """Final redraw and flush of the event log (later events are no longer logged)"""
+        if self.mode == 'panel' and self.events:
+            self.render()
+        if self.log is not None:
+            log, self.log = self.log, None
+            log.close()
+            print(f"💾 Event log saved to: {log.filename} ({log.stats['written']} lines)", file=self.stream)
@@ -0,0 +1,277 @@
+"""
+Albion Scanner - Headless Daemon
+Unattended service entry point: capture, decoding and the web dashboard run
+in one long-lived process configured from a JSON/YAML file and/or the command
+line, with no interactive menu or subprocesses. Instead of packet lines it
+writes one JSON metrics object per interval (scanner counters, pipeline queue
+depths, decode cache, record pool, dashboard queues) to stdout or a file.
+Human-readable output (banner, warnings, final summary) goes to stderr so
+stdout carries metrics only, and world data files are written only when the
+scanner config opts in (auto_export_interval / export_on_exit)
+"""
+
+import sys
+import contextlib
+import json
+import time
+import signal
+import argparse
+import threading
+from datetime import datetime
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+from albion_protocol_decoder import AdvancedAlbionScanner
+from albion_symbols import symbols
+
+DASHBOARD_MODES = ('async', 'flask')
+
+DEFAULT_CONFIG = {
+    'interface': '5',            # capture interface (USB Tethering)
+    'port': 5056,                # Albion UDP port
+    'spec_file': None,           # extra message specs on top of the defaults
+    'dashboard': True,
+    'dashboard_mode': 'async',   # 'async' (aiohttp) or 'flask' (Flask-SocketIO)
+    'dashboard_host': '0.0.0.0',
+    'dashboard_port': 5000,
+    'packet_queue': 10000,       # async mode: packets buffered for the event loop
+    'metrics_interval': 10.0,    # seconds between metrics lines
+    'metrics_file': None,        # JSON lines are appended here (stdout if unset or '-')
+    'event_log': None,           # optional text log of every decoded packet
+    'scanner': {}                # AdvancedAlbionScanner.config overrides
+}
+
+
+def load_config(filename=None, overrides=None):
+    """DEFAULT_CONFIG updated from a .json/.yaml/.yml file, then from overrides"""
+    config = dict(DEFAULT_CONFIG)
+    config['scanner'] = {}
+    document = {}
+    if filename:
+        with open(filename, 'r', encoding='utf-8') as f:
+            if filename.endswith(('.yaml', '.yml')):
+                if yaml is None:
+                    raise ValueError(f"{filename}: YAML config needs PyYAML (pip install pyyaml)")
+                document = yaml.safe_load(f) or {}
+            else:
+                document = json.load(f)
+        if not isinstance(document, dict):
+            raise ValueError(f"{filename}: config must be a mapping")
+
+    for source in (document, overrides or {}):
+        unknown = set(source) - set(DEFAULT_CONFIG)
+        if unknown:
+            raise ValueError(f"unknown config keys: {', '.join(sorted(unknown))}")
+        for key, value in source.items():
+            if key == 'scanner':
+                config['scanner'].update(value or {})
+            elif value is not None:
+                config[key] = value
+
+    if config['dashboard_mode'] not in DASHBOARD_MODES:
+        raise ValueError(f"dashboard_mode must be one of {', '.join(DASHBOARD_MODES)}")
+    if config['metrics_interval'] <= 0:
+        raise ValueError("metrics_interval must be positive")
+    return config
+
+
+class AlbionDaemon:
+    def __init__(self, config):
+        self.config = config
+        self.scanner = None
+        self.dashboard = None     # DashboardServer fed by the scanner pipeline
+        self.server = None        # AsyncDashboardServer in async mode
+        self.metrics_file = None
+        self.metrics_lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.started = 0
+        self.sequence = 0
+        self.last_report = (0.0, 0)  # (time, total_packets) of the previous line
+
+    def build_scanner(self):
+        """Scanner in quiet console mode with the configured overrides"""
+        scanner = AdvancedAlbionScanner(
+            interface=str(self.config['interface']),
+            port=int(self.config['port']),
+            spec_file=self.config['spec_file'],
+            console='quiet',
+            event_log=self.config['event_log']
+        )
+        overrides = self.config['scanner']
+        unknown = set(overrides) - set(scanner.config)
+        if unknown:
+            raise ValueError(f"unknown scanner config keys: {', '.join(sorted(unknown))}")
+        scanner.config['display_world_state'] = False  # world state is in the metrics
+        scanner.config['auto_export_interval'] = 0      # no unbounded pile of export files
+        scanner.config['export_on_exit'] = False
+        scanner.config.update(overrides)
+        return scanner
+
+    def start_dashboard(self):
+        """Start the web dashboard in-process; returns the pipeline stages feeding it"""
+        if not self.config['dashboard']:
+            return []
+        host, port = self.config['dashboard_host'], int(self.config['dashboard_port'])
+        try:
+            if self.config['dashboard_mode'] == 'async':
+                from dashboard_async_server import AsyncDashboardServer
+                self.server = AsyncDashboardServer(packet_queue_size=self.config['packet_queue'])
+                self.server.start_in_thread(host, port)
+                self.dashboard = self.server.dashboard
+            else:
+                import dashboard_server
+                dashboard_server.start_server_thread(host, port)
+                self.dashboard = dashboard_server.dashboard
+        except ImportError as e:
+            print(f"⚠️ Dashboard disabled, missing package: {e}")
+            return []
+        print(f"🌐 Dashboard ({self.config['dashboard_mode']}) at http://{host}:{port}")
+        return [self.dashboard.attach_scanner(self.scanner)]
+
+    def collect_metrics(self, kind='metrics'):
+        """One metrics record (plain data, safe to read while the pipeline runs)"""
+        now = time.time()
+        scanner = self.scanner
+        stats = dict(scanner.stats)
+        last_time, last_total = self.last_report
+        interval = now - last_time if last_time else now - self.started
+        self.last_report = (now, stats['total_packets'])
+
+        record = {
+            'type': kind,
+            'sequence': self.sequence,
+            'time': datetime.fromtimestamp(now).isoformat(timespec='seconds'),
+            'timestamp': now,
+            'uptime': now - self.started,
+            'interface': str(self.config['interface']),
+            'port': int(self.config['port']),
+            'packets_per_second': (stats['total_packets'] - last_total) / interval if interval > 0 else 0.0,
+            'scanner': stats,
+            'players': len(scanner.decoder.players),
+            'pipeline': scanner.pipeline.get_metrics() if scanner.pipeline else None,
+            'dispatch': scanner.decoder.get_dispatch_stats(5),
+            'decode_cache': scanner.decoder.memo.get_stats(),
+            'record_pool': scanner.decoder.pool.get_stats(),
+            'symbols': symbols.get_stats(),
+            'console': scanner.console.get_stats(),
+            'dashboard': None
+        }
+        if self.server is not None:
+            record['dashboard'] = {
+                **self.server.stats,
+                'packet_queue_depth': self.server.packet_queue.qsize() if self.server.packet_queue else 0,
+                'event_queue_depth': self.server.event_queue.qsize() if self.server.event_queue else 0
+            }
+        elif self.dashboard is not None:
+            record['dashboard'] = {'packet_stats': dict(self.dashboard.packet_stats),
+                                   'packets_per_second': self.dashboard.packets_per_second}
+        self.sequence += 1
+        return record
+
+    def write_metrics(self, kind='metrics'):
+        """Append one JSON line to the metrics output"""
+        line = json.dumps(self.collect_metrics(kind), default=str)
+        with self.metrics_lock:
+            self.metrics_file.write(line + '\n')
+            self.metrics_file.flush()
+
+    def metrics_loop(self):
+        interval = float(self.config['metrics_interval'])
+        while not self.stop_event.wait(interval):
+            try:
+                self.write_metrics()
+            except Exception as e:
+                print(f"❌ Metrics error: {e}")
+
+    def handle_signal(self, signum, frame):
+        """SIGTERM/SIGBREAK: stop like Ctrl+C (capture closed, queues drained)"""
+        raise KeyboardInterrupt
+
+    def install_signal_handlers(self):
+        if threading.current_thread() is not threading.main_thread():
+            return
+        for name in ('SIGTERM', 'SIGBREAK'):
+            if hasattr(signal, name):
+                signal.signal(getattr(signal, name), self.handle_signal)
+
+    def run(self):
+        """Run until the capture ends or the process is asked to stop; everything
+        printed meanwhile goes to stderr, leaving stdout to the metrics lines"""
+        target = self.config['metrics_file']
+        self.metrics_file = open(target, 'a', encoding='utf-8') if target and target != '-' else sys.stdout
+        try:
+            with contextlib.redirect_stdout(sys.stderr):
+                self.run_scanner()
+        finally:
+            if self.metrics_file is not sys.stdout:
+                self.metrics_file.close()
+
+    def run_scanner(self):
+        self.scanner = self.build_scanner()
+        self.started = time.time()
+        self.install_signal_handlers()
+
+        stages = self.start_dashboard()
+        self.write_metrics('start')
+        metrics_thread = threading.Thread(target=self.metrics_loop, name='metrics', daemon=True)
+        metrics_thread.start()
+
+        try:
+            self.scanner.start_scanning(stages=stages)
+        except KeyboardInterrupt:
+            print("\n⏹️ Daemon stopped")
+        finally:
+            self.stop_event.set()
+            metrics_thread.join()
+            if self.dashboard is not None:
+                self.dashboard.is_scanning = False
+            if self.server is not None:
+                self.server.stop_thread()
+            self.write_metrics('final')
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description='Headless Albion scanner: capture, decode, dashboard, JSON metrics')
+    parser.add_argument('--config', help='JSON or YAML config file (command line options override it)')
+    parser.add_argument('--interface', help='capture interface')
+    parser.add_argument('--port', type=int, help='Albion UDP port')
+    parser.add_argument('--spec-file', help='extra message spec file')
+    parser.add_argument('--no-dashboard', dest='dashboard', action='store_false', default=None,
+                        help='capture and metrics only')
+    parser.add_argument('--dashboard-mode', choices=DASHBOARD_MODES)
+    parser.add_argument('--host', dest='dashboard_host', help='dashboard bind address')
+    parser.add_argument('--dashboard-port', type=int)
+    parser.add_argument('--metrics-interval', type=float, help='seconds between metrics lines')
+    parser.add_argument('--metrics-file', help="append JSON metrics lines here ('-' for stdout)")
+    parser.add_argument('--event-log', help='write every decoded packet line to this file')
+    parser.add_argument('--print-config', action='store_true', help='show the effective config and exit')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    overrides = {key: value for key, value in vars(args).items()
+                 if key in DEFAULT_CONFIG and value is not None}
+    try:
+        config = load_config(args.config, overrides)
+    except (OSError, ValueError) as e:
+        print(f"❌ Config error: {e}")
+        return 2
+
+    if args.print_config:
+        print(json.dumps(config, indent=2))
+        return 0
+
+    try:
+        AlbionDaemon(config).run()
+    except ValueError as e:
+        print(f"❌ Config error: {e}")
+        return 2
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,55 @@
+"""
+Albion Scanner - Decode Memo
+Bounded LRU of decode results for byte-identical payloads (keep-alives,
+acks, repeating status broadcasts). Entries are keyed by the payload bytes
+themselves: bytes hashing runs in C and an equal key is an exact repeat, so
+a hit can never return another payload's decoding. Results are stored as
+DecodedRecord snapshots and replayed into fresh pooled records
+"""
+
+from collections import OrderedDict
+
+# Stored for payloads that decode to nothing, so those repeats are cheap too
+UNDECODABLE = ()
+
+
+class DecodeMemo:
+    def __init__(self, max_entries=4096, max_payload=1024):
+        self.max_entries = max_entries
+        self.max_payload = max_payload  # longer payloads are never memoized
+        self.entries = OrderedDict()  # payload -> snapshot / UNDECODABLE
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, payload):
+        """Cached snapshot of a payload (UNDECODABLE if it decoded to None), or None"""
+        if len(payload) > self.max_payload:
+            return None
+        snapshot = self.entries.get(payload)
+        if snapshot is None:
+            self.stats['misses'] += 1
+            return None
+        self.entries.move_to_end(payload)
+        self.stats['hits'] += 1
+        return snapshot
+
+    def put(self, payload, record):
+        """Remember the decode result of a payload"""
+        if len(payload) > self.max_payload or self.max_entries <= 0:
+            return
+        self.entries[payload] = record.snapshot() if record is not None else UNDECODABLE
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.stats['evictions'] += 1
+
+    def hit_rate(self):
+        lookups = self.stats['hits'] + self.stats['misses']
+        return self.stats['hits'] / lookups if lookups else 0.0
+
+    def clear(self):
+        self.entries.clear()
+
+    def get_stats(self):
+        return {**self.stats, 'entries': len(self.entries), 'hit_rate': self.hit_rate()}
@@ -0,0 +1,119 @@
+"""
+Albion Scanner - Payload Entropy
+Shannon entropy (bits per byte) of payloads via numpy.bincount: single
+payloads, sliding-window profiles across a payload, and batch computation
+over a whole capture. High-entropy regions point at compressed or encrypted
+segments when reverse-engineering new opcodes
+"""
+
+import numpy as np
+
+# Payloads processed per bincount batch (bounds the (batch, 256) count matrix)
+BATCH_SIZE = 4096
+
+
+def as_byte_array(data):
+    """uint8 view of bytes/bytearray/memoryview/ndarray data"""
+    if isinstance(data, np.ndarray):
+        return data.astype(np.uint8, copy=False).ravel()
+    return np.frombuffer(data, dtype=np.uint8)
+
+
+def entropy_from_counts(counts, totals=None):
+    """Shannon entropy of each row of a (..., 256) byte count array"""
+    counts = np.asarray(counts, dtype=np.float64)
+    if totals is None:
+        totals = counts.sum(axis=-1)
+    totals = np.asarray(totals, dtype=np.float64)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        p = counts / np.expand_dims(totals, -1)
+        terms = np.where(counts > 0, p * np.log2(p), 0.0)
+    entropy = -terms.sum(axis=-1)
+    return np.where(totals > 0, entropy, 0.0)
+
+
+def shannon_entropy(data):
+    """Entropy of one payload in bits per byte (0.0 - 8.0)"""
+    values = as_byte_array(data)
+    if not values.size:
+        return 0.0
+    return float(entropy_from_counts(np.bincount(values, minlength=256)))
+
+
+def max_entropy(length):
+    """Highest entropy a sample of `length` bytes can reach"""
+    return float(np.log2(min(256, length))) if length > 1 else 0.0
+
+
+def entropy_profile(data, window=64, step=16):
+    """Sliding-window entropy across a payload.
+
+    Returns (offsets, entropies) where entropies[i] covers
+    data[offsets[i]:offsets[i] + window]. Payloads shorter than the window
+    produce a single window over the whole payload.
+    """
+    values = as_byte_array(data)
+    if values.size <= window:
+        return np.zeros(1, dtype=np.int64), np.array([shannon_entropy(values)])
+
+    windows = np.lib.stride_tricks.sliding_window_view(values, window)[::step]
+    offsets = np.arange(len(windows), dtype=np.int64) * step
+
+    # One bincount for all windows: window i's bytes land in bins [256i, 256i+256)
+    keys = (np.arange(len(windows), dtype=np.int64)[:, None] * 256 + windows).ravel()
+    counts = np.bincount(keys, minlength=len(windows) * 256).reshape(len(windows), 256)
+    return offsets, entropy_from_counts(counts, np.full(len(windows), window))
+
+
+def high_entropy_segments(data, window=64, step=16, threshold=0.9):
+    """Merged (start, end) byte ranges whose window entropy is at least
+    `threshold` times the maximum reachable for the window size"""
+    values = as_byte_array(data)
+    offsets, entropies = entropy_profile(values, window, step)
+    limit = threshold * max_entropy(min(window, values.size))
+
+    segments = []
+    for offset in offsets[entropies >= limit]:
+        start, end = int(offset), int(min(offset + window, values.size))
+        if segments and start <= segments[-1][1]:
+            segments[-1][1] = max(segments[-1][1], end)
+        else:
+            segments.append([start, end])
+    return [tuple(segment) for segment in segments]
+
+
+def batch_entropy_from_blob(blob, offsets):
+    """Entropy of every payload stored back to back in one byte blob.
+
+    `offsets` has n+1 entries; payload i is blob[offsets[i]:offsets[i+1]].
+    """
+    blob = as_byte_array(blob)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    n = len(offsets) - 1
+    entropies = np.zeros(max(n, 0), dtype=np.float64)
+
+    for first in range(0, n, BATCH_SIZE):
+        last = min(first + BATCH_SIZE, n)
+        start, end = offsets[first], offsets[last]
+        lengths = np.diff(offsets[first:last + 1])
+        rows = np.repeat(np.arange(last - first, dtype=np.int64), lengths)
+        keys = rows * 256 + blob[start:end]
+        counts = np.bincount(keys, minlength=(last - first) * 256).reshape(last - first, 256)
+        entropies[first:last] = entropy_from_counts(counts, lengths)
+
+    return entropies
+
+
+def batch_entropy(payloads):
+    """Entropy of each payload in an iterable of byte strings"""
+    payloads = list(payloads)
+    lengths = np.fromiter((len(p) for p in payloads), dtype=np.int64, count=len(payloads))
+    offsets = np.concatenate(([0], np.cumsum(lengths)))
+    blob = np.frombuffer(b''.join(payloads), dtype=np.uint8)
+    return batch_entropy_from_blob(blob, offsets)
+
+
+def capture_entropy(capture):
+    """Per-packet entropy of a ColumnarCapture, straight from its payload blob"""
+    return batch_entropy_from_blob(capture.payload, capture.payload_offsets)
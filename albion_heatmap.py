@@ -0,0 +1,222 @@
+"""
+Albion Scanner - Density Heatmap
+Incrementally updated 2D activity grid with exponential time decay,
+serialized to a compact binary frame for the dashboard
+
+Binary frame layout (little endian):
+    header  <4sBBHHHHffffd
+        magic 'AHMP', version, flags (bit 0 = zlib payload),
+        cols, rows            size of the cropped window in cells
+        col0, row0            window offset inside the full grid
+        origin_x, origin_y    world coordinate of full-grid cell (0, 0)
+        cell_size             world units per cell
+        max_density           density represented by the value 255
+        timestamp             time the decay was evaluated at
+    payload uint8[rows * cols], row-major, row 0 = lowest Y
+"""
+
+import math
+import struct
+import time
+import zlib
+
+import numpy as np
+
+
+class DensityGrid:
+    MAGIC = b'AHMP'
+    VERSION = 1
+    FLAG_ZLIB = 0x01
+    HEADER = struct.Struct('<4sBBHHHHffffd')
+
+    # Renormalize once accumulated weights grow by e^RENORMALIZE_EXPONENT
+    RENORMALIZE_EXPONENT = 50.0
+
+    # Decay counts as a change once it fades the grid by this fraction, and
+    # the grid is cleared after this many half-lives without new samples
+    DECAY_CHANGE = 0.05
+    FADE_OUT_HALF_LIVES = 8
+
+    def __init__(self, cell_size=25.0, bounds=(-5000.0, -5000.0, 5000.0, 5000.0),
+                 half_life=120.0):
+        self.cell_size = float(cell_size)
+        self.min_x, self.min_y, self.max_x, self.max_y = (float(b) for b in bounds)
+        self.cols = int(math.ceil((self.max_x - self.min_x) / self.cell_size))
+        self.rows = int(math.ceil((self.max_y - self.min_y) / self.cell_size))
+        if self.cols > 0xFFFF or self.rows > 0xFFFF:
+            raise ValueError("Grid too large for the binary format, increase cell_size")
+
+        self.half_life = half_life
+        self.decay_rate = math.log(2) / half_life if half_life else 0.0
+
+        # Weights are stored scaled by e^(decay_rate * (t - reference_time)),
+        # so adding a sample is O(1) and decay is applied only when read
+        self.grid = np.zeros((self.rows, self.cols), dtype=np.float64)
+        self.reference_time = time.time()
+        self.samples = 0
+        self.version = 0
+        self.changed_at = self.reference_time  # time of the last version bump
+        self.last_sample_at = None
+
+    def clear(self):
+        """Reset the grid"""
+        self.grid.fill(0.0)
+        self.reference_time = time.time()
+        self.samples = 0
+        self.last_sample_at = None
+        self.touch(self.reference_time)
+
+    def touch(self, timestamp):
+        self.version += 1
+        self.changed_at = timestamp
+
+    def apply_decay(self, now=None):
+        """Bump the version when decay alone has visibly faded the grid
+
+        Without new samples the version would never change, so a viewer
+        that only redraws on version changes would keep a frozen heatmap.
+        Returns True when the version was bumped.
+        """
+        if not self.decay_rate or self.last_sample_at is None:
+            return False
+        if now is None:
+            now = time.time()
+        if now - self.last_sample_at >= self.FADE_OUT_HALF_LIVES * self.half_life:
+            self.clear()  # faded below 1/2^FADE_OUT_HALF_LIVES: send one empty frame
+            return True
+        if 1.0 - math.exp(-self.decay_rate * (now - self.changed_at)) >= self.DECAY_CHANGE:
+            self.touch(now)
+            return True
+        return False
+
+    def renormalize(self, timestamp):
+        """Fold the pending decay into the stored weights"""
+        self.grid *= math.exp(-self.decay_rate * (timestamp - self.reference_time))
+        self.reference_time = timestamp
+
+    def cell_of(self, x, y):
+        """Grid (row, col) of a world position, or None if out of bounds"""
+        col = int((x - self.min_x) // self.cell_size)
+        row = int((y - self.min_y) // self.cell_size)
+        if 0 <= col < self.cols and 0 <= row < self.rows:
+            return row, col
+        return None
+
+    def add(self, x, y, timestamp=None, weight=1.0):
+        """Add one position sample"""
+        cell = self.cell_of(x, y)
+        if cell is None:
+            return False
+        if timestamp is None:
+            timestamp = time.time()
+
+        exponent = self.decay_rate * (timestamp - self.reference_time)
+        if exponent > self.RENORMALIZE_EXPONENT:
+            self.renormalize(timestamp)
+            exponent = 0.0
+
+        self.grid[cell] += weight * math.exp(exponent)
+        self.samples += 1
+        self.last_sample_at = max(self.last_sample_at or timestamp, timestamp)
+        self.touch(timestamp)
+        return True
+
+    def add_many(self, xs, ys, timestamps, weights=None):
+        """Add a batch of position samples"""
+        xs = np.asarray(xs, dtype=np.float64)
+        ys = np.asarray(ys, dtype=np.float64)
+        timestamps = np.asarray(timestamps, dtype=np.float64)
+        if xs.size == 0:
+            return 0
+
+        newest = float(timestamps.max())
+        if self.decay_rate * (newest - self.reference_time) > self.RENORMALIZE_EXPONENT:
+            self.renormalize(newest)
+
+        cols = np.floor((xs - self.min_x) / self.cell_size).astype(np.int64)
+        rows = np.floor((ys - self.min_y) / self.cell_size).astype(np.int64)
+        valid = (cols >= 0) & (cols < self.cols) & (rows >= 0) & (rows < self.rows)
+
+        scale = np.exp(self.decay_rate * (timestamps[valid] - self.reference_time))
+        if weights is not None:
+            scale *= np.asarray(weights, dtype=np.float64)[valid]
+
+        flat = rows[valid] * self.cols + cols[valid]
+        self.grid += np.bincount(flat, weights=scale, minlength=self.grid.size).reshape(self.grid.shape)
+
+        added = int(valid.sum())
+        self.samples += added
+        if added:
+            self.last_sample_at = max(self.last_sample_at or newest, newest)
+        self.touch(newest)
+        return added
+
+    def density(self, now=None):
+        """Decayed density grid at a point in time (new array)"""
+        if now is None:
+            now = time.time()
+        return self.grid * math.exp(-self.decay_rate * (now - self.reference_time))
+
+    def to_bytes(self, now=None, downsample=1, compress=True):
+        """Serialize the non-empty window of the grid as a binary frame"""
+        if now is None:
+            now = time.time()
+        density = self.density(now)
+        cell_size = self.cell_size
+
+        if downsample > 1:
+            rows = density.shape[0] // downsample * downsample
+            cols = density.shape[1] // downsample * downsample
+            density = density[:rows, :cols].reshape(
+                rows // downsample, downsample, cols // downsample, downsample
+            ).sum(axis=(1, 3))
+            cell_size *= downsample
+
+        occupied = density > 0
+        if occupied.any():
+            row_idx = np.flatnonzero(occupied.any(axis=1))
+            col_idx = np.flatnonzero(occupied.any(axis=0))
+            row0, row1 = int(row_idx[0]), int(row_idx[-1]) + 1
+            col0, col1 = int(col_idx[0]), int(col_idx[-1]) + 1
+            window = density[row0:row1, col0:col1]
+            max_density = float(window.max())
+            quantized = np.rint(window * (255.0 / max_density)).astype(np.uint8)
+        else:
+            row0 = col0 = 0
+            max_density = 0.0
+            quantized = np.zeros((0, 0), dtype=np.uint8)
+
+        payload = quantized.tobytes()
+        flags = 0
+        if compress:
+            payload = zlib.compress(payload, 6)
+            flags |= self.FLAG_ZLIB
+
+        header = self.HEADER.pack(
+            self.MAGIC, self.VERSION, flags,
+            quantized.shape[1], quantized.shape[0], col0, row0,
+            self.min_x, self.min_y, cell_size, max_density, now
+        )
+        return header + payload
+
+    @classmethod
+    def from_bytes(cls, frame):
+        """Decode a binary frame into (metadata dict, float32 density window)"""
+        (magic, version, flags, cols, rows, col0, row0,
+         origin_x, origin_y, cell_size, max_density, timestamp) = cls.HEADER.unpack_from(frame)
+        if magic != cls.MAGIC:
+            raise ValueError("Not a heatmap frame")
+
+        payload = frame[cls.HEADER.size:]
+        if flags & cls.FLAG_ZLIB:
+            payload = zlib.decompress(payload)
+        window = np.frombuffer(payload, dtype=np.uint8).reshape(rows, cols)
+
+        meta = {
+            'version': version,
+            'cols': cols, 'rows': rows, 'col0': col0, 'row0': row0,
+            'origin_x': origin_x, 'origin_y': origin_y,
+            'cell_size': cell_size, 'max_density': max_density,
+            'timestamp': timestamp
+        }
+        return meta, window.astype(np.float32) * (max_density / 255.0 if max_density else 0.0)
@@ -0,0 +1,338 @@
+"""
+Albion Scanner - History Store
+Indexed SQLite storage for player, chat and movement history with
+cursor-based pagination for the dashboard API
+"""
+
+import sqlite3
+import threading
+import time
+import base64
+import json
+from collections import deque
+
+from albion_symbols import symbols
+
+
+class AlbionHistoryStore:
+    """Indexed history storage with bounded, cursor-paginated queries"""
+
+    DEFAULT_PAGE_SIZE = 50
+    MAX_PAGE_SIZE = 200
+
+    # SQLite VM instructions a single query may run before it is aborted.
+    # Keeps unindexed keyword searches from holding the store lock forever.
+    MAX_QUERY_STEPS = 2_000_000
+
+    def __init__(self, db_path='albion_history.db', max_pending=50000,
+                 movement_retention=6 * 3600):
+        self.db_path = db_path
+        self.movement_retention = movement_retention
+        self.lock = threading.Lock()
+
+        # Writers (scanner thread) only append here; flush() moves the rows
+        # into SQLite in one transaction so the scanner never waits on disk.
+        self.pending_players = deque(maxlen=max_pending)
+        self.pending_chat = deque(maxlen=max_pending)
+        self.pending_movement = deque(maxlen=max_pending)
+        self.last_prune = 0
+
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.create_schema()
+
+    def create_schema(self):
+        """Create tables and indexes used by the history queries"""
+        with self.lock, self.conn:
+            self.conn.executescript("""
+                CREATE TABLE IF NOT EXISTS players (
+                    player_id INTEGER PRIMARY KEY,
+                    name TEXT COLLATE NOCASE,
+                    guild TEXT COLLATE NOCASE,
+                    first_seen REAL,
+                    last_seen REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_players_last_seen
+                    ON players(last_seen, player_id);
+                CREATE INDEX IF NOT EXISTS idx_players_name ON players(name);
+                CREATE INDEX IF NOT EXISTS idx_players_guild ON players(guild);
+
+                CREATE TABLE IF NOT EXISTS chat (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    sender TEXT COLLATE NOCASE,
+                    message TEXT,
+                    timestamp REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_chat_sender ON chat(sender, id);
+                CREATE INDEX IF NOT EXISTS idx_chat_timestamp ON chat(timestamp);
+
+                CREATE TABLE IF NOT EXISTS movement (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    player_id INTEGER,
+                    x REAL,
+                    y REAL,
+                    z REAL,
+                    timestamp REAL
+                );
+                CREATE INDEX IF NOT EXISTS idx_movement_player
+                    ON movement(player_id, id);
+                CREATE INDEX IF NOT EXISTS idx_movement_timestamp
+                    ON movement(timestamp);
+            """)
+
+    # ------------------------------------------------------------------
+    # Recording (called from the scanner thread, never touches SQLite)
+    # ------------------------------------------------------------------
+
+    def record_player(self, player_id, name_id, guild_id, timestamp):
+        """Queue a player sighting (name and guild as symbol ids)"""
+        self.pending_players.append((player_id, name_id, guild_id, timestamp, timestamp))
+
+    def record_chat(self, sender_id, message, timestamp):
+        """Queue a chat message (sender as a symbol id)"""
+        self.pending_chat.append((sender_id, message, timestamp))
+
+    def record_movement(self, player_id, position, timestamp):
+        """Queue a movement sample"""
+        self.pending_movement.append(
+            (player_id, position['x'], position['y'], position['z'], timestamp)
+        )
+
+    def drain(self, pending):
+        """Pop everything currently queued in a pending deque"""
+        rows = []
+        for _ in range(len(pending)):
+            rows.append(pending.popleft())
+        return rows
+
+    def flush(self):
+        """Write queued rows to SQLite in a single transaction"""
+        players = self.drain(self.pending_players)
+        chat = self.drain(self.pending_chat)
+        movement = self.drain(self.pending_movement)
+
+        if not (players or chat or movement):
+            return 0
+
+        # Symbol ids become strings only here, at the storage boundary
+        lookup = symbols.lookup
+        players = [(player_id, lookup(name_id), lookup(guild_id), first_seen, last_seen)
+                   for player_id, name_id, guild_id, first_seen, last_seen in players]
+        chat = [(lookup(sender_id), message, timestamp) for sender_id, message, timestamp in chat]
+
+        with self.lock, self.conn:
+            if players:
+                self.conn.executemany("""
+                    INSERT INTO players (player_id, name, guild, first_seen, last_seen)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(player_id) DO UPDATE SET
+                        name = excluded.name,
+                        guild = CASE WHEN excluded.guild != '' THEN excluded.guild
+                                     ELSE players.guild END,
+                        last_seen = MAX(players.last_seen, excluded.last_seen)
+                """, players)
+            if chat:
+                self.conn.executemany(
+                    "INSERT INTO chat (sender, message, timestamp) VALUES (?, ?, ?)",
+                    chat
+                )
+            if movement:
+                self.conn.executemany(
+                    "INSERT INTO movement (player_id, x, y, z, timestamp) VALUES (?, ?, ?, ?, ?)",
+                    movement
+                )
+
+            # Prune old movement samples once a minute
+            current_time = time.time()
+            if self.movement_retention and current_time - self.last_prune > 60:
+                self.conn.execute(
+                    "DELETE FROM movement WHERE timestamp < ?",
+                    (current_time - self.movement_retention,)
+                )
+                self.last_prune = current_time
+
+        return len(players) + len(chat) + len(movement)
+
+    def clear(self):
+        """Remove all stored history"""
+        self.drain(self.pending_players)
+        self.drain(self.pending_chat)
+        self.drain(self.pending_movement)
+        with self.lock, self.conn:
+            self.conn.execute("DELETE FROM players")
+            self.conn.execute("DELETE FROM chat")
+            self.conn.execute("DELETE FROM movement")
+
+    def close(self):
+        """Flush pending rows and close the database"""
+        self.flush()
+        with self.lock:
+            self.conn.close()
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def encode_cursor(values):
+        """Encode keyset values into an opaque cursor string"""
+        raw = json.dumps(values, separators=(',', ':')).encode('utf-8')
+        return base64.urlsafe_b64encode(raw).decode('ascii')
+
+    @staticmethod
+    def decode_cursor(cursor, types):
+        """Decode a cursor string into one value per entry of `types`.
+
+        Cursors come from clients, so anything but a list of exactly those
+        value types raises ValueError (booleans are not accepted as numbers).
+        """
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        except Exception:
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+        if (not isinstance(values, list) or len(values) != len(types) or
+                any(isinstance(value, bool) or not isinstance(value, expected)
+                    for value, expected in zip(values, types))):
+            raise ValueError(f"Invalid cursor: {cursor!r}")
+        return values
+
+    def clamp_limit(self, limit):
+        """Bound the page size requested by a client"""
+        if limit is None:
+            return self.DEFAULT_PAGE_SIZE
+        return max(1, min(int(limit), self.MAX_PAGE_SIZE))
+
+    def run_query(self, sql, params):
+        """Run a read query with the step budget enforced"""
+        steps = [0]
+
+        def budget():
+            steps[0] += 1000
+            return 1 if steps[0] > self.MAX_QUERY_STEPS else 0
+
+        with self.lock:
+            self.conn.set_progress_handler(budget, 1000)
+            try:
+                return self.conn.execute(sql, params).fetchall()
+            except sqlite3.OperationalError as e:
+                if 'interrupted' in str(e):
+                    raise TimeoutError("History query exceeded its work budget, narrow the filters")
+                raise
+            finally:
+                self.conn.set_progress_handler(None, 0)
+
+    def page(self, rows, limit, make_item, make_cursor):
+        """Build a page response from limit + 1 fetched rows"""
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        return {
+            'items': [make_item(row) for row in rows],
+            'count': len(rows),
+            'next_cursor': make_cursor(rows[-1]) if has_more else None
+        }
+
+    def query_players(self, name=None, guild=None, since=None, until=None,
+                      cursor=None, limit=None):
+        """Query players by name prefix, guild and last-seen window"""
+        limit = self.clamp_limit(limit)
+        clauses, params = [], []
+
+        if name:
+            # Prefix range instead of LIKE so the NOCASE index is used
+            clauses.append("name >= ? AND name < ?")
+            params.extend([name, name + '\uffff'])
+        if guild:
+            clauses.append("guild = ?")
+            params.append(guild)
+        if since is not None:
+            clauses.append("last_seen >= ?")
+            params.append(float(since))
+        if until is not None:
+            clauses.append("last_seen <= ?")
+            params.append(float(until))
+        if cursor:
+            last_seen, player_id = self.decode_cursor(cursor, ((int, float), int))
+            clauses.append("(last_seen < ? OR (last_seen = ? AND player_id < ?))")
+            params.extend([last_seen, last_seen, player_id])
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.run_query(f"""
+            SELECT player_id, name, guild, first_seen, last_seen FROM players
+            {where}
+            ORDER BY last_seen DESC, player_id DESC
+            LIMIT ?
+        """, params + [limit + 1])
+
+        return self.page(
+            rows, limit,
+            lambda r: {'id': r[0], 'name': r[1], 'guild': r[2],
+                       'first_seen': r[3], 'last_seen': r[4]},
+            lambda r: self.encode_cursor([r[4], r[0]])
+        )
+
+    def query_chat(self, sender=None, keyword=None, since=None, until=None,
+                   cursor=None, limit=None):
+        """Query chat messages by sender, keyword and time window (newest first)"""
+        limit = self.clamp_limit(limit)
+        clauses, params = [], []
+
+        if sender:
+            clauses.append("sender = ?")
+            params.append(sender)
+        if keyword:
+            clauses.append("instr(lower(message), ?) > 0")
+            params.append(keyword.lower())
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(float(since))
+        if until is not None:
+            clauses.append("timestamp <= ?")
+            params.append(float(until))
+        if cursor:
+            (last_id,) = self.decode_cursor(cursor, (int,))
+            clauses.append("id < ?")
+            params.append(last_id)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self.run_query(f"""
+            SELECT id, sender, message, timestamp FROM chat
+            {where}
+            ORDER BY id DESC
+            LIMIT ?
+        """, params + [limit + 1])
+
+        return self.page(
+            rows, limit,
+            lambda r: {'id': r[0], 'sender': r[1], 'message': r[2], 'timestamp': r[3]},
+            lambda r: self.encode_cursor([r[0]])
+        )
+
+    def query_movement(self, player_id, since=None, until=None, cursor=None, limit=None):
+        """Query the movement track of one player (newest first)"""
+        limit = self.clamp_limit(limit)
+        clauses, params = ["player_id = ?"], [int(player_id)]
+
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(float(since))
+        if until is not None:
+            clauses.append("timestamp <= ?")
+            params.append(float(until))
+        if cursor:
+            (last_id,) = self.decode_cursor(cursor, (int,))
+            clauses.append("id < ?")
+            params.append(last_id)
+
+        rows = self.run_query(f"""
+            SELECT id, x, y, z, timestamp FROM movement
+            WHERE {' AND '.join(clauses)}
+            ORDER BY id DESC
+            LIMIT ?
+        """, params + [limit + 1])
+
+        return self.page(
+            rows, limit,
+            lambda r: {'position': {'x': r[1], 'y': r[2], 'z': r[3]}, 'timestamp': r[4]},
+            lambda r: self.encode_cursor([r[0]])
+        )
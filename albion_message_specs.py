@@ -0,0 +1,183 @@
+"""
+Albion Scanner - Message Specs
+Declarative message layouts loaded from JSON or YAML files: each message maps
+a header prefix (and optionally an exact payload length) to a fixed field
+layout or to one of the decoder's built-in handlers. Specs are compiled once
+at startup into precompiled struct.Struct unpackers and a prefix dispatch
+table, so a known message decodes with one table lookup and one unpack_from
+"""
+
+import os
+import json
+import struct
+
+try:
+    import yaml
+except ImportError:
+    yaml = None
+
+SPEC_VERSION = 1
+DISPATCH_SLOTS = 1 << 16  # One slot per value of the first two header bytes
+DEFAULT_SPEC_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'albion_message_specs.json')
+
+
+def load_spec_file(filename):
+    """Parse a spec document (.json, .yaml or .yml)"""
+    with open(filename, 'r', encoding='utf-8') as f:
+        if filename.endswith(('.yaml', '.yml')):
+            if yaml is None:
+                raise ValueError(f"{filename}: YAML specs need PyYAML (pip install pyyaml)")
+            document = yaml.safe_load(f)
+        else:
+            document = json.load(f)
+
+    if not isinstance(document, dict) or document.get('version') != SPEC_VERSION:
+        version = document.get('version') if isinstance(document, dict) else None
+        raise ValueError(f"{filename}: unsupported spec version {version}")
+    return document
+
+
+def decode_string(value):
+    """Fixed-width string field as text (NUL padding stripped)"""
+    return value.rstrip(b'\x00').decode('utf-8', errors='ignore')
+
+
+class CompiledMessage:
+    """One message spec compiled to a struct unpacker"""
+    __slots__ = ('name', 'type', 'handler', 'prefix', 'length', 'unpacker', 'size',
+                 'names', 'index', 'converters', 'checks')
+
+    def __init__(self, spec, byte_order='<'):
+        self.name = spec['name']
+        self.type = spec.get('type', 'unknown')
+        self.handler = spec.get('handler')
+        self.prefix = bytes.fromhex(spec['header'])
+        self.length = spec.get('length')
+        if not self.prefix:
+            raise ValueError(f"{self.name}: empty header prefix")
+
+        layout = [byte_order]
+        position = 0
+        names, converters, checks = [], [], []
+        for field in sorted(spec.get('fields', ()), key=lambda field: field['offset']):
+            offset, fmt = field['offset'], field['format']
+            try:
+                size = struct.calcsize(byte_order + fmt)
+                single = len(struct.unpack(byte_order + fmt, bytes(size))) == 1
+            except struct.error as e:
+                raise ValueError(f"{self.name}: bad format {fmt!r} for field {field['name']}: {e}")
+            if not single:
+                raise ValueError(f"{self.name}: field {field['name']} must unpack to one value")
+            if offset < position:
+                raise ValueError(f"{self.name}: field {field['name']} overlaps the previous field")
+
+            if offset > position:
+                layout.append(f'{offset - position}x')
+            layout.append(fmt)
+            position = offset + size
+
+            index = len(names)
+            names.append(field['name'])
+            if field.get('kind') == 'string':
+                converters.append((index, decode_string))
+            elif fmt.endswith('s'):
+                converters.append((index, bytes.hex))
+            if 'min' in field or 'max' in field:
+                checks.append((index, field.get('min', float('-inf')), field.get('max', float('inf'))))
+
+        self.unpacker = struct.Struct(''.join(layout)) if names else None
+        self.size = self.unpacker.size if names else 0
+        self.names = tuple(names)
+        self.index = {name: i for i, name in enumerate(names)}
+        self.converters = tuple(converters)
+        self.checks = tuple(checks)
+
+    def unpack(self, payload):
+        """Raw field values of a payload, or None if it is too short or a range check fails"""
+        if self.unpacker is None:
+            return ()
+        if len(payload) < self.size:
+            return None
+
+        values = self.unpacker.unpack_from(payload)
+        for index, low, high in self.checks:
+            if not low <= values[index] <= high:
+                return None
+        return values
+
+    def to_fields(self, values):
+        """Field dict of unpacked values (strings and byte fields converted)"""
+        if self.converters:
+            values = list(values)
+            for index, convert in self.converters:
+                values[index] = convert(values[index])
+        return dict(zip(self.names, values))
+
+    def decode(self, payload):
+        """Field dict of a payload, or None if it is too short or a range check fails"""
+        values = self.unpack(payload)
+        return None if values is None else self.to_fields(values)
+
+    def materialize(self, record):
+        """Lazy decoder of a DecodedRecord whose _fields holds unpack() values"""
+        record._fields = self.to_fields(record._fields)
+
+
+class MessageTable:
+    """Dispatch table indexed by the first two header bytes.
+
+    Each of the 65536 slots holds the candidate messages for that opcode,
+    most specific first (longer prefix, then exact length), so a lookup is
+    one list index plus a check of usually a single candidate.
+    """
+
+    def __init__(self):
+        self.entries = {}  # (prefix, length) -> message
+        self.slots = [()] * DISPATCH_SLOTS
+
+    def __len__(self):
+        return len(self.entries)
+
+    @property
+    def messages(self):
+        return list(self.entries.values())
+
+    def add(self, message):
+        """Register a compiled message (replacing one with the same prefix and length)"""
+        self.entries[(message.prefix, message.length)] = message
+        self.rebuild()
+
+    def rebuild(self):
+        """Recompute the slot table from the registered messages"""
+        buckets = {}
+        for message in self.entries.values():
+            if len(message.prefix) >= 2:
+                keys = (message.prefix[0] << 8 | message.prefix[1],)
+            else:
+                keys = range(message.prefix[0] << 8, (message.prefix[0] + 1) << 8)
+            for key in keys:
+                buckets.setdefault(key, []).append(message)
+
+        self.slots = [()] * DISPATCH_SLOTS
+        for key, candidates in buckets.items():
+            candidates.sort(key=lambda m: (-len(m.prefix), m.length is None))
+            self.slots[key] = tuple(candidates)
+
+    def load(self, filename):
+        """Compile every message of a spec file into the table; returns the count"""
+        document = load_spec_file(filename)
+        byte_order = document.get('byte_order', '<')
+        messages = [CompiledMessage(spec, byte_order) for spec in document.get('messages', ())]
+        for message in messages:
+            self.entries[(message.prefix, message.length)] = message
+        self.rebuild()
+        return len(messages)
+
+    def lookup(self, payload):
+        """Message spec matching a payload's header and length, or None"""
+        if len(payload) < 2:
+            return None
+        for message in self.slots[payload[0] << 8 | payload[1]]:
+            if (message.length is None or message.length == len(payload)) and payload.startswith(message.prefix):
+                return message
+        return None
@@ -0,0 +1,349 @@
+"""
+Albion Scanner - Movement Tracker
+Fixed-size per-entity movement rings stored in one NumPy structured array,
+with speed/heading/acceleration and motion labels derived in batch
+"""
+
+import numpy as np
+
+MOVEMENT_SAMPLE_DTYPE = np.dtype([
+    ('t', 'f8'),
+    ('x', 'f4'),
+    ('y', 'f4'),
+    ('z', 'f4'),
+])
+
+MOTION_LABELS = np.array(['unknown', 'stationary', 'running', 'mounted'])
+
+
+class MovementTracker:
+    # Horizontal speed thresholds (world units per second)
+    STATIONARY_SPEED = 0.5
+    MOUNTED_SPEED = 7.5
+
+    def __init__(self, ring_size=16, initial_capacity=256, speed_window=4):
+        self.ring_size = ring_size
+        self.speed_window = max(2, min(speed_window, ring_size))
+
+        # One ring per entity row; rows are handed out on first sighting
+        self.samples = np.zeros((initial_capacity, ring_size), dtype=MOVEMENT_SAMPLE_DTYPE)
+        self.heads = np.zeros(initial_capacity, dtype=np.int64)   # next write slot
+        self.counts = np.zeros(initial_capacity, dtype=np.int64)  # valid samples
+        self.entity_ids = np.zeros(initial_capacity, dtype=np.int64)
+        self.rows = {}  # entity_id -> row
+        self.free_rows = []
+        self.next_row = 0
+
+    @property
+    def capacity(self):
+        return self.samples.shape[0]
+
+    def grow(self):
+        """Double the number of entity rows"""
+        new_capacity = self.capacity * 2
+        samples = np.zeros((new_capacity, self.ring_size), dtype=MOVEMENT_SAMPLE_DTYPE)
+        samples[:self.capacity] = self.samples
+        self.samples = samples
+        for name in ('heads', 'counts', 'entity_ids'):
+            old = getattr(self, name)
+            new = np.zeros(new_capacity, dtype=old.dtype)
+            new[:old.size] = old
+            setattr(self, name, new)
+
+    def row_for(self, entity_id):
+        """Get or allocate the ring row of an entity"""
+        row = self.rows.get(entity_id)
+        if row is None:
+            if self.free_rows:
+                row = self.free_rows.pop()
+            else:
+                if self.next_row >= self.capacity:
+                    self.grow()
+                row = self.next_row
+                self.next_row += 1
+            self.rows[entity_id] = row
+            self.entity_ids[row] = entity_id
+            self.heads[row] = 0
+            self.counts[row] = 0
+        return row
+
+    def record(self, entity_id, x, y, z, timestamp):
+        """Store one position sample (constant time)"""
+        row = self.row_for(entity_id)
+        head = self.heads[row]
+        self.samples[row, head] = (timestamp, x, y, z)
+        self.heads[row] = (head + 1) % self.ring_size
+        if self.counts[row] < self.ring_size:
+            self.counts[row] += 1
+
+    def forget(self, entity_id):
+        """Release the ring of an entity"""
+        row = self.rows.pop(entity_id, None)
+        if row is not None:
+            self.counts[row] = 0
+            self.free_rows.append(row)
+
+    def evict_stale(self, cutoff):
+        """Release the rings of entities whose newest sample is older than cutoff
+
+        Freed rows are reused by new entities, so the arrays stop growing
+        once the number of concurrently active entities levels off.
+        Returns the number of evicted entities.
+        """
+        ids, rows = self.active_rows()
+        if not rows.size:
+            return 0
+        newest = self.samples['t'][rows, (self.heads[rows] - 1) % self.ring_size]
+        stale = ids[newest < cutoff]
+        for entity_id in stale.tolist():
+            self.forget(entity_id)
+        return int(stale.size)
+
+    def clear(self):
+        """Drop all tracked entities"""
+        self.rows.clear()
+        self.free_rows = []
+        self.next_row = 0
+        self.counts[:] = 0
+        self.heads[:] = 0
+
+    def active_rows(self, entity_ids=None):
+        """Rows (and their entity ids) to include in a batch pass"""
+        if entity_ids is None:
+            ids = np.fromiter(self.rows.keys(), dtype=np.int64, count=len(self.rows))
+            rows = np.fromiter(self.rows.values(), dtype=np.int64, count=len(self.rows))
+        else:
+            pairs = [(eid, self.rows[eid]) for eid in entity_ids if eid in self.rows]
+            ids = np.array([p[0] for p in pairs], dtype=np.int64)
+            rows = np.array([p[1] for p in pairs], dtype=np.int64)
+        return ids, rows
+
+    def recent(self, rows, k):
+        """Last k samples of each row, oldest first, shape (len(rows), k).
+
+        Slots older than the row's sample count are returned with t = NaN.
+        """
+        offsets = np.arange(-k, 0)
+        idx = (self.heads[rows, None] + offsets[None, :]) % self.ring_size
+        window = self.samples[rows[:, None], idx]
+        missing = np.arange(k)[None, :] < (k - self.counts[rows, None])
+        window['t'][missing] = np.nan
+        return window
+
+    def compute_features(self, entity_ids=None):
+        """Derive motion features for many entities in one vectorized pass.
+
+        Returns a dict of equally sized arrays: entity_id, samples, x, y, z,
+        last_seen, speed, heading (degrees, 0 = +X, counter-clockwise),
+        acceleration, vx, vy and label (see MOTION_LABELS).
+        """
+        ids, rows = self.active_rows(entity_ids)
+        k = self.speed_window
+        window = self.recent(rows, k + 1)
+
+        t = window['t']
+        x = window['x'].astype(np.float64)
+        y = window['y'].astype(np.float64)
+        z = window['z'].astype(np.float64)
+
+        dt = np.diff(t, axis=1)
+        dx = np.diff(x, axis=1)
+        dy = np.diff(y, axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            valid = np.isfinite(dt) & (dt > 0)
+            step = np.where(valid, np.hypot(dx, dy), 0.0)
+            step_time = np.where(valid, dt, 0.0)
+
+            # Average speed over the window (path length / elapsed time)
+            span = step_time.sum(axis=1)
+            speed = np.where(span > 0, step.sum(axis=1) / span, np.nan)
+
+            # Instantaneous velocity from the newest step drives heading
+            last_dt = np.where(valid[:, -1], dt[:, -1], np.nan)
+            vx = dx[:, -1] / last_dt
+            vy = dy[:, -1] / last_dt
+            heading = np.degrees(np.arctan2(vy, vx)) % 360.0
+
+            # Acceleration from the two newest step speeds
+            step_speed = np.where(valid, step / np.where(valid, dt, 1.0), np.nan)
+            mid_dt = (dt[:, -1] + dt[:, -2]) / 2.0
+            acceleration = (step_speed[:, -1] - step_speed[:, -2]) / mid_dt
+
+        label = np.select(
+            [np.isnan(speed), speed < self.STATIONARY_SPEED, speed < self.MOUNTED_SPEED],
+            [0, 1, 2],
+            default=3
+        )
+
+        return {
+            'entity_id': ids,
+            'samples': self.counts[rows],
+            'x': x[:, -1],
+            'y': y[:, -1],
+            'z': z[:, -1],
+            'last_seen': t[:, -1],
+            'speed': speed,
+            'heading': heading,
+            'acceleration': acceleration,
+            'vx': vx,
+            'vy': vy,
+            'label': label
+        }
+
+    @staticmethod
+    def features_to_records(features):
+        """Convert a feature batch to JSON-friendly dicts keyed by entity id"""
+        def clean(values):
+            return [None if v != v else round(float(v), 3) for v in values]
+
+        speed = clean(features['speed'])
+        heading = clean(features['heading'])
+        acceleration = clean(features['acceleration'])
+        vx = clean(features['vx'])
+        vy = clean(features['vy'])
+        labels = MOTION_LABELS[features['label']]
+
+        return {
+            int(eid): {
+                'speed': speed[i],
+                'heading': heading[i],
+                'acceleration': acceleration[i],
+                'velocity': {'x': vx[i], 'y': vy[i]},
+                'state': str(labels[i]),
+                'samples': int(features['samples'][i])
+            }
+            for i, eid in enumerate(features['entity_id'])
+        }
+
+    def track(self, entity_id):
+        """Samples of one entity, oldest first"""
+        row = self.rows.get(entity_id)
+        if row is None:
+            return []
+        count = int(self.counts[row])
+        window = self.recent(np.array([row]), count)[0] if count else []
+        return [
+            {'position': {'x': float(s['x']), 'y': float(s['y']), 'z': float(s['z'])},
+             'timestamp': float(s['t'])}
+            for s in window
+        ]
+
+
+ESTIMATE_MODES = np.array(['none', 'clamped', 'interpolated', 'extrapolated'])
+
+
+class PositionEstimator:
+    """Dead-reckoning position estimates built on a MovementTracker"""
+
+    def __init__(self, tracker, max_extrapolation=1.5, confidence_half_life=0.5,
+                 stale_after=10.0):
+        self.tracker = tracker
+        # Never project further than this past the newest sample (seconds)
+        self.max_extrapolation = max_extrapolation
+        self.decay_rate = np.log(2) / confidence_half_life
+        # Entities with no sample for this long are left out of estimates
+        self.stale_after = stale_after
+
+    def estimate(self, timestamp, entity_ids=None):
+        """Estimate positions of all (or the given) entities at a timestamp.
+
+        Inside an entity's sampled window the position is interpolated
+        between the bracketing samples (confidence 1). After the newest
+        sample it is extrapolated from the last velocity, for at most
+        max_extrapolation seconds, with confidence decaying by age.
+        Entities whose newest sample is more than stale_after seconds older
+        than the timestamp are not included.
+        Returns a dict of equally sized arrays: entity_id, x, y, z, vx, vy,
+        vz, age, confidence and mode (see ESTIMATE_MODES).
+        """
+        tracker = self.tracker
+        ids, rows = tracker.active_rows(entity_ids)
+        newest = tracker.samples['t'][rows, (tracker.heads[rows] - 1) % tracker.ring_size]
+        fresh = (tracker.counts[rows] > 0) & (newest >= timestamp - self.stale_after)
+        ids, rows = ids[fresh], rows[fresh]
+        window = tracker.recent(rows, tracker.ring_size)
+        n, k = window.shape
+
+        t = window['t']
+        x = window['x'].astype(np.float64)
+        y = window['y'].astype(np.float64)
+        z = window['z'].astype(np.float64)
+        arange = np.arange(n)
+
+        counts = tracker.counts[rows]
+        first = k - counts                # index of the oldest valid sample
+        t_first = t[arange, np.minimum(first, k - 1)]
+        t_last = t[:, -1] if k else np.zeros(0)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            # Velocity from the two newest samples
+            prev = np.maximum(k - 2, first)
+            dt_last = t[:, -1] - t[arange, prev]
+            moving = dt_last > 0
+            safe_dt = np.where(moving, dt_last, 1.0)
+            vx = np.where(moving, (x[:, -1] - x[arange, prev]) / safe_dt, 0.0)
+            vy = np.where(moving, (y[:, -1] - y[arange, prev]) / safe_dt, 0.0)
+            vz = np.where(moving, (z[:, -1] - z[arange, prev]) / safe_dt, 0.0)
+
+            # Interpolation bracket: hi = first sample newer than timestamp
+            newer = np.nan_to_num(t, nan=-np.inf) > timestamp
+            hi = np.where(newer.any(axis=1), newer.argmax(axis=1), k - 1)
+            lo = np.maximum(hi - 1, first)
+            t_lo, t_hi = t[arange, lo], t[arange, hi]
+            span = t_hi - t_lo
+            frac = np.clip(np.where(span > 0, (timestamp - t_lo) / np.where(span > 0, span, 1.0), 1.0), 0.0, 1.0)
+            ix = x[arange, lo] + (x[arange, hi] - x[arange, lo]) * frac
+            iy = y[arange, lo] + (y[arange, hi] - y[arange, lo]) * frac
+            iz = z[arange, lo] + (z[arange, hi] - z[arange, lo]) * frac
+
+            # Extrapolation past the newest sample
+            age = timestamp - t_last
+            horizon = np.clip(age, 0.0, self.max_extrapolation)
+            ex = x[:, -1] + vx * horizon
+            ey = y[:, -1] + vy * horizon
+            ez = z[:, -1] + vz * horizon
+
+        before = timestamp < t_first
+        after = timestamp > t_last
+
+        est_x = np.where(after, ex, np.where(before, x[arange, np.minimum(first, k - 1)], ix))
+        est_y = np.where(after, ey, np.where(before, y[arange, np.minimum(first, k - 1)], iy))
+        est_z = np.where(after, ez, np.where(before, z[arange, np.minimum(first, k - 1)], iz))
+
+        confidence = np.where(after, np.exp(-self.decay_rate * np.maximum(age, 0.0)), 1.0)
+        confidence = np.where(before, 0.5, confidence)
+        confidence = np.where(counts == 0, 0.0, confidence)
+
+        mode = np.select(
+            [counts == 0, after, before],
+            [0, 3, 1],
+            default=2
+        )
+
+        return {
+            'entity_id': ids,
+            'x': est_x, 'y': est_y, 'z': est_z,
+            'vx': vx, 'vy': vy, 'vz': vz,
+            'age': np.maximum(age, 0.0),
+            'confidence': confidence,
+            'mode': mode
+        }
+
+    @staticmethod
+    def estimates_to_records(estimates):
+        """Convert an estimate batch to JSON-friendly dicts"""
+        modes = ESTIMATE_MODES[estimates['mode']]
+        columns = {key: np.round(estimates[key], 3).tolist()
+                   for key in ('x', 'y', 'z', 'vx', 'vy', 'age', 'confidence')}
+        return [
+            {
+                'id': int(eid),
+                'position': {'x': columns['x'][i], 'y': columns['y'][i], 'z': columns['z'][i]},
+                'velocity': {'x': columns['vx'][i], 'y': columns['vy'][i]},
+                'age': columns['age'][i],
+                'confidence': columns['confidence'][i],
+                'mode': str(modes[i])
+            }
+            for i, eid in enumerate(estimates['entity_id'])
+            if modes[i] != 'none'
+        ]
@@ -2,18 +2,57 @@ import pyshark
 import struct
 import json
 import time
+import argparse
+import os
 from datetime import datetime
-from collections import defaultdict
+from collections import defaultdict, deque
 import hashlib
+from albion_columnar_capture import ColumnarCaptureWriter
+from albion_entropy import shannon_entropy
+from albion_payload_ring import PayloadRing, RingPacket
+from albion_stream_stats import StreamStatistics
+from albion_text_extraction import nul_delimited_names
+from albion_pipeline import Pipeline, Stage
 
 class AlbionPacketParser:
-    def __init__(self, interface='5', port=5056):
+    def __init__(self, interface='5', port=5056, save_packets=True, capture_format=None,
+                 bounded=False, ring_bytes=8 * 1024 * 1024, ring_packets=65536,
+                 recent_packets=10000, status_every=500, queue_size=4096):
         self.interface = interface
         self.port = port
+        
+        # Bounded mode for long captures: payloads go into a fixed-size ring,
+        # analysis fields are computed lazily, and retained summaries are capped.
+        # The summary keeps the newest ring views and extracts their positions
+        # and names only when it is printed, so during capture only the packet
+        # log (if any) pays for the per-packet scans
+        self.bounded = bounded
+        self.ring = PayloadRing(ring_bytes, ring_packets) if bounded else None
+        self.recent_views = deque(maxlen=min(recent_packets, ring_packets)) if bounded else None
+        self.status_every = status_every
+        self.queue_size = queue_size  # per pipeline stage
+        self.pipeline = None
+        
+        # Parsed packets are streamed to a packet log for packet_analyzer:
+        # 'jsonl' (one JSON object per line) or 'columnar' (.acap directory).
+        # Bounded mode defaults to columnar, which stores payload, positions
+        # and names without building the full per-packet analysis dict
+        self.save_packets = save_packets
+        self.capture_format = capture_format or ('columnar' if bounded else 'jsonl')
+        self.start_time = None
+        self.packet_log = None
+        self.packet_log_filename = None
+        # Shared timestamp suffix of every file a session writes, so batch
+        # analysis can tell which analysis files duplicate a packet log
+        self.session_timestamp = None
         self.packet_count = 0
         self.parsed_data = defaultdict(list)
         self.unknown_patterns = defaultdict(int)
         
+        # Fixed-memory header/opcode/size statistics; bounded mode relies on
+        # these instead of the exact unknown_patterns counter
+        self.header_stats = StreamStatistics()
+        
         # Known Albion packet signatures and patterns
         self.packet_signatures = {
             # Common headers/patterns (will be updated as we discover more)
@@ -103,21 +142,7 @@ class AlbionPacketParser:
     
     def calculate_entropy(self, data):
         """Calculate Shannon entropy untuk mendeteksi encrypted/compressed data"""
-        if not data:
-            return 0
-        
-        byte_counts = defaultdict(int)
-        for byte in data:
-            byte_counts[byte] += 1
-        
-        entropy = 0
-        data_len = len(data)
-        for count in byte_counts.values():
-            p = count / data_len
-            if p > 0:
-                entropy -= p * (p).bit_length()
-        
-        return entropy
+        return round(shannon_entropy(data), 3) if data else 0
     
     def try_parse_player_position(self, payload):
         """Coba extract posisi player dari payload"""
@@ -134,6 +159,8 @@ class AlbionPacketParser:
                 if (-10000 < x < 10000 and -10000 < y < 10000 and -10000 < z < 10000):
                     positions.append({
                         'offset': i,
+                        # Entity id candidate: the uint32 preceding the floats
+                        'player_id': struct.unpack('<I', payload[i-4:i])[0] if i >= 4 else 0,
                         'x': round(x, 2),
                         'y': round(y, 2),
                         'z': round(z, 2)
@@ -145,24 +172,11 @@ class AlbionPacketParser:
     
     def try_parse_player_name(self, payload):
         """Coba extract nama player dari payload"""
-        names = []
-        
-        # Look for null-terminated strings
+        # Look for null-terminated strings (player names usually don't have spaces)
         try:
-            decoded = payload.decode('utf-8', errors='ignore')
-            
-            # Split by null bytes and filter reasonable names
-            parts = decoded.split('\x00')
-            for part in parts:
-                if (3 <= len(part) <= 20 and 
-                    part.isprintable() and 
-                    not part.isdigit() and
-                    ' ' not in part):  # Player names usually don't have spaces
-                    names.append(part)
-        except:
-            pass
-        
-        return names
+            return nul_delimited_names(bytes(payload))
+        except Exception:
+            return []
     
     def parse_packet(self, packet):
         """Main packet parsing function"""
@@ -206,6 +220,7 @@ class AlbionPacketParser:
             # Store for pattern analysis
             header_pattern = payload[:4].hex() if len(payload) >= 4 else payload.hex()
             self.unknown_patterns[header_pattern] += 1
+            self.header_stats.add_payload(payload)
             
             return parsed_packet
             
@@ -213,6 +228,48 @@ class AlbionPacketParser:
             print(f"Error parsing packet: {e}")
             return None
     
+    def parse_packet_view(self, packet):
+        """Bounded-mode parsing: payload and addressing fields for the output stage
+        
+        The payload is only stored in the ring by the output stage (see
+        store_in_ring), so ring writes and view reads happen on one thread
+        and a view cannot be overwritten before the output stage uses it.
+        """
+        try:
+            payload = self.extract_raw_payload(packet)
+            if not payload:
+                return None
+            
+            src_port = int(packet.udp.srcport)
+            direction = 'incoming' if src_port == self.port else 'outgoing'
+            self.header_stats.add_payload(payload)
+            return (payload, packet.ip.src, packet.ip.dst, src_port, int(packet.udp.dstport),
+                    datetime.now(), direction)
+            
+        except Exception as e:
+            print(f"Error parsing packet: {e}")
+            return None
+    
+    def store_in_ring(self, captured):
+        """Append a parsed payload to the ring and return its lazy view"""
+        payload, src_ip, dst_ip, src_port, dst_port, timestamp, direction = captured
+        seq = self.ring.append(payload, timestamp.timestamp(), direction)
+        return RingPacket(self.ring, seq, self, src_ip, dst_ip, src_port, dst_port,
+                          timestamp.isoformat(), direction, len(payload))
+    
+    def header_patterns(self, limit=None):
+        """(header, count) pairs, most common first"""
+        if self.bounded:
+            return [(item['key'], item['count']) for item in self.header_stats.top('header', limit or 64)]
+        return sorted(self.unknown_patterns.items(), key=lambda x: x[1], reverse=True)[:limit]
+    
+    def print_status_line(self, start_time):
+        """One-line progress report used instead of per-packet dumps in bounded mode"""
+        stats = self.ring.get_stats()
+        elapsed = max(time.time() - start_time, 1e-6)
+        print(f"📦 {self.packet_count} packets ({self.packet_count / elapsed:.1f}/s) | "
+              f"ring {stats['packets']} packets, {stats['bytes_used'] / 1024:.0f}/{stats['capacity_bytes'] / 1024:.0f} KB")
+    
     def start_capture_and_parse(self, duration=None):
         """Start capturing dan parsing packets"""
         print(f"🔬 ALBION PACKET PARSER")
@@ -229,31 +286,13 @@ class AlbionPacketParser:
                 bpf_filter=f"udp port {self.port}"
             )
             
-            start_time = time.time()
+            start_time = self.start_time = time.time()
+            self.session_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            self.open_packet_log()
             
-            for packet in capture.sniff_continuously():
-                self.packet_count += 1
-                
-                # Parse packet
-                parsed = self.parse_packet(packet)
-                if parsed:
-                    self.display_parsed_packet(parsed)
-                    
-                    # Store interesting data
-                    if parsed['parsed_data']['positions']:
-                        self.parsed_data['positions'].extend(parsed['parsed_data']['positions'])
-                    if parsed['parsed_data']['names']:
-                        self.parsed_data['names'].extend(parsed['parsed_data']['names'])
-                
-                # Check duration limit
-                if duration and (time.time() - start_time > duration):
-                    print(f"\n⏱️ Duration limit reached ({duration}s)")
-                    break
-                
-                # Stop after reasonable amount for analysis
-                if self.packet_count >= 100:
-                    print(f"\n📊 Stopping after {self.packet_count} packets for analysis")
-                    break
+            # capture (this thread) -> parse -> output (display, packet log)
+            self.pipeline = self.build_pipeline()
+            self.pipeline.run(self.captured_packets(capture, duration, start_time))
             
             capture.close()
             self.print_analysis_summary()
@@ -263,12 +302,123 @@ class AlbionPacketParser:
             self.print_analysis_summary()
         except Exception as e:
             print(f"❌ Capture error: {e}")
+        finally:
+            self.close_packet_log()
+    
+    def captured_packets(self, capture, duration, start_time):
+        """Capture stage: numbered packets until a duration/packet limit is hit"""
+        for packet in capture.sniff_continuously():
+            self.packet_count += 1
+            yield self.packet_count, packet
+            
+            # Check duration limit
+            if duration and (time.time() - start_time > duration):
+                print(f"\n⏱️ Duration limit reached ({duration}s)")
+                return
+            
+            # Stop after reasonable amount for analysis
+            if not self.bounded and self.packet_count >= 100:
+                print(f"\n📊 Stopping after {self.packet_count} packets for analysis")
+                return
+    
+    def parse_numbered(self, item):
+        """Parse stage: (number, packet) -> (number, parsed packet or view)"""
+        number, packet = item
+        parsed = self.parse_packet_view(packet) if self.bounded else self.parse_packet(packet)
+        return (number, parsed) if parsed else None
+    
+    def store_parsed(self, item):
+        """Output stage: display, log and keep the interesting data"""
+        number, parsed = item
+        if self.bounded:
+            view = self.store_in_ring(parsed)
+            self.log_packet_view(view)
+            self.recent_views.append(view)
+            if number % self.status_every == 0:
+                self.print_status_line(self.start_time)
+            return
+        
+        self.display_parsed_packet(parsed, number)
+        self.log_parsed_packet(parsed)
+        
+        # Store interesting data
+        if parsed['parsed_data']['positions']:
+            self.parsed_data['positions'].extend(parsed['parsed_data']['positions'])
+        if parsed['parsed_data']['names']:
+            self.parsed_data['names'].extend(parsed['parsed_data']['names'])
     
-    def display_parsed_packet(self, parsed):
+    def summary_fields(self, field):
+        """Collected 'positions' or 'names' (bounded mode: of the recent views still in the ring)"""
+        if not self.bounded:
+            return self.parsed_data[field]
+        values = []
+        for view in self.recent_views:
+            try:
+                values.extend(getattr(view, field))
+            except LookupError:
+                continue  # evicted before anything needed its fields
+        return values
+    
+    def build_pipeline(self):
+        """parse -> output stages; both block when full since every packet is logged"""
+        return Pipeline('parser', [
+            Stage('parse', self.parse_numbered, queue_size=self.queue_size),
+            Stage('output', self.store_parsed, queue_size=self.queue_size)
+        ])
+    
+    def open_packet_log(self):
+        """Open the packet log in the configured capture format"""
+        if not self.save_packets or self.packet_log:
+            return
+        timestamp = self.session_timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
+        try:
+            if self.capture_format == 'columnar':
+                self.packet_log_filename = f"albion_packets_{timestamp}.acap"
+                self.packet_log = ColumnarCaptureWriter(self.packet_log_filename, capture_info={
+                    'interface': self.interface,
+                    'port': self.port,
+                    'started': datetime.now().isoformat()
+                })
+            else:
+                self.packet_log_filename = f"albion_packets_{timestamp}.jsonl"
+                self.packet_log = open(self.packet_log_filename, 'w', encoding='utf-8')
+        except Exception as e:
+            print(f"❌ Error opening packet log: {e}")
+            self.packet_log = None
+    
+    def log_parsed_packet(self, parsed):
+        """Append one parsed packet to the packet log"""
+        if not self.packet_log:
+            return
+        if isinstance(self.packet_log, ColumnarCaptureWriter):
+            self.packet_log.append_parsed(parsed)
+        else:
+            self.packet_log.write(json.dumps(parsed, separators=(',', ':')) + '\n')
+    
+    def log_packet_view(self, view):
+        """Append a bounded-mode packet to the packet log"""
+        if not self.packet_log:
+            return
+        if isinstance(self.packet_log, ColumnarCaptureWriter):
+            self.packet_log.append(view.timestamp, view.direction, view.payload,
+                                   view.positions, view.names)
+        else:
+            self.log_parsed_packet(view.to_dict())
+    
+    def close_packet_log(self):
+        """Close the packet log"""
+        if self.packet_log:
+            if isinstance(self.packet_log, ColumnarCaptureWriter):
+                self.packet_log.capture_info['packet_patterns'] = dict(self.header_patterns())
+            self.packet_log.close()
+            self.packet_log = None
+            print(f"💾 Packet log saved to: {self.packet_log_filename}")
+    
+    def display_parsed_packet(self, parsed, number=None):
         """Display parsed packet information"""
         direction_symbol = "⬅️" if parsed['direction'] == 'incoming' else "➡️"
         
-        print(f"\n{direction_symbol} Packet #{self.packet_count}")
+        print(f"\n{direction_symbol} Packet #{number or self.packet_count}")
         print(f"   {parsed['src_ip']}:{parsed['src_port']} → {parsed['dst_ip']}:{parsed['dst_port']}")
         print(f"   Length: {parsed['payload_length']} bytes | Entropy: {parsed['analysis']['entropy']:.2f}")
         print(f"   Header: {parsed['analysis']['header']}")
@@ -296,15 +446,18 @@ class AlbionPacketParser:
         print(f"📊 ANALYSIS SUMMARY")
         print(f"=" * 60)
         print(f"Total packets analyzed: {self.packet_count}")
+        if self.bounded:
+            stats = self.ring.get_stats()
+            print(f"Payload ring: {stats['packets']} packets held, {stats['evicted']} evicted")
         
         # Pattern frequency
         print(f"\n📋 Most common packet headers:")
-        for pattern, count in sorted(self.unknown_patterns.items(), key=lambda x: x[1], reverse=True)[:10]:
+        for pattern, count in self.header_patterns(10):
             print(f"   {pattern}: {count} packets")
         
         # Positions found
         unique_positions = set()
-        for pos in self.parsed_data['positions']:
+        for pos in self.summary_fields('positions'):
             unique_positions.add((pos['x'], pos['y'], pos['z']))
         
         if unique_positions:
@@ -313,7 +466,7 @@ class AlbionPacketParser:
                 print(f"   ({pos[0]}, {pos[1]}, {pos[2]})")
         
         # Names found
-        unique_names = set(self.parsed_data['names'])
+        unique_names = set(self.summary_fields('names'))
         if unique_names:
             print(f"\n👤 Unique names found: {len(unique_names)}")
             for name in list(unique_names)[:10]:  # Show first 10
@@ -324,16 +477,17 @@ class AlbionPacketParser:
     
     def save_analysis_to_file(self):
         """Save analysis results to JSON file"""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        timestamp = self.session_timestamp or datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"albion_analysis_{timestamp}.json"
         
         analysis_data = {
             'timestamp': datetime.now().isoformat(),
+            'packet_log': os.path.basename(self.packet_log_filename) if self.packet_log_filename else None,
             'total_packets': self.packet_count,
-            'packet_patterns': dict(self.unknown_patterns),
+            'packet_patterns': dict(self.header_patterns()),
             'parsed_data': {
-                'positions': self.parsed_data['positions'],
-                'names': self.parsed_data['names']
+                'positions': list(self.summary_fields('positions')),
+                'names': list(self.summary_fields('names'))
             }
         }
         
@@ -343,16 +497,37 @@ class AlbionPacketParser:
             print(f"\n💾 Analysis saved to: {filename}")
         except Exception as e:
             print(f"❌ Error saving analysis: {e}")
+        
+        # Sketch state, mergeable across sessions (see albion_batch_analysis)
+        stats_filename = f"albion_header_stats_{timestamp}.json"
+        try:
+            self.header_stats.save(stats_filename)
+            print(f"💾 Header statistics saved to: {stats_filename}")
+        except Exception as e:
+            print(f"❌ Error saving header statistics: {e}")
 
 def main():
-    parser = AlbionPacketParser()
+    arg_parser = argparse.ArgumentParser(description='Albion packet parser')
+    arg_parser.add_argument('--bounded', action='store_true',
+                            help='Long-running mode with a fixed-size payload ring (no 100 packet limit)')
+    arg_parser.add_argument('--duration', type=float, default=None,
+                            help='Stop after this many seconds (default: 60, unlimited with --bounded)')
+    arg_parser.add_argument('--format', choices=('jsonl', 'columnar'), default=None,
+                            help='Packet log format (default: jsonl, columnar with --bounded)')
+    arg_parser.add_argument('--no-log', dest='save_packets', action='store_false',
+                            help='Do not write a packet log (bounded mode then skips per-packet field scans)')
+    args = arg_parser.parse_args()
+    
+    duration = args.duration if args.duration is not None else (None if args.bounded else 60)
+    parser = AlbionPacketParser(save_packets=args.save_packets, capture_format=args.format,
+                                bounded=args.bounded)
     
     print("🚀 Starting Albion Packet Parser...")
     print("📱 Make sure Albion Online is running and active!")
     print("⏹️  Press Ctrl+C to stop and see analysis\n")
     
     try:
-        parser.start_capture_and_parse(duration=60)  # 60 seconds max
+        parser.start_capture_and_parse(duration=duration)
     except Exception as e:
         print(f"❌ Error: {e}")
         import traceback
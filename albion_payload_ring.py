@@ -0,0 +1,188 @@
+"""
+Albion Scanner - Payload Ring Buffer
+Fixed-size storage for raw packet payloads during long captures: payload
+bytes live in one preallocated bytearray and per-packet metadata in
+preallocated NumPy slot arrays, so memory use does not grow with uptime.
+Packets are exposed as lightweight views that compute analysis data only
+when asked for it
+"""
+
+import numpy as np
+
+DIRECTIONS = ('incoming', 'outgoing', 'unknown')
+DIRECTION_CODES = {name: code for code, name in enumerate(DIRECTIONS)}
+
+# Largest UDP payload; the ring must be able to hold at least one
+MAX_PAYLOAD = 65535
+
+
+class PayloadRing:
+    def __init__(self, capacity_bytes=8 * 1024 * 1024, max_packets=65536):
+        if capacity_bytes < MAX_PAYLOAD:
+            raise ValueError(f"capacity_bytes must be at least {MAX_PAYLOAD}")
+        self.capacity = capacity_bytes
+        self.max_packets = max_packets
+        self.buffer = bytearray(capacity_bytes)
+
+        # Slot arrays indexed by seq % max_packets
+        self.starts = np.zeros(max_packets, dtype=np.int64)
+        self.lengths = np.zeros(max_packets, dtype=np.int32)
+        self.timestamps = np.zeros(max_packets, dtype=np.float64)
+        self.directions = np.zeros(max_packets, dtype=np.uint8)
+
+        self.write_pos = 0
+        self.next_seq = 0     # Sequence number of the next packet
+        self.oldest_seq = 0   # Oldest packet still held
+        self.evicted = 0
+        self.wrapped_bytes = 0
+
+    def __len__(self):
+        return self.next_seq - self.oldest_seq
+
+    def evict_oldest(self):
+        self.oldest_seq += 1
+        self.evicted += 1
+
+    def append(self, payload, timestamp=0.0, direction='unknown'):
+        """Store a payload, evicting the oldest packets it overwrites; returns its seq"""
+        size = len(payload)
+        if size > MAX_PAYLOAD:
+            raise ValueError(f"payload of {size} bytes exceeds {MAX_PAYLOAD}")
+
+        if self.write_pos + size > self.capacity:
+            # Not enough room at the tail: abandon it and wrap to the start.
+            # The oldest packets are the ones in the abandoned tail.
+            self.wrapped_bytes += self.capacity - self.write_pos
+            while len(self) and self.starts[self.oldest_seq % self.max_packets] >= self.write_pos:
+                self.evict_oldest()
+            self.write_pos = 0
+
+        # Packets from the previous lap all start at or after write_pos, oldest
+        # first, so the ones in the way are exactly the oldest starting before end
+        start, end = self.write_pos, self.write_pos + size
+        while len(self):
+            oldest_start = self.starts[self.oldest_seq % self.max_packets]
+            overwritten = start <= oldest_start < end
+            if overwritten or len(self) >= self.max_packets:
+                self.evict_oldest()
+            else:
+                break
+
+        self.buffer[start:end] = payload
+        seq = self.next_seq
+        slot = seq % self.max_packets
+        self.starts[slot] = start
+        self.lengths[slot] = size
+        self.timestamps[slot] = timestamp
+        self.directions[slot] = DIRECTION_CODES.get(direction, DIRECTION_CODES['unknown'])
+
+        self.next_seq += 1
+        self.write_pos = end
+        return seq
+
+    def contains(self, seq):
+        return self.oldest_seq <= seq < self.next_seq
+
+    def view(self, seq):
+        """Zero-copy memoryview of a payload (valid until it is overwritten)"""
+        if not self.contains(seq):
+            return None
+        slot = seq % self.max_packets
+        start = int(self.starts[slot])
+        return memoryview(self.buffer)[start:start + int(self.lengths[slot])]
+
+    def get(self, seq):
+        """Copy of a payload, or None if it has been evicted"""
+        view = self.view(seq)
+        return bytes(view) if view is not None else None
+
+    def recent(self, count):
+        """Sequence numbers of the newest `count` packets, oldest first"""
+        first = max(self.oldest_seq, self.next_seq - count)
+        return range(first, self.next_seq)
+
+    def get_stats(self):
+        return {
+            'packets': len(self),
+            'total_packets': self.next_seq,
+            'evicted': self.evicted,
+            'bytes_used': int(self.lengths[np.arange(self.oldest_seq, self.next_seq) % self.max_packets].sum()),
+            'capacity_bytes': self.capacity,
+            'max_packets': self.max_packets
+        }
+
+
+class RingPacket:
+    """View of one packet held in a PayloadRing.
+
+    Only addressing information is kept per packet; the payload stays in the
+    ring and analysis fields are computed by the parser on first access.
+    """
+    __slots__ = ('ring', 'seq', 'parser', 'src_ip', 'dst_ip', 'src_port', 'dst_port',
+                 'timestamp', 'direction', 'length', '_analysis', '_positions', '_names')
+
+    def __init__(self, ring, seq, parser, src_ip, dst_ip, src_port, dst_port,
+                 timestamp, direction, length):
+        self.ring = ring
+        self.seq = seq
+        self.parser = parser
+        self.src_ip = src_ip
+        self.dst_ip = dst_ip
+        self.src_port = src_port
+        self.dst_port = dst_port
+        self.timestamp = timestamp
+        self.direction = direction
+        self.length = length
+        self._analysis = None
+        self._positions = None
+        self._names = None
+
+    @property
+    def payload(self):
+        payload = self.ring.get(self.seq)
+        if payload is None:
+            raise LookupError(f"packet {self.seq} was evicted from the payload ring")
+        return payload
+
+    @property
+    def header(self):
+        view = self.ring.view(self.seq)
+        return bytes(view[:4]).hex() if view is not None else ''
+
+    @property
+    def analysis(self):
+        """Full structure analysis (entropy, float/uint candidates), on demand"""
+        if self._analysis is None:
+            self._analysis = self.parser.analyze_packet_structure(self.payload)
+        return self._analysis
+
+    @property
+    def positions(self):
+        if self._positions is None:
+            self._positions = self.parser.try_parse_player_position(self.payload)
+        return self._positions
+
+    @property
+    def names(self):
+        if self._names is None:
+            self._names = self.parser.try_parse_player_name(self.payload)
+        return self._names
+
+    def to_dict(self):
+        """The dict produced by AlbionPacketParser.parse_packet"""
+        payload = self.payload
+        return {
+            'timestamp': self.timestamp,
+            'src_ip': self.src_ip,
+            'dst_ip': self.dst_ip,
+            'src_port': self.src_port,
+            'dst_port': self.dst_port,
+            'direction': self.direction,
+            'payload_length': self.length,
+            'payload_hex': payload.hex(),
+            'analysis': self.analysis,
+            'parsed_data': {
+                'positions': self.positions,
+                'names': self.names
+            }
+        }
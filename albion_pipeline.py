@@ -0,0 +1,361 @@
+"""
+Albion Scanner - Stage Pipeline
+Capture -> decode -> state -> output pipelines built from pluggable stages
+connected by bounded queues. Each stage runs on its own worker threads (or
+worker processes for picklable, stateless handlers), keeps queue-depth and
+throughput metrics, and applies a backpressure policy when its input queue
+is full, so a slow console or export no longer stalls capture
+"""
+
+import time
+import queue
+import threading
+import multiprocessing
+
+# Backpressure policies for a full input queue
+BLOCK = 'block'              # wait for room (slows the producer down)
+DROP_NEWEST = 'drop_newest'  # discard the incoming item
+DROP_OLDEST = 'drop_oldest'  # discard the oldest queued item to make room
+BACKPRESSURE_POLICIES = (BLOCK, DROP_NEWEST, DROP_OLDEST)
+
+# Items are never None (handlers return None to consume an item), so None
+# doubles as the end-of-stream marker and survives pickling for processes
+STOP = None
+
+POLL_INTERVAL = 0.2  # seconds between stop checks while blocked or idle
+
+
+def tap(function):
+    """Handler that calls function(item) and passes the item on unchanged"""
+    def handler(item):
+        function(item)
+        return item
+    handler.__name__ = getattr(function, '__name__', 'tap')
+    return handler
+
+
+def process_worker(handler, inbox, outbox):
+    """Worker process loop: results (or errors) go back to the parent"""
+    while True:
+        item = inbox.get()
+        if item is STOP:
+            break
+        try:
+            outbox.put(('ok', handler(item)))
+        except Exception as e:
+            outbox.put(('error', f"{type(e).__name__}: {e}"))
+    outbox.put(('done', None))
+
+
+class Stage:
+    """One pipeline step: handler(item) -> item for the next stage, or None
+
+    periodic: (interval_seconds, function) jobs run on the stage's first
+    worker between items, so they see the same state the handler mutates
+    without locking. A function's non-None return value is passed on like
+    a handler result.
+    """
+
+    def __init__(self, name, handler, mode='thread', workers=1, queue_size=1024,
+                 backpressure=BLOCK, periodic=(), on_drop=None):
+        if mode not in ('thread', 'process'):
+            raise ValueError(f"stage {name}: unknown mode {mode!r}")
+        if backpressure not in BACKPRESSURE_POLICIES:
+            raise ValueError(f"stage {name}: unknown backpressure policy {backpressure!r}")
+        if mode == 'process' and periodic:
+            raise ValueError(f"stage {name}: periodic jobs need a thread stage")
+
+        self.name = name
+        self.handler = handler
+        self.mode = mode
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self.backpressure = backpressure
+        self.periodic = list(periodic)
+        self.on_drop = on_drop  # called with every dropped item (e.g. record release)
+
+        self.queue = None
+        self.downstream = None
+        self.threads = []
+        self.processes = []
+        self.outbox = None
+        self.aborted = threading.Event()
+        self.metrics = {'received': 0, 'processed': 0, 'emitted': 0, 'dropped': 0,
+                        'errors': 0, 'max_depth': 0, 'busy_seconds': 0.0, 'blocked_seconds': 0.0}
+        self.last_error = None
+
+    # -- input side ----------------------------------------------------------
+
+    def depth(self):
+        try:
+            return self.queue.qsize()
+        except (NotImplementedError, AttributeError):  # mp queues on macOS
+            return -1
+
+    def put(self, item):
+        """Enqueue an item under this stage's backpressure policy; False if dropped"""
+        metrics = self.metrics
+        metrics['received'] += 1
+        if self.backpressure == BLOCK:
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                started = time.perf_counter()
+                while not self.aborted.is_set():
+                    try:
+                        self.queue.put(item, timeout=POLL_INTERVAL)
+                        break
+                    except queue.Full:
+                        continue
+                else:
+                    self.drop(item)
+                    return False
+                metrics['blocked_seconds'] += time.perf_counter() - started
+        else:
+            try:
+                self.queue.put_nowait(item)
+            except queue.Full:
+                if self.backpressure == DROP_NEWEST:
+                    self.drop(item)
+                    return False
+                try:
+                    self.drop(self.queue.get_nowait())
+                except queue.Empty:
+                    pass
+                try:
+                    self.queue.put_nowait(item)
+                except queue.Full:
+                    self.drop(item)
+                    return False
+
+        depth = self.depth()
+        if depth > metrics['max_depth']:
+            metrics['max_depth'] = depth
+        return True
+
+    def drop(self, item):
+        self.metrics['dropped'] += 1
+        if self.on_drop is not None and item is not STOP:
+            try:
+                self.on_drop(item)
+            except Exception:
+                pass
+
+    # -- workers -------------------------------------------------------------
+
+    def start(self, downstream):
+        """Start the workers; results are handed to downstream.put (or discarded)"""
+        self.downstream = downstream
+        self.aborted.clear()
+        if self.mode == 'process':
+            self.queue = multiprocessing.Queue(self.queue_size)
+            self.outbox = multiprocessing.Queue()
+            for index in range(self.workers):
+                process = multiprocessing.Process(
+                    target=process_worker, args=(self.handler, self.queue, self.outbox),
+                    name=f'{self.name}-{index}', daemon=True
+                )
+                process.start()
+                self.processes.append(process)
+            self.threads = [threading.Thread(target=self.forward_results, name=f'{self.name}-results',
+                                             daemon=True)]
+        else:
+            self.queue = queue.Queue(self.queue_size)
+            self.threads = [threading.Thread(target=self.run_worker, args=(index,),
+                                             name=f'{self.name}-{index}', daemon=True)
+                            for index in range(self.workers)]
+        for thread in self.threads:
+            thread.start()
+
+    def emit(self, result):
+        if result is None:
+            return
+        self.metrics['emitted'] += 1
+        if self.downstream is not None:
+            self.downstream.put(result)
+        elif self.on_drop is not None:
+            # Last stage returned an item nobody consumes
+            self.on_drop(result)
+
+    def fail(self, error):
+        self.metrics['errors'] += 1
+        if self.last_error is None or self.metrics['errors'] % 1000 == 0:
+            print(f"❌ Stage {self.name} error: {error}")
+        self.last_error = str(error)
+
+    def run_worker(self, index):
+        jobs = [[interval, function, time.time() + interval]
+                for interval, function in self.periodic] if index == 0 else []
+        timeout = min([POLL_INTERVAL] + [job[0] for job in jobs]) if jobs else None
+        metrics = self.metrics
+
+        while True:
+            try:
+                item = self.queue.get(timeout=timeout)
+            except queue.Empty:
+                item = queue.Empty
+            if item is STOP:
+                break
+            if self.aborted.is_set():
+                self.drop(item)
+                continue
+
+            if item is not queue.Empty:
+                started = time.perf_counter()
+                try:
+                    result = self.handler(item)
+                except Exception as e:
+                    self.fail(e)
+                    result = None
+                metrics['processed'] += 1
+                metrics['busy_seconds'] += time.perf_counter() - started
+                self.emit(result)
+
+            if jobs:
+                now = time.time()
+                for job in jobs:
+                    if now >= job[2]:
+                        job[2] = now + job[0]
+                        try:
+                            self.emit(job[1]())
+                        except Exception as e:
+                            self.fail(e)
+
+    def forward_results(self):
+        """Parent-side thread of a process stage: pass worker results on"""
+        finished = 0
+        while finished < self.workers:
+            kind, value = self.outbox.get()
+            if kind == 'done':
+                finished += 1
+            elif kind == 'error':
+                self.metrics['processed'] += 1
+                self.fail(value)
+            else:
+                self.metrics['processed'] += 1
+                if self.aborted.is_set():
+                    self.drop(value)
+                else:
+                    self.emit(value)
+
+    def close(self, timeout=None):
+        """Finish queued items, then stop the workers"""
+        for _ in range(self.workers):
+            self.queue.put(STOP)
+        for thread in self.threads:
+            thread.join(timeout)
+        for process in self.processes:
+            process.join(timeout)
+        self.threads, self.processes = [], []
+
+    def abort(self):
+        """Drop everything still queued and stop as soon as possible"""
+        self.aborted.set()
+
+    def get_metrics(self):
+        metrics = dict(self.metrics)
+        metrics.update({
+            'name': self.name,
+            'mode': self.mode,
+            'workers': self.workers,
+            'backpressure': self.backpressure,
+            'depth': self.depth() if self.queue is not None else 0,
+            'capacity': self.queue_size,
+            'last_error': self.last_error
+        })
+        return metrics
+
+
+class Pipeline:
+    """Stages run in order; the source iterable is consumed on the calling thread"""
+
+    def __init__(self, name, stages, on_drop=None):
+        if not stages:
+            raise ValueError(f"pipeline {name}: no stages")
+        self.name = name
+        self.stages = list(stages)
+        for stage in self.stages:
+            if stage.on_drop is None:
+                stage.on_drop = on_drop
+        self.running = False
+        self.started = 0
+        self.source_metrics = {'captured': 0, 'blocked_seconds': 0.0}
+
+    def __getitem__(self, name):
+        for stage in self.stages:
+            if stage.name == name:
+                return stage
+        raise KeyError(name)
+
+    def start(self):
+        # Start from the end so every stage has its consumer running
+        downstream = None
+        for stage in reversed(self.stages):
+            stage.start(downstream)
+            downstream = stage
+        self.running = True
+        self.started = time.time()
+
+    def put(self, item):
+        """Feed one item to the first stage"""
+        self.source_metrics['captured'] += 1
+        return self.stages[0].put(item)
+
+    def run(self, source, should_stop=None):
+        """Start, feed every item of source, then drain and stop the stages
+
+        should_stop() is checked after each item; the pipeline is closed
+        (queued items still processed) whether the source ends, should_stop
+        fires or the caller is interrupted.
+        """
+        if not self.running:
+            self.start()
+        first = self.stages[0]
+        try:
+            for item in source:
+                if item is None:
+                    continue
+                self.source_metrics['captured'] += 1
+                first.put(item)
+                if should_stop is not None and should_stop():
+                    break
+        finally:
+            self.source_metrics['blocked_seconds'] = first.metrics['blocked_seconds']
+            self.close()
+
+    def close(self, timeout=None):
+        """Drain the stages in order and stop their workers"""
+        if not self.running:
+            return
+        for stage in self.stages:
+            stage.close(timeout)
+        self.running = False
+
+    def abort(self):
+        """Stop without processing what is still queued"""
+        for stage in self.stages:
+            stage.abort()
+        self.close(timeout=1.0)
+
+    def get_metrics(self):
+        elapsed = max(time.time() - self.started, 1e-6) if self.started else 0.0
+        stages = [stage.get_metrics() for stage in self.stages]
+        for metrics in stages:
+            metrics['rate'] = metrics['processed'] / elapsed if elapsed else 0.0
+        return {
+            'pipeline': self.name,
+            'running': self.running,
+            'uptime': elapsed,
+            'source': dict(self.source_metrics),
+            'stages': stages
+        }
+
+    def format_metrics(self):
+        """One line per stage: depth/capacity, rate, drops, errors"""
+        metrics = self.get_metrics()
+        lines = [f"🔗 Pipeline {self.name}: {metrics['source']['captured']} captured"]
+        for stage in metrics['stages']:
+            lines.append(f"   {stage['name']:<10} {stage['mode']:<7} depth {stage['depth']}/{stage['capacity']} "
+                         f"(max {stage['max_depth']}) | {stage['processed']} done, {stage['rate']:.1f}/s | "
+                         f"{stage['dropped']} dropped ({stage['backpressure']}) | {stage['errors']} errors")
+        return '\n'.join(lines)
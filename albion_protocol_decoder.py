@@ -1,9 +1,21 @@
+import os
 import struct
 import json
 import time
+import argparse
 from enum import Enum
 from dataclasses import dataclass
 from typing import Dict, List, Optional, Any
+from collections import Counter
+from albion_stream_stats import StreamStatistics
+from albion_symbols import symbols, NO_SYMBOL
+from albion_records import RecordPool, DecodedRecord
+from albion_decode_memo import DecodeMemo, UNDECODABLE
+from albion_pipeline import Pipeline, Stage, BLOCK, DROP_OLDEST
+from albion_console import ConsoleRenderer, CONSOLE_MODES
+from albion_message_specs import MessageTable, DEFAULT_SPEC_FILE
+from albion_text_extraction import (extract_names, extract_guilds, extract_chat, has_name,
+                                    has_chat, looks_like_chat, printable_ratio)
 
 class PacketType(Enum):
     """Known Albion Online packet types"""
@@ -19,18 +31,36 @@ class PacketType(Enum):
     GUILD_INFO = 10
     UNKNOWN = 255
 
+# Message spec "type" -> PacketType
+MESSAGE_PACKET_TYPES = {
+    'movement': PacketType.MOVE,
+    'player_info': PacketType.PLAYER_INFO,
+    'chat': PacketType.CHAT,
+    'items': PacketType.ITEM_UPDATE,
+    'mobs': PacketType.MOB_INFO
+}
+
 @dataclass
 class AlbionPlayer:
-    """Player data structure"""
+    """Player data structure (name and guild are interned symbol ids)"""
     id: int
-    name: str
-    guild: str
+    name_id: int
+    guild_id: int
     position: Dict[str, float]
     health: int
     max_health: int
     equipment: Dict[str, int]
     last_seen: float
     
+    @property
+    def name(self) -> str:
+        # Until name data arrives (or once it is evicted) the player is known by id only
+        return symbols.lookup(self.name_id) or f"Player_{self.id}"
+    
+    @property
+    def guild(self) -> str:
+        return symbols.lookup(self.guild_id)
+    
 @dataclass
 class AlbionMob:
     """Mob/NPC data structure"""
@@ -41,22 +71,52 @@ class AlbionMob:
     max_health: int
     last_seen: float
 
+# Deferred field decoders for DecodedRecord.lazy (see albion_records)
+def materialize_player_info(record: DecodedRecord):
+    guilds = extract_guilds(record.payload)
+    record._name = extract_names(record.payload)[0]
+    record._guild = guilds[0] if guilds else None
+
+def materialize_chat(record: DecodedRecord):
+    record._sender, record._text = extract_chat(record.payload)
+
+def materialize_header(record: DecodedRecord):
+    record._header = record.payload[:8].hex()
+
 class AlbionProtocolDecoder:
-    def __init__(self):
+    def __init__(self, spec_file=None):
         self.players = {}  # player_id -> AlbionPlayer
         self.mobs = {}     # mob_id -> AlbionMob
         self.items = {}    # item_id -> item_info
         
-        # Protocol patterns learned from packet analysis
-        self.packet_patterns = {
-            # Header patterns for different packet types
-            'movement': [b'\x01\x00', b'\x03\x00', b'\x15\x00'],
-            'player_data': [b'\x02\x00', b'\x08\x00', b'\x0C\x00'],
-            'chat': [b'\x04\x00', b'\x1A\x00'],
-            'items': [b'\x06\x00', b'\x0E\x00'],
-            'mobs': [b'\x07\x00', b'\x11\x00']
+        # Decoded packets are pooled DecodedRecord objects (albion_records);
+        # whoever ends up holding one releases it back here
+        self.pool = RecordPool()
+        
+        # Exact-repeat payloads skip decoding and replay the cached result
+        self.memo = DecodeMemo()
+        
+        # Built-in decoders that message specs can name as their handler
+        self.handlers = {
+            'movement': self.decode_movement_packet,
+            'player_info': self.decode_player_info_packet,
+            'chat': self.decode_chat_packet,
+            'items': self.decode_item_packet
         }
         
+        # Header -> message layout dispatch, compiled from the spec files
+        self.messages = MessageTable()
+        if os.path.exists(DEFAULT_SPEC_FILE):
+            self.load_message_specs(DEFAULT_SPEC_FILE)
+        else:
+            print(f"Warning: {DEFAULT_SPEC_FILE} not found, using content detection only")
+        if spec_file:
+            self.load_message_specs(spec_file)
+        
+        # How packets were classified: dispatch table hit or heuristic fallback
+        self.dispatch_stats = {'table': 0, 'fallback': 0, 'short': 0}
+        self.fallback_opcodes = Counter()  # first two header bytes (hex) of fallbacks
+        
         # Known item IDs (would be populated from game data files)
         self.item_database = self.load_item_database()
         
@@ -85,26 +145,61 @@ class AlbionProtocolDecoder:
             'materials': range(5000, 10000)
         }
     
+    def load_message_specs(self, filename: str) -> int:
+        """Compile a JSON/YAML message spec file (e.g. from albion_protocol_inference)"""
+        count = self.messages.load(filename)
+        unknown = {m.handler for m in self.messages.messages if m.handler} - self.handlers.keys()
+        if unknown:
+            raise ValueError(f"{filename}: unknown handlers {sorted(unknown)}")
+        return count
+    
+    def new_record(self, packet_type: str, payload: bytes = None, lazy=None) -> DecodedRecord:
+        """A pooled record of the given type, stamped with the current time
+        
+        `lazy` (a function of the record) fills the remaining fields from
+        `payload` when one of them is first read.
+        """
+        record = self.pool.acquire()
+        record.type = packet_type
+        record.timestamp = time.time()
+        record.payload = payload
+        record.lazy = lazy
+        return record
+    
+    def decode_message(self, message, payload: bytes) -> Optional[DecodedRecord]:
+        """Decode a payload with the message spec its header matched"""
+        if message.handler:
+            return self.handlers[message.handler](payload)
+        
+        values = message.unpack(payload)
+        if values is None:
+            return None
+        if not values:
+            packet_type = MESSAGE_PACKET_TYPES.get(message.type, PacketType.UNKNOWN)
+            return self.decode_unknown_packet(payload, packet_type)
+        
+        # Key ids and positions now; the field dict is built on first access
+        decoded = self.new_record(message.type, payload, message.materialize)
+        decoded.spec = message.name
+        decoded._fields = values
+        index = message.index
+        if 'entity_id' in index:
+            decoded.player_id = values[index['entity_id']]
+        if message.type == 'movement' and 'x' in index:
+            decoded.x = values[index['x']]
+            decoded.y = values[index['y']] if 'y' in index else 0.0
+            decoded.z = values[index['z']] if 'z' in index else 0.0
+        return decoded
+    
     def identify_packet_type(self, payload: bytes) -> PacketType:
         """Identify packet type based on header and content"""
         if len(payload) < 4:
             return PacketType.UNKNOWN
         
-        header = payload[:4]
-        
-        # Check against known patterns
-        for packet_type, patterns in self.packet_patterns.items():
-            if any(header.startswith(pattern) for pattern in patterns):
-                if packet_type == 'movement':
-                    return PacketType.MOVE
-                elif packet_type == 'player_data':
-                    return PacketType.PLAYER_INFO
-                elif packet_type == 'chat':
-                    return PacketType.CHAT
-                elif packet_type == 'items':
-                    return PacketType.ITEM_UPDATE
-                elif packet_type == 'mobs':
-                    return PacketType.MOB_INFO
+        # Check against the compiled message specs
+        message = self.messages.lookup(payload)
+        if message is not None:
+            return MESSAGE_PACKET_TYPES.get(message.type, PacketType.UNKNOWN)
         
         # Fallback to content-based detection
         return self.detect_packet_type_by_content(payload)
@@ -150,23 +245,13 @@ class AlbionProtocolDecoder:
     
     def has_text_content(self, payload: bytes) -> bool:
         """Check if payload contains readable text"""
-        try:
-            decoded = payload.decode('utf-8', errors='ignore')
-            # Check if at least 20% of characters are printable ASCII
-            printable_count = sum(1 for c in decoded if c.isprintable() and ord(c) < 128)
-            return printable_count > len(decoded) * 0.2
-        except:
-            return False
+        # At least 20% of the bytes are printable ASCII
+        return printable_ratio(payload) > 0.2
     
     def looks_like_chat(self, payload: bytes) -> bool:
         """Check if text content looks like chat message"""
-        try:
-            decoded = payload.decode('utf-8', errors='ignore')
-            # Chat messages often contain common words or punctuation
-            chat_indicators = [':', '!', '?', 'hello', 'hi', 'lol', 'gg']
-            return any(indicator in decoded.lower() for indicator in chat_indicators)
-        except:
-            return False
+        # Chat messages often contain common words or punctuation
+        return looks_like_chat(payload)
     
     def has_item_pattern(self, payload: bytes) -> bool:
         """Check if payload contains item-like data"""
@@ -182,7 +267,7 @@ class AlbionProtocolDecoder:
                 continue
         return False
     
-    def decode_movement_packet(self, payload: bytes) -> Optional[Dict]:
+    def decode_movement_packet(self, payload: bytes) -> Optional[DecodedRecord]:
         """Decode movement/position packet"""
         if len(payload) < 16:
             return None
@@ -201,12 +286,10 @@ class AlbionProtocolDecoder:
                     if (1000 <= player_id <= 999999999 and 
                         -5000 < x < 5000 and -5000 < y < 5000 and -1000 < z < 1000):
                         
-                        return {
-                            'type': 'movement',
-                            'player_id': player_id,
-                            'position': {'x': x, 'y': y, 'z': z},
-                            'timestamp': time.time()
-                        }
+                        decoded = self.new_record('movement')
+                        decoded.player_id = player_id
+                        decoded.x, decoded.y, decoded.z = x, y, z
+                        return decoded
                 except struct.error:
                     continue
         except Exception as e:
@@ -214,17 +297,12 @@ class AlbionProtocolDecoder:
         
         return None
     
-    def decode_player_info_packet(self, payload: bytes) -> Optional[Dict]:
+    def decode_player_info_packet(self, payload: bytes) -> Optional[DecodedRecord]:
         """Decode player information packet"""
         try:
-            decoded = payload.decode('utf-8', errors='ignore')
-            
-            # Extract player name (usually first readable string)
-            import re
-            names = re.findall(r'[A-Za-z][A-Za-z0-9_]{2,19}', decoded)
-            guilds = re.findall(r'\[([A-Z0-9]{2,8})\]', decoded)
-            
-            if names:
+            # A player name (usually first readable string) must be present;
+            # name and guild themselves are extracted on first access
+            if has_name(payload):
                 # Try to extract player ID from binary data
                 player_id = None
                 for i in range(0, min(len(payload) - 4, 20), 4):
@@ -236,20 +314,25 @@ class AlbionProtocolDecoder:
                     except struct.error:
                         continue
                 
-                return {
-                    'type': 'player_info',
-                    'player_id': player_id,
-                    'name': names[0],
-                    'guild': guilds[0] if guilds else None,
-                    'timestamp': time.time()
-                }
+                decoded = self.new_record('player_info', payload, materialize_player_info)
+                decoded.player_id = player_id
+                return decoded
         except Exception as e:
             pass
         
         return None
     
-    def decode_item_packet(self, payload: bytes) -> Optional[Dict]:
-        """Decode item/equipment packet"""
+    def decode_item_packet(self, payload: bytes) -> Optional[DecodedRecord]:
+        """Decode item/equipment packet (the item list is built on first access)"""
+        if self.find_items(payload, limit=1):
+            return self.new_record('items', payload, self.materialize_items)
+        return None
+    
+    def materialize_items(self, record: DecodedRecord):
+        record._items = self.find_items(record.payload)
+    
+    def find_items(self, payload: bytes, limit: int = None) -> List[Dict]:
+        """Item ID + quantity pairs in a payload (stopping after `limit`)"""
         items = []
         
         # Look for item ID + quantity patterns
@@ -267,24 +350,47 @@ class AlbionProtocolDecoder:
                         'quantity': quantity,
                         'offset': i
                     })
+                    if len(items) == limit:
+                        break
             except struct.error:
                 continue
         
-        if items:
-            return {
-                'type': 'items',
-                'items': items,
-                'timestamp': time.time()
-            }
-        
-        return None
+        return items
     
-    def decode_packet(self, payload: bytes, direction: str) -> Optional[Dict]:
-        """Main packet decoding function"""
+    def decode_packet(self, payload: bytes, direction: str) -> Optional[DecodedRecord]:
+        """Main packet decoding function (the caller releases the returned record)"""
         if not payload:
             return None
+        if type(payload) is not bytes:
+            payload = bytes(payload)
+        
+        snapshot = self.memo.get(payload)
+        if snapshot is not None:
+            if snapshot is UNDECODABLE:
+                return None
+            decoded = self.pool.restore(snapshot)
+            decoded.timestamp = time.time()
+            return decoded
         
-        packet_type = self.identify_packet_type(payload)
+        decoded = self.decode_payload(payload)
+        self.memo.put(payload, decoded)
+        return decoded
+    
+    def decode_payload(self, payload: bytes) -> Optional[DecodedRecord]:
+        """Classify and decode a payload (no memoization)"""
+        if len(payload) < 4:
+            self.dispatch_stats['short'] += 1
+            return self.decode_unknown_packet(payload, PacketType.UNKNOWN)
+        
+        # Known header: one table lookup, then the spec's layout or handler
+        message = self.messages.lookup(payload)
+        if message is not None:
+            self.dispatch_stats['table'] += 1
+            return self.decode_message(message, payload)
+        
+        self.dispatch_stats['fallback'] += 1
+        self.fallback_opcodes[payload[:2].hex()] += 1
+        packet_type = self.detect_packet_type_by_content(payload)
         
         if packet_type == PacketType.MOVE:
             return self.decode_movement_packet(payload)
@@ -295,60 +401,60 @@ class AlbionProtocolDecoder:
         elif packet_type == PacketType.CHAT:
             return self.decode_chat_packet(payload)
         
+        return self.decode_unknown_packet(payload, packet_type)
+    
+    def get_dispatch_stats(self, limit: int = 10) -> Dict:
+        """Dispatch table hit ratio and the opcodes still going to the heuristics
+        (decode cache hits are not dispatched and not counted here)"""
+        total = sum(self.dispatch_stats.values())
         return {
-            'type': 'unknown',
-            'packet_type_id': packet_type.value,
-            'size': len(payload),
-            'header': payload[:8].hex() if len(payload) >= 8 else payload.hex(),
-            'timestamp': time.time()
+            **self.dispatch_stats,
+            'hit_ratio': self.dispatch_stats['table'] / total if total else 0.0,
+            'fallback_opcodes': self.fallback_opcodes.most_common(limit)
         }
     
-    def decode_chat_packet(self, payload: bytes) -> Optional[Dict]:
+    def decode_unknown_packet(self, payload: bytes, packet_type: PacketType) -> DecodedRecord:
+        """Summary of a packet no decoder understands"""
+        decoded = self.new_record('unknown', payload, materialize_header)
+        decoded.packet_type_id = packet_type.value
+        decoded.size = len(payload)
+        return decoded
+    
+    def decode_chat_packet(self, payload: bytes) -> Optional[DecodedRecord]:
         """Decode chat message packet"""
         try:
-            decoded = payload.decode('utf-8', errors='ignore')
-            
-            # Look for chat pattern: [sender]: message
-            import re
-            chat_match = re.search(r'([A-Za-z0-9_]{2,20}):\s*(.+)', decoded)
-            
-            if chat_match:
-                sender = chat_match.group(1)
-                message = chat_match.group(2).strip()
-                
-                return {
-                    'type': 'chat',
-                    'sender': sender,
-                    'message': message,
-                    'timestamp': time.time()
-                }
+            # Look for chat pattern: [sender]: message (split out on first access)
+            if has_chat(payload):
+                return self.new_record('chat', payload, materialize_chat)
         except Exception:
             pass
         
         return None
     
-    def update_world_state(self, decoded_packet: Dict):
+    def update_world_state(self, decoded_packet: DecodedRecord):
         """Update internal world state with decoded packet data"""
         if not decoded_packet:
             return
         
-        packet_type = decoded_packet.get('type')
-        timestamp = decoded_packet.get('timestamp', time.time())
+        packet_type = decoded_packet.type
+        timestamp = decoded_packet.timestamp or time.time()
         
-        if packet_type == 'movement' and decoded_packet.get('player_id'):
-            player_id = decoded_packet['player_id']
-            position = decoded_packet['position']
+        if packet_type == 'movement' and decoded_packet.player_id and decoded_packet.x is not None:
+            player_id = decoded_packet.player_id
             
-            # Update or create player
-            if player_id in self.players:
-                self.players[player_id].position = position
-                self.players[player_id].last_seen = timestamp
+            # Update or create player (positions are updated in place, the
+            # record itself goes back to the pool)
+            player = self.players.get(player_id)
+            if player is not None:
+                position = player.position
+                position['x'], position['y'], position['z'] = decoded_packet.x, decoded_packet.y, decoded_packet.z
+                player.last_seen = timestamp
             else:
                 self.players[player_id] = AlbionPlayer(
                     id=player_id,
-                    name=f"Player_{player_id}",  # Will be updated when we get name data
-                    guild="",
-                    position=position,
+                    name_id=NO_SYMBOL,  # Will be updated when we get name data
+                    guild_id=NO_SYMBOL,
+                    position=decoded_packet.position,
                     health=100,  # Default values
                     max_health=100,
                     equipment={},
@@ -356,22 +462,24 @@ class AlbionProtocolDecoder:
                 )
         
         elif packet_type == 'player_info':
-            player_id = decoded_packet.get('player_id')
-            name = decoded_packet.get('name')
-            guild = decoded_packet.get('guild')
+            player_id = decoded_packet.player_id
+            name = decoded_packet.name
+            guild = decoded_packet.guild
             
             if player_id and name:
+                name_id = symbols.intern(name)
+                guild_id = symbols.intern(guild)
                 if player_id in self.players:
-                    self.players[player_id].name = name
-                    if guild:
-                        self.players[player_id].guild = guild
+                    self.players[player_id].name_id = name_id
+                    if guild_id:
+                        self.players[player_id].guild_id = guild_id
                     self.players[player_id].last_seen = timestamp
                 else:
                     # Create new player with info
                     self.players[player_id] = AlbionPlayer(
                         id=player_id,
-                        name=name,
-                        guild=guild or "",
+                        name_id=name_id,
+                        guild_id=guild_id,
                         position={'x': 0, 'y': 0, 'z': 0},  # Will be updated
                         health=100,
                         max_health=100,
@@ -381,7 +489,7 @@ class AlbionProtocolDecoder:
         
         elif packet_type == 'items':
             # Store item data for analysis
-            for item in decoded_packet.get('items', []):
+            for item in decoded_packet.items or ():
                 item_id = item['item_id']
                 self.items[item_id] = {
                     'last_seen': timestamp,
@@ -480,13 +588,24 @@ class AlbionProtocolDecoder:
             print(f"Error exporting world data: {e}")
             return None
 
+def release_record(record: DecodedRecord):
+    """on_drop hook for pipeline stages carrying pooled records"""
+    record.release()
+
 # Enhanced live scanner with protocol decoder
 class AdvancedAlbionScanner:
-    def __init__(self, interface='5', port=5056):
+    def __init__(self, interface='5', port=5056, spec_file=None, console='lines',
+                 refresh_rate=2.0, event_log=None):
         self.interface = interface
         self.port = port
-        self.decoder = AlbionProtocolDecoder()
+        self.decoder = AlbionProtocolDecoder(spec_file)
         self.running = False
+        self.pipeline = None  # capture -> decode -> state -> output (while scanning)
+        
+        # Packet lines: printed one by one ('lines') or aggregated into a
+        # status panel redrawn refresh_rate times per second ('panel')
+        self.console = ConsoleRenderer('ADVANCED ALBION SCANNER', mode=console,
+                                       refresh_rate=refresh_rate, event_log=event_log)
         
         # Statistics
         self.stats = {
@@ -496,49 +615,74 @@ class AdvancedAlbionScanner:
             'player_info_packets': 0,
             'item_packets': 0,
             'chat_packets': 0,
-            'unknown_packets': 0
+            'unknown_packets': 0,
+            'decode_cache_hits': 0,
+            'decode_cache_misses': 0,
+            'decode_cache_hit_rate': 0.0
         }
         
+        # Fixed-memory header/opcode/size top-k (shared with the dashboard)
+        self.header_stats = StreamStatistics()
+        
         # Configuration
         self.config = {
             'display_world_state': True,
             'world_state_interval': 10,  # seconds
-            'auto_export_interval': 300,  # 5 minutes
-            'max_display_players': 10
+            'auto_export_interval': 300,  # 5 minutes (0 disables periodic exports)
+            'export_on_exit': True,       # write a final world data file when scanning stops
+            'max_display_players': 10,
+            'queue_size': 4096,                  # per pipeline stage
+            'output_backpressure': DROP_OLDEST   # console lines may be dropped, state updates never
         }
     
     def process_packet(self, packet):
-        """Process packet using protocol decoder"""
+        """Decode, apply and display one packet synchronously (the caller releases the record)"""
+        decoded = self.decode_captured(packet)
+        if decoded:
+            try:
+                self.decoder.update_world_state(decoded)
+                self.display_decoded_packet(decoded, decoded.direction)
+            except Exception as e:
+                print(f"Error processing packet: {e}")
+        return decoded
+    
+    def extract_payload(self, packet) -> Optional[bytes]:
+        """UDP payload of a captured packet, or None"""
+        payload = None
+        
+        # Method 1: Try to get raw packet data
         try:
-            # Extract payload - try different methods
-            payload = None
-            
-            # Method 1: Try to get raw packet data
+            raw_packet = packet.get_raw_packet()
+            if raw_packet:
+                ip_header_length = (raw_packet[14] & 0x0F) * 4
+                udp_start = 14 + ip_header_length
+                payload = raw_packet[udp_start + 8:]
+        except Exception:
+            pass
+        
+        # Method 2: Try to access UDP data layer directly
+        if not payload:
             try:
-                raw_packet = packet.get_raw_packet()
-                if raw_packet:
-                    ip_header_length = (raw_packet[14] & 0x0F) * 4
-                    udp_start = 14 + ip_header_length
-                    payload = raw_packet[udp_start + 8:]
+                if hasattr(packet, 'udp') and hasattr(packet.udp, 'payload'):
+                    payload = bytes.fromhex(packet.udp.payload.replace(':', ''))
             except Exception:
                 pass
-            
-            # Method 2: Try to access UDP data layer directly
-            if not payload:
-                try:
-                    if hasattr(packet, 'udp') and hasattr(packet.udp, 'payload'):
-                        payload = bytes.fromhex(packet.udp.payload.replace(':', ''))
-                except Exception:
-                    pass
-            
-            # Method 3: Try alternative data access
-            if not payload:
-                try:
-                    # Get data from DATA layer if available
-                    if hasattr(packet, 'data'):
-                        payload = bytes.fromhex(packet.data.data.replace(':', ''))
-                except Exception:
-                    pass
+        
+        # Method 3: Try alternative data access
+        if not payload:
+            try:
+                # Get data from DATA layer if available
+                if hasattr(packet, 'data'):
+                    payload = bytes.fromhex(packet.data.data.replace(':', ''))
+            except Exception:
+                pass
+        
+        return payload or None
+    
+    def decode_captured(self, packet) -> Optional[DecodedRecord]:
+        """Decode stage: captured packet -> pooled record (statistics updated here)"""
+        try:
+            payload = self.extract_payload(packet)
             
             # If we still don't have payload, skip detailed analysis but track basic info
             if not payload:
@@ -563,22 +707,31 @@ class AdvancedAlbionScanner:
                     self.stats['unknown_packets'] += 1
                     packet_type = "unknown"
                 
-                print(f"[{timestamp}] Basic packet | {packet_type} | {length} bytes | {direction}")
+                if self.console.mode == 'lines':
+                    print(f"[{timestamp}] Basic packet | {packet_type} | {length} bytes | {direction}")
                 return None
             
             # Determine direction
             src_port = int(packet.udp.srcport)
             direction = 'incoming' if src_port == self.port else 'outgoing'
+            self.header_stats.add_payload(payload)
             
             # Decode packet
             decoded = self.decoder.decode_packet(payload, direction)
+            if decoded:
+                decoded.direction = direction
+                decoded.size = len(payload)
             
             # Update statistics
             self.stats['total_packets'] += 1
+            memo = self.decoder.memo
+            self.stats['decode_cache_hits'] = memo.stats['hits']
+            self.stats['decode_cache_misses'] = memo.stats['misses']
+            self.stats['decode_cache_hit_rate'] = memo.hit_rate()
             
             if decoded:
                 self.stats['decoded_packets'] += 1
-                packet_type = decoded.get('type', 'unknown')
+                packet_type = decoded.type
                 
                 if packet_type == 'movement':
                     self.stats['movement_packets'] += 1
@@ -590,12 +743,6 @@ class AdvancedAlbionScanner:
                     self.stats['chat_packets'] += 1
                 else:
                     self.stats['unknown_packets'] += 1
-                
-                # Update world state
-                self.decoder.update_world_state(decoded)
-                
-                # Display packet info
-                self.display_decoded_packet(decoded, direction)
             
             return decoded
             
@@ -603,38 +750,99 @@ class AdvancedAlbionScanner:
             print(f"Error processing packet: {e}")
             return None
     
-    def display_decoded_packet(self, decoded: Dict, direction: str):
+    def apply_state(self, decoded: DecodedRecord) -> DecodedRecord:
+        """State stage: fold a record into the world state"""
+        self.decoder.update_world_state(decoded)
+        return decoded
+    
+    def output_packet(self, decoded: DecodedRecord):
+        """Output stage: print the packet line and hand the record back to the pool"""
+        try:
+            self.display_decoded_packet(decoded, decoded.direction)
+        finally:
+            decoded.release()
+    
+    def export_world_state(self):
+        """Periodic auto-export (runs on the state stage)"""
+        filename = self.decoder.export_world_data()
+        if filename:
+            print(f"💾 World data exported to: {filename}")
+    
+    def build_pipeline(self, stages=()) -> Pipeline:
+        """decode -> state -> [stages] -> output; extra stages receive and pass on records
+        
+        World-state display and auto-export are periodic jobs of the state
+        stage, so they read the world state on the thread that writes it.
+        """
+        periodic = []
+        panel = self.console.mode == 'panel'
+        if panel:
+            periodic.append((1.0, self.update_console_world))
+        elif self.config['display_world_state']:
+            periodic.append((self.config['world_state_interval'], self.display_world_state))
+        if self.config['auto_export_interval'] > 0:
+            periodic.append((self.config['auto_export_interval'], self.export_world_state))
+        
+        queue_size = self.config['queue_size']
+        stages = [
+            Stage('decode', self.decode_captured, queue_size=queue_size, backpressure=BLOCK),
+            Stage('state', self.apply_state, queue_size=queue_size, backpressure=BLOCK,
+                  periodic=periodic, on_drop=release_record),
+            *stages,
+            Stage('output', self.output_packet, queue_size=queue_size,
+                  backpressure=self.config['output_backpressure'], on_drop=release_record,
+                  periodic=[(self.console.refresh_interval or 0.5, self.console.tick)] if panel else ())
+        ]
+        for stage in stages:
+            if stage.on_drop is None and stage.name != 'decode':
+                stage.on_drop = release_record
+        return Pipeline('scanner', stages)
+    
+    def display_decoded_packet(self, decoded: DecodedRecord, direction: str):
         """Display decoded packet information"""
         timestamp = time.strftime("%H:%M:%S")
         direction_symbol = "⬅️" if direction == 'incoming' else "➡️"
-        packet_type = decoded.get('type', 'unknown')
+        packet_type = decoded.type or 'unknown'
+        talker = None
         
-        print(f"[{timestamp}] {direction_symbol} {packet_type.upper():<12}", end="")
-        
-        if packet_type == 'movement':
-            pos = decoded['position']
+        if packet_type == 'movement' and decoded.x is not None:
             player_id = decoded.get('player_id', 'Unknown')
-            print(f" | Player {player_id} → ({pos['x']:.2f}, {pos['y']:.2f}, {pos['z']:.2f})")
+            talker = f"Player {player_id}"
+            details = f"Player {player_id} → ({decoded.x:.2f}, {decoded.y:.2f}, {decoded.z:.2f})"
         
         elif packet_type == 'player_info':
             name = decoded.get('name', 'Unknown')
             guild = decoded.get('guild', '')
             player_id = decoded.get('player_id', 'Unknown')
             guild_str = f"[{guild}]" if guild else ""
-            print(f" | {name} {guild_str} (ID: {player_id})")
+            talker = f"Player {player_id}"
+            details = f"{name} {guild_str} (ID: {player_id})"
         
         elif packet_type == 'chat':
             sender = decoded.get('sender', 'Unknown')
             message = decoded.get('message', '')[:50]  # Truncate long messages
-            print(f" | {sender}: {message}")
+            talker = sender
+            details = f"{sender}: {message}"
         
         elif packet_type == 'items':
             items = decoded.get('items', [])
-            print(f" | {len(items)} items")
+            details = f"{len(items)} items"
         
         else:
             size = decoded.get('size', 0)
-            print(f" | {size} bytes")
+            details = f"{size} bytes"
+        
+        self.console.event(packet_type, f"[{timestamp}] {direction_symbol} {packet_type.upper():<12} | {details}",
+                           talker=talker, size=decoded.size)
+    
+    def update_console_world(self):
+        """Panel-mode replacement for the periodic world state printout"""
+        world_state = self.decoder.get_world_state_summary()
+        center = world_state['center_of_activity']
+        self.console.set_info('World', f"{world_state['total_players']} players, "
+                                       f"{world_state['recent_players']} seen in 60s, "
+                                       f"center ({center['x']:.0f}, {center['y']:.0f})")
+        self.console.set_info('Decode cache', f"{self.stats['decode_cache_hit_rate'] * 100:.1f}% hits")
     
     def display_world_state(self):
         """Display current world state summary"""
@@ -682,9 +890,22 @@ class AdvancedAlbionScanner:
         print(f"Items: {self.stats['item_packets']}")
         print(f"Chat: {self.stats['chat_packets']}")
         print(f"Unknown: {self.stats['unknown_packets']}")
+        
+        print(f"Decode cache hits: {self.stats['decode_cache_hits']} "
+              f"({self.stats['decode_cache_hit_rate'] * 100:.1f}%)")
+        
+        dispatch = self.decoder.get_dispatch_stats(5)
+        print(f"Dispatch table hits: {dispatch['table']} ({dispatch['hit_ratio'] * 100:.1f}%), "
+              f"heuristic fallback: {dispatch['fallback']}")
+        for opcode, count in dispatch['fallback_opcodes']:
+            print(f"  fallback opcode {opcode}: {count}")
     
-    def start_scanning(self):
-        """Start advanced scanning with protocol decoding"""
+    def start_scanning(self, stages=()):
+        """Start advanced scanning with protocol decoding
+        
+        Capture runs on this thread; decoding, world state and console output
+        run as pipeline stages (extra `stages` go between state and output).
+        """
         print(f"🚀 ADVANCED ALBION SCANNER")
         print("=" * 60)
         print(f"Interface: {self.interface}")
@@ -697,8 +918,6 @@ class AdvancedAlbionScanner:
         print()
         
         self.running = True
-        last_world_display = 0
-        last_export = 0
         
         try:
             import pyshark
@@ -713,29 +932,11 @@ class AdvancedAlbionScanner:
             
             print("✅ Capture configured with raw data support")
             
-            for packet in capture.sniff_continuously():
-                if not self.running:
-                    break
-                
-                self.process_packet(packet)
-                
-                current_time = time.time()
-                
-                # Display world state periodically
-                if (self.config['display_world_state'] and 
-                    current_time - last_world_display > self.config['world_state_interval']):
-                    self.display_world_state()
-                    last_world_display = current_time
-                
-                # Auto-export world data
-                if (self.config['auto_export_interval'] > 0 and
-                    current_time - last_export > self.config['auto_export_interval']):
-                    filename = self.decoder.export_world_data()
-                    if filename:
-                        print(f"💾 World data exported to: {filename}")
-                    last_export = current_time
-            
-            capture.close()
+            self.pipeline = self.build_pipeline(stages)
+            try:
+                self.pipeline.run(capture.sniff_continuously(), should_stop=lambda: not self.running)
+            finally:
+                capture.close()
             
         except KeyboardInterrupt:
             print(f"\n⏹️ Scanning stopped by user")
@@ -751,13 +952,19 @@ class AdvancedAlbionScanner:
                 
         finally:
             self.running = False
+            if self.pipeline is not None:
+                self.pipeline.close()
+            self.console.close()
+            if self.pipeline is not None:
+                print(self.pipeline.format_metrics())
             self.display_statistics()
             self.display_world_state()
             
             # Final export
-            filename = self.decoder.export_world_data()
-            if filename:
-                print(f"💾 Final world data exported to: {filename}")
+            if self.config['export_on_exit']:
+                filename = self.decoder.export_world_data()
+                if filename:
+                    print(f"💾 Final world data exported to: {filename}")
     
     def start_fallback_scanning(self):
         """Fallback scanning method without advanced features"""
@@ -819,9 +1026,19 @@ class AdvancedAlbionScanner:
         capture.close()
         print("✅ Fallback scanning completed")
 def main():
+    parser = argparse.ArgumentParser(description='Advanced Albion scanner with protocol decoding')
+    parser.add_argument('--console', choices=CONSOLE_MODES, default='panel',
+                        help='status panel (default) or one line per packet')
+    parser.add_argument('--refresh-rate', type=float, default=2.0, help='panel redraws per second')
+    parser.add_argument('--event-log', help='also write every packet line to this file')
+    args = parser.parse_args()
+    
     scanner = AdvancedAlbionScanner(
         interface='5',  # USB Tethering
-        port=5056       # Albion port
+        port=5056,      # Albion port
+        console=args.console,
+        refresh_rate=args.refresh_rate,
+        event_log=args.event_log
     )
     
     # Configure scanner
@@ -0,0 +1,283 @@
+"""
+Albion Scanner - Protocol Inference
+Infer candidate message layouts from a whole capture corpus: payloads are
+clustered by (4-byte header, length), and every cluster is sampled into a
+(packets, bytes) matrix whose columns give per-offset variance, constant
+bytes and float / uint / string likelihoods in a few vectorized passes. The
+resulting field layouts are exported as decoder specs that
+AlbionProtocolDecoder.load_message_specs() understands
+"""
+
+import os
+import sys
+import json
+import time
+import struct
+import argparse
+
+import numpy as np
+
+from albion_columnar_capture import ColumnarCapture, convert_to_columnar
+
+SPEC_VERSION = 1
+HEADER_SIZE = 4
+
+# Same plausibility ranges the hand-written decoders use
+COORDINATE_LIMIT = 5000.0
+ENTITY_ID_RANGE = (1000, 999999999)
+
+
+def load_corpus(path):
+    """ColumnarCapture for a .acap directory, converting JSON/JSONL captures first"""
+    if not os.path.isdir(path):
+        print(f"🔄 Converting {path} to a columnar capture...")
+        path = convert_to_columnar(path)
+    return ColumnarCapture(path)
+
+
+def cluster_packets(headers, lengths, min_count=20):
+    """Group packet rows by (header, length).
+
+    Returns [(header, length, rows)] for every cluster with at least
+    `min_count` packets, largest first.
+    """
+    keys = (headers.astype(np.uint64) << np.uint64(32)) | lengths.astype(np.uint64)
+    unique, inverse, counts = np.unique(keys, return_inverse=True, return_counts=True)
+    order = np.argsort(inverse, kind='stable')
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+
+    clusters = []
+    for index in np.argsort(counts, kind='stable')[::-1]:
+        if counts[index] < min_count:
+            break
+        key = int(unique[index])
+        rows = order[starts[index]:starts[index] + counts[index]]
+        clusters.append((key >> 32, key & 0xFFFFFFFF, rows))
+    return clusters
+
+
+def sample_matrix(capture, rows, length, max_samples=4096, max_bytes=1024):
+    """(samples, bytes) uint8 matrix of evenly spaced packets from one cluster"""
+    if len(rows) > max_samples:
+        rows = rows[np.linspace(0, len(rows) - 1, max_samples).astype(np.int64)]
+    width = min(length, max_bytes)
+    starts = np.asarray(capture.payload_offsets[rows], dtype=np.int64)
+    return np.asarray(capture.payload)[starts[:, None] + np.arange(width)]
+
+
+def offset_statistics(matrix):
+    """Per-offset statistics of a cluster's byte matrix.
+
+    Scores are fractions of samples (0-1); the 4-byte scores are indexed by
+    the field's first offset.
+    """
+    values = matrix.astype(np.uint32)
+    words = values[:, :-3] | values[:, 1:-2] << 8 | values[:, 2:-1] << 16 | values[:, 3:] << 24
+    floats = words.view(np.float32)
+    magnitude = np.abs(floats)
+
+    with np.errstate(invalid='ignore'):
+        float_ok = np.isfinite(floats) & ((magnitude == 0) | ((magnitude >= 1e-3) & (magnitude < 1e6)))
+        coordinate_ok = float_ok & (magnitude < COORDINATE_LIMIT)
+    entity_ok = (words >= ENTITY_ID_RANGE[0]) & (words <= ENTITY_ID_RANGE[1])
+    uint_ok = entity_ok | (words < 1 << 24)
+
+    constant = (matrix == matrix[0]).all(axis=0)
+    word_varies = ~(words == words[0]).all(axis=0)
+    return {
+        'variance': matrix.var(axis=0),
+        'constant': constant,
+        'first': matrix[0],
+        'printable': ((matrix >= 0x20) & (matrix < 0x7F)).mean(axis=0),
+        'float': float_ok.mean(axis=0) * word_varies,
+        'coordinate': coordinate_ok.mean(axis=0) * word_varies,
+        'entity': entity_ok.mean(axis=0) * word_varies,
+        'uint': uint_ok.mean(axis=0) * word_varies,
+        'zero_words': (words == 0).mean(axis=0),
+    }
+
+
+def infer_fields(stats, threshold=0.95, min_string=3):
+    """Greedy left-to-right field layout from per-offset statistics"""
+    width = len(stats['constant'])
+    word_count = len(stats['float'])
+    fields = []
+    pending = None  # run of unclassified bytes
+
+    def add(field):
+        nonlocal pending
+        if pending is not None:
+            fields.append(pending)
+            pending = None
+        fields.append(field)
+
+    offset = HEADER_SIZE
+    while offset < width:
+        if offset < word_count and stats['zero_words'][offset] < threshold:
+            if stats['float'][offset] >= threshold:
+                add({'name': f'float_{offset}', 'offset': offset, 'format': 'f', 'kind': 'float',
+                     'score': round(float(stats['float'][offset]), 3),
+                     'coordinate': bool(stats['coordinate'][offset] >= threshold)})
+                offset += 4
+                continue
+            if stats['uint'][offset] >= threshold:
+                add({'name': f'uint_{offset}', 'offset': offset, 'format': 'I', 'kind': 'uint',
+                     'score': round(float(stats['uint'][offset]), 3),
+                     'entity': bool(stats['entity'][offset] >= threshold)})
+                offset += 4
+                continue
+
+        end = offset
+        while end < width and stats['printable'][end] >= threshold and not stats['constant'][end]:
+            end += 1
+        if end - offset >= min_string:
+            add({'name': f'string_{offset}', 'offset': offset, 'format': f'{end - offset}s',
+                 'kind': 'string', 'score': round(float(stats['printable'][offset:end].mean()), 3)})
+            offset = end
+            continue
+
+        if stats['constant'][offset]:
+            end = offset
+            while end < width and stats['constant'][end]:
+                end += 1
+            add({'name': f'const_{offset}', 'offset': offset, 'format': f'{end - offset}s',
+                 'kind': 'const', 'score': 1.0, 'value': stats['first'][offset:end].tobytes().hex()})
+            offset = end
+            continue
+
+        if pending is None:
+            pending = {'name': f'bytes_{offset}', 'offset': offset, 'format': '1s',
+                       'kind': 'bytes', 'score': 0.0}
+        else:
+            pending['format'] = f"{offset - pending['offset'] + 1}s"
+        offset += 1
+
+    if pending is not None:
+        fields.append(pending)
+    return fields
+
+
+def name_position_fields(fields):
+    """Name x/y/z + entity_id for three coordinate floats; returns the message type"""
+    for index in range(len(fields) - 2):
+        triple = fields[index:index + 3]
+        if (all(field['kind'] == 'float' and field['coordinate'] for field in triple) and
+                triple[1]['offset'] == triple[0]['offset'] + 4 and
+                triple[2]['offset'] == triple[0]['offset'] + 8):
+            for field, axis in zip(triple, 'xyz'):
+                field['name'] = axis
+            previous = fields[index - 1] if index else None
+            if (previous and previous['kind'] == 'uint' and previous.get('entity') and
+                    previous['offset'] == triple[0]['offset'] - 4):
+                previous['name'] = 'entity_id'
+            return 'movement'
+    if any(field['kind'] == 'string' for field in fields):
+        return 'text'
+    return 'unknown'
+
+
+def infer_message(capture, header, length, rows, max_samples=4096, max_bytes=1024, threshold=0.95):
+    """Candidate spec for one (header, length) cluster"""
+    matrix = sample_matrix(capture, rows, length, max_samples, max_bytes)
+    if matrix.shape[1] < HEADER_SIZE + 4:
+        return None
+
+    stats = offset_statistics(matrix)
+    fields = infer_fields(stats, threshold)
+    message_type = name_position_fields(fields)
+
+    typed = sum(struct.calcsize('<' + field['format']) for field in fields if field['kind'] != 'bytes')
+    covered = matrix.shape[1] - HEADER_SIZE
+    header_hex = f'{header:08x}'
+    return {
+        'name': f'{message_type}_{header_hex}_{length}',
+        'header': header_hex,
+        'length': length,
+        'type': message_type,
+        'count': int(len(rows)),
+        'confidence': round(typed / covered, 3) if covered else 0.0,
+        'fields': [field for field in fields if field['kind'] != 'bytes'],
+        'mean_variance': round(float(stats['variance'][HEADER_SIZE:].mean()), 2),
+    }
+
+
+def infer_specs(capture, min_count=20, max_messages=200, max_samples=4096, max_bytes=1024,
+                threshold=0.95, min_confidence=0.5):
+    """Candidate decoder specs for the most common message shapes in a corpus.
+
+    Clusters whose layout explains less than `min_confidence` of their bytes
+    (encrypted or variable-layout payloads) are left out.
+    """
+    lengths = np.asarray(capture.length)
+    long_enough = np.flatnonzero(lengths >= HEADER_SIZE + 4)
+    clusters = cluster_packets(np.asarray(capture.header)[long_enough], lengths[long_enough], min_count)
+
+    messages = []
+    for header, length, rows in clusters[:max_messages]:
+        message = infer_message(capture, header, length, long_enough[rows],
+                                max_samples, max_bytes, threshold)
+        if message is not None and message['confidence'] >= min_confidence:
+            messages.append(message)
+
+    return {
+        'version': SPEC_VERSION,
+        'generated': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'source': os.path.basename(os.path.normpath(capture.path)),
+        'packets': int(len(capture)),
+        'clustered_packets': int(sum(message['count'] for message in messages)),
+        'messages': messages,
+    }
+
+
+def export_specs(specs, filename=None):
+    """Write inferred specs to JSON; returns the filename"""
+    if not filename:
+        filename = f"albion_decoder_specs_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    with open(filename, 'w') as f:
+        json.dump(specs, f, indent=2)
+    return filename
+
+
+def report_specs(specs, limit=15):
+    print(f"\n🧬 PROTOCOL INFERENCE")
+    print("=" * 50)
+    print(f"📦 Packets: {specs['packets']}, {specs['clustered_packets']} in "
+          f"{len(specs['messages'])} message shapes")
+
+    for message in specs['messages'][:limit]:
+        print(f"\n📋 {message['header']} / {message['length']} bytes: {message['count']} packets, "
+              f"{message['type']} (confidence {message['confidence']:.2f})")
+        for field in message['fields']:
+            print(f"   +{field['offset']:<4} {field['format']:<5} {field['name']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Infer decoder specs from a capture corpus')
+    parser.add_argument('capture', help='.acap directory or JSON/JSONL capture with payload_hex')
+    parser.add_argument('-o', '--output', help='spec file to write (default: timestamped)')
+    parser.add_argument('--min-count', type=int, default=20, help='smallest cluster to analyze')
+    parser.add_argument('--max-messages', type=int, default=200, help='largest number of clusters')
+    parser.add_argument('--samples', type=int, default=4096, help='packets sampled per cluster')
+    parser.add_argument('--threshold', type=float, default=0.95,
+                        help='fraction of samples a field type must fit')
+    parser.add_argument('--min-confidence', type=float, default=0.5,
+                        help='smallest fraction of a message the layout must explain')
+    args = parser.parse_args()
+
+    try:
+        capture = load_corpus(args.capture)
+    except (OSError, ValueError) as e:
+        print(f"❌ Error loading capture: {e}")
+        sys.exit(1)
+
+    start = time.time()
+    specs = infer_specs(capture, args.min_count, args.max_messages, args.samples,
+                        threshold=args.threshold, min_confidence=args.min_confidence)
+    report_specs(specs)
+    filename = export_specs(specs, args.output)
+    print(f"\n⏱️ Inferred in {time.time() - start:.1f}s")
+    print(f"💾 Decoder specs saved to: {filename}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Albion Scanner - Pooled Decode Records
+Decoded packets as preallocated __slots__ records handed out from a free
+list instead of fresh dicts per packet, with text, item and spec fields
+decoded from the payload only when first read. Records are reference counted:
+whoever hands a record to another thread retains it, every holder releases
+it when done, and the last release resets it and returns it to the pool.
+to_dict() produces the classic decoded-packet dict for JSON boundaries
+"""
+
+import threading
+
+# Serializes deferred decoding: a retained record may be read on several
+# threads, and lazy decoders are not idempotent (spec fields rewrite _fields)
+MATERIALIZE_LOCK = threading.Lock()
+
+
+def lazy_field(slot):
+    """Property over a slot that is filled on first access by record.lazy"""
+    def get(self):
+        if self.lazy is not None:
+            self.materialize()
+        return getattr(self, slot)
+
+    def set(self, value):
+        setattr(self, slot, value)
+    return property(get, set)
+
+
+class DecodedRecord:
+    """One decoded packet (fields unused by its type stay None)
+
+    The type and key ids (player_id, position, size, packet_type_id) are set
+    by the decoder; text, item and spec fields may be left to `lazy`, a
+    callable that fills them from `payload` the first time one is read.
+    """
+    __slots__ = ('type', 'timestamp', 'direction', 'player_id', 'x', 'y', 'z', 'size', 'packet_type_id',
+                 'spec', '_name', '_guild', '_sender', '_text', '_items', '_header', '_fields',
+                 'payload', 'lazy', 'refs', 'pool')
+
+    # Everything reset between uses (refs and pool are managed by the pool)
+    DATA_SLOTS = __slots__[:-2]
+    # Keys readable through get() / [] / in
+    KEYS = frozenset(('type', 'timestamp', 'direction', 'player_id', 'x', 'y', 'z', 'size', 'packet_type_id',
+                      'spec', 'name', 'guild', 'sender', 'text', 'items', 'header', 'fields',
+                      'position', 'message'))
+
+    name = lazy_field('_name')
+    guild = lazy_field('_guild')
+    sender = lazy_field('_sender')
+    text = lazy_field('_text')
+    items = lazy_field('_items')
+    header = lazy_field('_header')
+    fields = lazy_field('_fields')
+
+    def __init__(self, pool=None):
+        for slot in self.DATA_SLOTS:
+            setattr(self, slot, None)
+        self.refs = 0
+        self.pool = pool
+
+    def materialize(self):
+        """Decode the deferred fields now (once, whichever thread reads first)
+
+        `lazy` is cleared only after the fields are filled, so a reader that
+        sees it None never sees half-decoded slots.
+        """
+        if self.lazy is None:
+            return
+        with MATERIALIZE_LOCK:
+            lazy = self.lazy
+            if lazy is not None:
+                lazy(self)
+                self.lazy = None
+
+    def retain(self):
+        """Take an extra reference (e.g. before queueing to another thread)"""
+        with self.pool.lock:
+            self.refs += 1
+        return self
+
+    def release(self):
+        """Drop a reference; the last one returns the record to its pool"""
+        if self.pool is not None:
+            self.pool.release(self)
+
+    def reset(self):
+        for slot in self.DATA_SLOTS:
+            setattr(self, slot, None)
+
+    def snapshot(self):
+        """Immutable copy of the data slots, deferred fields still deferred
+        (see RecordPool.restore)"""
+        return tuple(getattr(self, slot) for slot in self.DATA_SLOTS)
+
+    # -- dict-style read access for existing consumers ---------------------
+
+    @property
+    def position(self):
+        if self.x is None:
+            return None
+        return {'x': self.x, 'y': self.y, 'z': self.z}
+
+    @property
+    def message(self):
+        # Chat text, or the message spec name for spec-decoded packets
+        return self.text if self.text is not None else self.spec
+
+    def get(self, key, default=None):
+        if key in self.KEYS:
+            value = getattr(self, key)
+        elif self.fields is not None:
+            value = self.fields.get(key)
+        else:
+            value = None
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def to_dict(self):
+        """The decoded-packet dict of this record's type (a fresh copy)"""
+        if self.spec is not None:
+            decoded = {'type': self.type, 'message': self.spec, **(self.fields or {})}
+            if self.x is not None:
+                decoded['player_id'] = self.player_id
+                decoded['position'] = self.position
+        elif self.type == 'movement':
+            decoded = {'type': 'movement', 'player_id': self.player_id, 'position': self.position}
+        elif self.type == 'player_info':
+            decoded = {'type': 'player_info', 'player_id': self.player_id,
+                       'name': self.name, 'guild': self.guild}
+        elif self.type == 'chat':
+            decoded = {'type': 'chat', 'sender': self.sender, 'message': self.text}
+        elif self.type == 'items':
+            decoded = {'type': 'items', 'items': list(self.items or ())}
+        else:
+            decoded = {'type': self.type, 'packet_type_id': self.packet_type_id,
+                       'size': self.size, 'header': self.header}
+        decoded['timestamp'] = self.timestamp
+        return decoded
+
+
+class RecordPool:
+    """Free list of DecodedRecord objects"""
+
+    def __init__(self, max_free=1024):
+        self.max_free = max_free
+        self.free = []
+        self.lock = threading.Lock()
+        self.stats = {'acquired': 0, 'created': 0, 'released': 0}
+
+    def acquire(self):
+        """A blank record holding one reference"""
+        with self.lock:
+            self.stats['acquired'] += 1
+            if self.free:
+                record = self.free.pop()
+            else:
+                self.stats['created'] += 1
+                record = DecodedRecord(self)
+            record.refs = 1
+        return record
+
+    def restore(self, snapshot):
+        """A record holding one reference, filled from DecodedRecord.snapshot()"""
+        record = self.acquire()
+        for slot, value in zip(DecodedRecord.DATA_SLOTS, snapshot):
+            setattr(record, slot, value)
+        return record
+
+    def release(self, record):
+        with self.lock:
+            record.refs -= 1
+            if record.refs > 0:
+                return
+            self.stats['released'] += 1
+            if len(self.free) < self.max_free:
+                record.reset()
+                self.free.append(record)
+
+    def get_stats(self):
+        return {**self.stats, 'free': len(self.free)}
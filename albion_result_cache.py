@@ -0,0 +1,166 @@
+"""
+Albion Scanner - Analysis Result Cache
+On-disk cache for offline analysis results, keyed by capture content hash +
+analysis name + parameters. Entries are pickled files whose mtime doubles as
+the LRU clock; the least recently used entries are evicted once the cache
+grows past its size budget
+"""
+
+import os
+import json
+import pickle
+import hashlib
+import threading
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+class AnalysisResultCache:
+    def __init__(self, directory='.albion_cache', max_bytes=512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+        self.lock = threading.Lock()
+        # (path, mtime_ns, size) -> content digest, so a capture is hashed once
+        self.digests = {}
+        self.stats = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+        self.total_bytes = sum(size for _, _, size in self.scan())
+
+    # -- keys --------------------------------------------------------------
+
+    def file_digest(self, path):
+        """Content hash of a capture file (or columnar capture directory)"""
+        if os.path.isdir(path):
+            files = [os.path.join(path, name) for name in sorted(os.listdir(path))]
+        else:
+            files = [path]
+
+        signature = tuple((f, os.stat(f).st_mtime_ns, os.stat(f).st_size) for f in files)
+        digest = self.digests.get(signature)
+        if digest is None:
+            sha = hashlib.sha1()
+            for filename in files:
+                sha.update(os.path.basename(filename).encode('utf-8'))
+                with open(filename, 'rb') as f:
+                    for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+                        sha.update(chunk)
+            digest = sha.hexdigest()
+            self.digests[signature] = digest
+        return digest
+
+    def make_key(self, path, analysis, params=None):
+        """Cache key for an analysis of a capture with given parameters"""
+        material = json.dumps([self.file_digest(path), analysis, params or {}],
+                              sort_keys=True, default=str)
+        return hashlib.sha1(material.encode('utf-8')).hexdigest()
+
+    def entry_path(self, key):
+        return os.path.join(self.directory, f'{key}.pkl')
+
+    # -- storage -----------------------------------------------------------
+
+    def get(self, key):
+        """Cached value and True, or (None, False) on a miss"""
+        filename = self.entry_path(key)
+        try:
+            with open(filename, 'rb') as f:
+                value = pickle.load(f)
+            os.utime(filename)  # Mark as recently used
+        except (OSError, pickle.UnpicklingError, EOFError):
+            with self.lock:
+                self.stats['misses'] += 1
+            return None, False
+
+        with self.lock:
+            self.stats['hits'] += 1
+        return value, True
+
+    def put(self, key, value):
+        """Store a value, evicting least recently used entries as needed"""
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return False
+
+        filename = self.entry_path(key)
+        temp_file = f'{filename}.{os.getpid()}.tmp'
+        with open(temp_file, 'wb') as f:
+            f.write(data)
+
+        with self.lock:
+            if os.path.exists(filename):
+                self.total_bytes -= os.path.getsize(filename)
+            os.replace(temp_file, filename)
+            self.total_bytes += len(data)
+            self.stats['stores'] += 1
+            if self.total_bytes > self.max_bytes:
+                self.evict()
+        return True
+
+    def get_or_compute(self, path, analysis, params, compute):
+        """Return the cached result for (capture, analysis, params) or compute it.
+
+        None results are not stored, so an analysis that had nothing to work
+        on is retried next time.
+        """
+        key = self.make_key(path, analysis, params)
+        value, found = self.get(key)
+        if found:
+            return value
+        value = compute()
+        if value is not None:
+            self.put(key, value)
+        return value
+
+    def scan(self):
+        """(mtime, path, size) of every cache entry"""
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.pkl'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, path, stat.st_size))
+        return entries
+
+    def evict(self):
+        """Drop least recently used entries until the cache fits (lock held)"""
+        for _, path, size in sorted(self.scan()):
+            if self.total_bytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            self.total_bytes -= size
+            self.stats['evictions'] += 1
+
+    def clear(self):
+        """Remove every cache entry"""
+        with self.lock:
+            for _, path, _ in self.scan():
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+            self.total_bytes = 0
+
+    def get_stats(self):
+        lookups = self.stats['hits'] + self.stats['misses']
+        return {
+            **self.stats,
+            'hit_rate': self.stats['hits'] / lookups if lookups else 0.0,
+            'entries': len(self.scan()),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes
+        }
+
+    def report(self):
+        stats = self.get_stats()
+        print(f"🗄️ Result cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({stats['hit_rate'] * 100:.1f}% hit rate), {stats['entries']} entries, "
+              f"{stats['bytes'] / 1024 / 1024:.1f}/{stats['max_bytes'] / 1024 / 1024:.0f} MB, "
+              f"{stats['evictions']} evicted")
@@ -1,18 +1,25 @@
 import pyshark
 import time
+import argparse
 from datetime import datetime
+from albion_console import ConsoleRenderer, CONSOLE_MODES
 
 # Configuration - dari hasil testing yang berhasil
 INTERFACE_NAME = '5'  # USB Tethering - terbukti bekerja
 ALBION_PORT = 5056    # Terbukti digunakan oleh Albion
 
 class AlbionPacketScanner:
-    def __init__(self, interface=INTERFACE_NAME, target_port=ALBION_PORT):
+    def __init__(self, interface=INTERFACE_NAME, target_port=ALBION_PORT, console='lines',
+                 refresh_rate=2.0, event_log=None):
         self.interface = interface
         self.target_port = target_port
         self.packet_count = 0
         self.start_time = None
         
+        # Packet lines printed one by one or aggregated into a status panel
+        self.console = ConsoleRenderer('ALBION ONLINE PACKET SCANNER', mode=console,
+                                       refresh_rate=refresh_rate, event_log=event_log)
+        
     def log_packet(self, packet):
         """Log packet Albion dengan detail yang berguna"""
         self.packet_count += 1
@@ -29,17 +36,21 @@ class AlbionPacketScanner:
             if src_port == self.target_port:
                 direction = "⬅️ IN "
                 endpoint = f"{src_ip}:{src_port} → Local:{dst_port}"
+                talker = f"{src_ip}:{src_port}"
             else:
                 direction = "➡️ OUT"
                 endpoint = f"Local:{src_port} → {dst_ip}:{dst_port}"
+                talker = f"{dst_ip}:{dst_port}"
             
-            print(f"[{timestamp}] {direction} #{self.packet_count:4d} | {endpoint:35} | {length:4d} bytes")
+            self.console.event(direction.split()[-1],
+                               f"[{timestamp}] {direction} #{self.packet_count:4d} | {endpoint:35} | {length:4d} bytes",
+                               talker=talker, size=length)
             
             # TODO: Disini bisa ditambahkan parsing packet untuk data game
             # packet_data = packet.get_raw_packet()
             
         except Exception as e:
-            print(f"[{timestamp}] ERROR parsing packet #{self.packet_count}: {e}")
+            self.console.event('ERROR', f"[{timestamp}] ERROR parsing packet #{self.packet_count}: {e}")
     
     def start_capture_with_bpf(self):
         """Method 1: Menggunakan BPF filter (Berkeley Packet Filter)"""
@@ -78,6 +89,7 @@ class AlbionPacketScanner:
             except:
                 pass
             
+            self.console.close()
             elapsed = time.time() - self.start_time if self.start_time else 0
             print(f"\n📊 Summary: {self.packet_count} packets captured in {elapsed:.1f} seconds")
         
@@ -116,7 +128,11 @@ class AlbionPacketScanner:
                     if total_packets % 500 == 0:
                         elapsed = time.time() - self.start_time
                         rate = self.packet_count / elapsed if elapsed > 0 else 0
-                        print(f"📊 Progress: {total_packets} total, {self.packet_count} Albion ({rate:.1f}/sec)")
+                        progress = f"{total_packets} total, {self.packet_count} Albion ({rate:.1f}/sec)"
+                        if self.console.mode == 'panel':
+                            self.console.set_info('Progress', progress)
+                        else:
+                            print(f"📊 Progress: {progress}")
                 
                 except AttributeError:
                     # Skip non-UDP packets
@@ -135,6 +151,7 @@ class AlbionPacketScanner:
             except:
                 pass
             
+            self.console.close()
             elapsed = time.time() - self.start_time if self.start_time else 0
             print(f"\n📊 Summary: {self.packet_count} Albion packets from {total_packets} total in {elapsed:.1f} seconds")
         
@@ -165,7 +182,15 @@ class AlbionPacketScanner:
 
 def main():
     """Main function"""
-    scanner = AlbionPacketScanner()
+    parser = argparse.ArgumentParser(description='Albion Online packet scanner')
+    parser.add_argument('--console', choices=CONSOLE_MODES, default='panel',
+                        help='status panel (default) or one line per packet')
+    parser.add_argument('--refresh-rate', type=float, default=2.0, help='panel redraws per second')
+    parser.add_argument('--event-log', help='also write every packet line to this file')
+    args = parser.parse_args()
+    
+    scanner = AlbionPacketScanner(console=args.console, refresh_rate=args.refresh_rate,
+                                  event_log=args.event_log)
     
     try:
         success = scanner.start(method="auto")  # auto, bpf, atau manual
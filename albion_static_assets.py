@@ -0,0 +1,203 @@
+"""
+Albion Scanner - Static Assets
+In-memory static asset cache for the dashboard: files are read once,
+pre-compressed (gzip, and brotli when available) and served with
+ETag/Cache-Control headers
+"""
+
+import os
+import gzip
+import hashlib
+import mimetypes
+import threading
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Content types worth compressing; images are already compressed
+COMPRESSIBLE_TYPES = (
+    'text/', 'application/javascript', 'application/json',
+    'image/svg+xml', 'application/xml'
+)
+
+# Variants smaller than this are not worth the Content-Encoding overhead
+MIN_COMPRESS_SIZE = 512
+
+
+class StaticAsset:
+    """One asset with its precomputed encodings
+
+    Never modified after construction: a changed file is reloaded into a new
+    StaticAsset that replaces this one in the cache with a single assignment,
+    so concurrent requests see either the old or the new etag/variants pair.
+    """
+    __slots__ = ('name', 'path', 'mtime', 'content_type', 'cache_control',
+                 'etag', 'variants')
+
+    def __init__(self, name, path, cache_control):
+        self.name = name
+        self.path = path
+        self.cache_control = cache_control
+        self.content_type = mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        if self.content_type.startswith('text/'):
+            self.content_type += '; charset=utf-8'
+        self.load()
+
+    def load(self):
+        """Read the file and build encoded variants"""
+        with open(self.path, 'rb') as f:
+            body = f.read()
+        self.mtime = os.stat(self.path).st_mtime
+        self.etag = hashlib.sha1(body).hexdigest()[:20]
+
+        # encoding -> body; identity is always available
+        self.variants = {'identity': body}
+        if len(body) >= MIN_COMPRESS_SIZE and self.content_type.startswith(COMPRESSIBLE_TYPES):
+            gz = gzip.compress(body, compresslevel=9, mtime=0)
+            if len(gz) < len(body):
+                self.variants['gzip'] = gz
+            if brotli is not None:
+                br = brotli.compress(body, quality=11)
+                if len(br) < len(body):
+                    self.variants['br'] = br
+
+    def is_stale(self):
+        """Check whether the file on disk changed since it was loaded"""
+        try:
+            return os.stat(self.path).st_mtime != self.mtime
+        except OSError:
+            return False
+
+
+class StaticAssetCache:
+    def __init__(self, root=None, static_dir='static', dev_mode=False,
+                 html_cache_control='no-cache', static_max_age=86400):
+        self.root = root or os.path.dirname(os.path.abspath(__file__))
+        self.static_dir = os.path.join(self.root, static_dir)
+        self.static_prefix = static_dir
+        self.dev_mode = dev_mode
+        self.html_cache_control = html_cache_control
+        self.static_cache_control = f'public, max-age={static_max_age}'
+        self.assets = {}
+        self.lock = threading.Lock()
+
+        self.stats = {'hits': 0, 'not_modified': 0, 'reloads': 0, 'missing': 0}
+
+    def add(self, name, relative_path, cache_control=None):
+        """Register and load a single asset under a lookup name"""
+        path = os.path.join(self.root, relative_path)
+        if not os.path.isfile(path):
+            return None
+        if cache_control is None:
+            cache_control = (self.html_cache_control if path.endswith('.html')
+                             else self.static_cache_control)
+        asset = StaticAsset(name, path, cache_control)
+        with self.lock:
+            self.assets[name] = asset
+        return asset
+
+    def add_directory(self):
+        """Load every file under the static directory"""
+        if not os.path.isdir(self.static_dir):
+            return 0
+        count = 0
+        for dirpath, _, filenames in os.walk(self.static_dir):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                relative = os.path.relpath(path, self.root)
+                name = os.path.relpath(path, self.static_dir).replace(os.sep, '/')
+                if self.add(f'{self.static_prefix}/{name}', relative):
+                    count += 1
+        return count
+
+    def static_path(self, name):
+        """File path behind a static/ asset name, or None if it is not inside static_dir"""
+        if not name.startswith(self.static_prefix + '/'):
+            return None
+        path = os.path.normpath(os.path.join(self.static_dir, name[len(self.static_prefix) + 1:]))
+        if os.path.commonpath([path, os.path.normpath(self.static_dir)]) != os.path.normpath(self.static_dir):
+            return None
+        return path
+
+    def reload(self, asset):
+        """Replace a changed asset with a freshly loaded one"""
+        try:
+            fresh = StaticAsset(asset.name, asset.path, asset.cache_control)
+        except OSError:
+            return asset  # vanished or unreadable mid-edit, keep serving the old one
+        with self.lock:
+            self.assets[asset.name] = fresh
+        self.stats['reloads'] += 1
+        return fresh
+
+    def get(self, name):
+        """Look up an asset, reloading it first in dev mode if it changed"""
+        asset = self.assets.get(name)
+
+        if self.dev_mode:
+            if asset is None:
+                # Pick up a file added while the server is running (only the
+                # requested one, so unknown names cost a stat, not a reload)
+                path = self.static_path(name)
+                if path is not None and os.path.isfile(path):
+                    asset = self.add(name, os.path.relpath(path, self.root))
+            elif asset.is_stale():
+                asset = self.reload(asset)
+
+        return asset
+
+    @staticmethod
+    def choose_encoding(asset, accept_encoding):
+        """Pick the best precomputed encoding the client accepts"""
+        accepted = set()
+        for part in (accept_encoding or '').split(','):
+            token, _, params = part.strip().partition(';')
+            if params.replace(' ', '') in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000'):
+                continue
+            accepted.add(token.strip().lower())
+
+        for encoding in ('br', 'gzip'):
+            if encoding in asset.variants and (encoding in accepted or '*' in accepted):
+                return encoding
+        return 'identity'
+
+    def respond(self, name, accept_encoding=None, if_none_match=None):
+        """Build (status, headers, body) for a request, or None if unknown"""
+        asset = self.get(name)
+        if asset is None:
+            self.stats['missing'] += 1
+            return None
+
+        encoding = self.choose_encoding(asset, accept_encoding)
+        etag = f'"{asset.etag}"' if encoding == 'identity' else f'"{asset.etag}-{encoding}"'
+
+        headers = {
+            'ETag': etag,
+            'Cache-Control': asset.cache_control,
+            'Vary': 'Accept-Encoding',
+            'Content-Type': asset.content_type
+        }
+
+        if if_none_match:
+            candidates = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+            if etag in candidates or '*' in candidates:
+                self.stats['not_modified'] += 1
+                return 304, headers, b''
+
+        if encoding != 'identity':
+            headers['Content-Encoding'] = encoding
+
+        self.stats['hits'] += 1
+        return 200, headers, asset.variants[encoding]
+
+
+def create_dashboard_assets(dev_mode=None):
+    """Asset cache with the dashboard page and everything under static/"""
+    if dev_mode is None:
+        dev_mode = os.environ.get('ALBION_DASHBOARD_DEV') == '1'
+    assets = StaticAssetCache(dev_mode=dev_mode)
+    assets.add('index', 'albion_web_dashboard.html')
+    assets.add_directory()
+    return assets
@@ -0,0 +1,451 @@
+"""
+Albion Scanner - Streaming Capture Analysis
+Incremental readers for capture files (JSON Lines, or a JSON document with a
+"packets" array) and per-analysis accumulators that run in a single pass with
+flat memory use
+"""
+
+import json
+import struct
+from collections import Counter, defaultdict
+
+import numpy as np
+
+from albion_stream_stats import StreamStatistics
+
+
+def entity_id_before(payload, offset):
+    """Entity id stored as the uint32 just before a position (0 if none)"""
+    if offset < 4 or offset > len(payload):
+        return 0
+    return struct.unpack_from('<I', payload, offset - 4)[0]
+
+
+class CaptureStreamReader:
+    """Iterate the packets of a capture file without loading it whole.
+
+    Supports JSON Lines (one packet object per line) and the analysis JSON
+    format (top-level object with a "packets" array). Other top-level keys
+    of a JSON document are collected into ``metadata`` while reading.
+    """
+
+    def __init__(self, filename, chunk_size=1 << 20):
+        self.filename = filename
+        self.chunk_size = chunk_size
+        self.metadata = {}
+        self.decoder = json.JSONDecoder()
+
+    def __iter__(self):
+        if self.filename.endswith(('.jsonl', '.ndjson')):
+            return self.iter_json_lines()
+        return self.iter_json_document()
+
+    def iter_json_lines(self):
+        with open(self.filename, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+
+    # -- incremental JSON document parsing ---------------------------------
+
+    def iter_json_document(self):
+        with open(self.filename, 'r', encoding='utf-8') as f:
+            self.file = f
+            self.buffer = ''
+            self.pos = 0
+            self.eof = False
+
+            if self.next_char() != '{':
+                raise ValueError(f"{self.filename}: expected a JSON object")
+            self.pos += 1
+
+            while True:
+                char = self.next_char()
+                if char == '}':
+                    return
+                if char == ',':
+                    self.pos += 1
+                    continue
+
+                key = self.decode_value()
+                if self.next_char() != ':':
+                    raise ValueError(f"{self.filename}: malformed object near key {key!r}")
+                self.pos += 1
+
+                if key == 'packets' and self.next_char() == '[':
+                    self.pos += 1
+                    yield from self.iter_array()
+                else:
+                    self.metadata[key] = self.decode_value()
+
+    def fill(self):
+        """Read another chunk, dropping the consumed part of the buffer"""
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def next_char(self):
+        """Skip whitespace and return the next significant character"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in ' \t\r\n':
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                raise ValueError(f"{self.filename}: unexpected end of file")
+
+    def decode_value(self):
+        """Decode one JSON value at the current position, reading as needed"""
+        self.next_char()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+                # A value that ends exactly at the buffer end may be a cut-off
+                # number; only trust it once more input (or EOF) confirms it
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            except json.JSONDecodeError:
+                if self.eof:
+                    raise
+            self.fill()
+
+    def iter_array(self):
+        while True:
+            char = self.next_char()
+            if char == ']':
+                self.pos += 1
+                return
+            if char == ',':
+                self.pos += 1
+                continue
+            yield self.decode_value()
+
+
+# ----------------------------------------------------------------------
+# Accumulators
+# ----------------------------------------------------------------------
+
+class PacketPatternAccumulator:
+    """Header, payload size and direction counts"""
+    name = 'packet_patterns'
+
+    def __init__(self):
+        self.headers = Counter()
+        self.sizes = Counter()
+        self.directions = Counter({'incoming': 0, 'outgoing': 0})
+        self.total = 0
+
+    def add(self, packet):
+        self.headers[packet.get('analysis', {}).get('header', '')] += 1
+        self.sizes[packet.get('payload_length', 0)] += 1
+        self.directions[packet.get('direction', 'unknown')] += 1
+        self.total += 1
+
+    def report(self):
+        print(f"\n🔍 PACKET PATTERN ANALYSIS")
+        print("=" * 50)
+        if not self.total:
+            print("❌ No packets found")
+            return
+
+        print(f"📋 Most common headers:")
+        for header, count in self.headers.most_common(10):
+            percentage = (count / self.total) * 100
+            print(f"   {header}: {count} packets ({percentage:.1f}%)")
+
+        sizes = np.fromiter(self.sizes.keys(), dtype=np.float64)
+        counts = np.fromiter(self.sizes.values(), dtype=np.float64)
+        print(f"\n📏 Payload size statistics:")
+        print(f"   Min: {int(sizes.min())} bytes")
+        print(f"   Max: {int(sizes.max())} bytes")
+        print(f"   Average: {np.average(sizes, weights=counts):.1f} bytes")
+        print(f"   Most common: {self.sizes.most_common(1)[0]}")
+
+        print(f"\n📡 Traffic direction:")
+        total = sum(self.directions.values())
+        for direction, count in self.directions.items():
+            percentage = (count / total) * 100 if total > 0 else 0
+            print(f"   {direction}: {count} packets ({percentage:.1f}%)")
+
+
+class PositionAccumulator:
+    """Position ranges, per-entity movement statistics and a bounded sample for plots.
+
+    Positions are buffered into fixed-size float chunks and reduced with
+    NumPy when a chunk fills, so memory stays constant. Movement steps are
+    taken between consecutive positions of the same entity only; the last
+    position of every entity carries over to the next chunk.
+    """
+    name = 'positions'
+
+    def __init__(self, sample_size=50000, noise_threshold=0.1, chunk_size=65536):
+        self.count = 0
+        self.mins = np.full(3, np.inf)
+        self.maxs = np.full(3, -np.inf)
+        self.last_positions = {}  # entity id -> last (x, y, z)
+        self.noise_threshold = noise_threshold
+        self.movement_count = 0
+        self.movement_sum = 0.0
+        self.movement_max = 0.0
+
+        self.chunk = np.empty((chunk_size, 3), dtype=np.float64)
+        self.chunk_entities = np.empty(chunk_size, dtype=np.uint32)
+        self.chunk_meta = [None] * chunk_size
+        self.filled = 0
+
+        # Decimated timeline for plots: every stride-th position, the stride
+        # doubles whenever the sample is full
+        self.sample_size = sample_size
+        self.stride = 1
+        self.sample = []
+
+    def add(self, packet):
+        positions = packet.get('parsed_data', {}).get('positions', [])
+        if not positions:
+            return
+        meta = (packet.get('timestamp', ''), packet.get('direction', 'unknown'))
+
+        payload = None
+        for pos in positions:
+            entity = pos.get('player_id')
+            if entity is None:
+                # Older captures: recover the id from the raw payload
+                if payload is None:
+                    payload = bytes.fromhex(packet.get('payload_hex', ''))
+                entity = entity_id_before(payload, pos.get('offset', 0))
+            self.chunk[self.filled] = (pos['x'], pos['y'], pos['z'])
+            self.chunk_entities[self.filled] = entity
+            self.chunk_meta[self.filled] = meta
+            self.filled += 1
+            if self.filled == len(self.chunk):
+                self.flush()
+
+    def flush(self):
+        """Reduce the buffered chunk into the running statistics"""
+        n = self.filled
+        if not n:
+            return
+        points = self.chunk[:n]
+        self.mins = np.minimum(self.mins, points.min(axis=0))
+        self.maxs = np.maximum(self.maxs, points.max(axis=0))
+
+        # Stable sort by entity: each entity becomes one run in capture order
+        order = np.argsort(self.chunk_entities[:n], kind='stable')
+        entities = self.chunk_entities[:n][order]
+        grouped = points[order]
+        starts = np.flatnonzero(np.r_[True, entities[1:] != entities[:-1]])
+        ends = np.r_[starts[1:], n] - 1
+
+        # Steps inside runs, plus each run's step from the entity's last
+        # position of an earlier chunk
+        distances = np.linalg.norm(np.diff(grouped, axis=0), axis=1)[entities[1:] == entities[:-1]]
+        carried = [(self.last_positions[entity], grouped[start])
+                   for entity, start in zip(entities[starts].tolist(), starts)
+                   if entity in self.last_positions]
+        if carried:
+            before, after = np.array(carried).transpose(1, 0, 2)
+            distances = np.concatenate([distances, np.linalg.norm(after - before, axis=1)])
+
+        moves = distances[distances > self.noise_threshold]  # Filter out noise
+        if moves.size:
+            self.movement_count += int(moves.size)
+            self.movement_sum += float(moves.sum())
+            self.movement_max = max(self.movement_max, float(moves.max()))
+        for entity, end in zip(entities[ends].tolist(), ends):
+            self.last_positions[entity] = grouped[end].copy()
+
+        # Global indices of this chunk that fall on the sampling stride
+        first = -self.count % self.stride
+        for i in range(first, n, self.stride):
+            timestamp, direction = self.chunk_meta[i]
+            self.sample.append({'timestamp': timestamp, 'x': float(points[i, 0]),
+                                'y': float(points[i, 1]), 'z': float(points[i, 2]),
+                                'direction': direction})
+        # sample[0] is always position 0, so halving keeps a regular stride
+        while len(self.sample) > self.sample_size:
+            self.sample = self.sample[::2]
+            self.stride *= 2
+
+        self.count += n
+        self.filled = 0
+
+    def __getstate__(self):
+        # Cached results (albion_result_cache) keep the reduced statistics,
+        # not the empty chunk buffers
+        self.flush()
+        state = dict(self.__dict__)
+        state['chunk_size'] = len(self.chunk)
+        del state['chunk'], state['chunk_entities'], state['chunk_meta']
+        return state
+
+    def __setstate__(self, state):
+        chunk_size = state.pop('chunk_size')
+        self.__dict__.update(state)
+        self.chunk = np.empty((chunk_size, 3), dtype=np.float64)
+        self.chunk_entities = np.empty(chunk_size, dtype=np.uint32)
+        self.chunk_meta = [None] * chunk_size
+
+    def timeline(self):
+        """Sampled positions in capture order"""
+        self.flush()
+        return list(self.sample)
+
+    def report(self):
+        self.flush()
+        print(f"\n🎯 POSITION ANALYSIS")
+        print("=" * 50)
+        if not self.count:
+            print("❌ No positions found in packets")
+            return
+
+        print(f"📊 Position statistics ({self.count} positions):")
+        for axis, name in enumerate('XYZ'):
+            print(f"   {name} range: {self.mins[axis]:.2f} to {self.maxs[axis]:.2f}")
+
+        if self.movement_count:
+            print(f"\n🏃 Movement analysis:")
+            print(f"   Average movement: {self.movement_sum / self.movement_count:.2f} units")
+            print(f"   Max movement: {self.movement_max:.2f} units")
+            print(f"   Total movements detected: {self.movement_count}")
+
+
+class PlayerNameAccumulator:
+    """Player name frequencies"""
+    name = 'player_names'
+
+    def __init__(self):
+        self.names = Counter()
+        self.name_patterns = defaultdict(int)
+
+    def add(self, packet):
+        names = packet.get('parsed_data', {}).get('names', [])
+        if not names:
+            return
+        direction = packet.get('direction', 'unknown')
+        for name in names:
+            self.names[name] += 1
+            self.name_patterns[f"{name}_{direction}"] += 1
+
+    def report(self):
+        print(f"\n👤 PLAYER NAME ANALYSIS")
+        print("=" * 50)
+        if not self.names:
+            print("❌ No player names found in packets")
+            return
+
+        total = sum(self.names.values())
+        print(f"📋 Found {total} name instances ({len(self.names)} unique)")
+
+        print(f"\n🏆 Most frequent names:")
+        for name, count in self.names.most_common(10):
+            print(f"   {name}: {count} times")
+
+        name_lengths = [len(name) for name in self.names]
+        print(f"\n📏 Name length statistics:")
+        print(f"   Average: {np.mean(name_lengths):.1f} characters")
+        print(f"   Range: {min(name_lengths)} to {max(name_lengths)} characters")
+
+
+def new_protocol_group():
+    """Empty per-header profile (module level so accumulators can be pickled)"""
+    return {
+        'count': 0,
+        'lengths': Counter(),
+        'directions': Counter(),
+        'position_count': 0,
+        'name_count': 0
+    }
+
+
+class ProtocolPatternAccumulator:
+    """Per-header length/direction profile with position and name hit counts"""
+    name = 'protocol_patterns'
+
+    def __init__(self, min_packets=3):
+        self.min_packets = min_packets
+        self.groups = defaultdict(new_protocol_group)
+
+    def add(self, packet):
+        group = self.groups[packet.get('analysis', {}).get('header', '')]
+        parsed = packet.get('parsed_data', {})
+        group['count'] += 1
+        group['lengths'][packet.get('payload_length', 0)] += 1
+        group['directions'][packet.get('direction', 'unknown')] += 1
+        if parsed.get('positions'):
+            group['position_count'] += 1
+        if parsed.get('names'):
+            group['name_count'] += 1
+
+    def report(self):
+        print(f"\n🔬 PROTOCOL PATTERN ANALYSIS")
+        print("=" * 50)
+        for header, group in self.groups.items():
+            count = group['count']
+            if count < self.min_packets:  # Skip rare headers
+                continue
+
+            print(f"\n📋 Header {header} ({count} packets):")
+            print(f"   Length range: {min(group['lengths'])} - {max(group['lengths'])} bytes")
+            print(f"   Most common length: {group['lengths'].most_common(1)[0]}")
+            print(f"   Direction: {group['directions'].most_common(1)[0]}")
+
+            if group['position_count'] > count * 0.5:
+                print(f"   🎯 Likely position update packet (contains positions in {group['position_count']}/{count} packets)")
+            if group['name_count'] > 0:
+                print(f"   👤 Contains player names in {group['name_count']}/{count} packets")
+
+
+class HeaderSketchAccumulator:
+    """Fixed-memory top-k opcodes, sizes and header/size pairs"""
+    name = 'header_sketch'
+
+    def __init__(self, k=64):
+        self.stats = StreamStatistics(k=k)
+
+    def add(self, packet):
+        header = packet.get('analysis', {}).get('header', '')
+        self.stats.add(header=header, size=packet.get('payload_length', 0), opcode=header[:4])
+
+    def report(self):
+        print(f"\n📈 TOP-K PACKET STATISTICS (sketch)")
+        print("=" * 50)
+        if not self.stats.packets:
+            print("❌ No packets found")
+            return
+
+        for dimension, title in (('opcode', 'opcodes'), ('header_size', 'header/size pairs')):
+            print(f"📋 Most common {title}:")
+            for item in self.stats.top(dimension, 5):
+                print(f"   {item['key']}: ~{item['count']} packets ({item['share'] * 100:.1f}%)")
+
+
+DEFAULT_ACCUMULATORS = (
+    PacketPatternAccumulator,
+    PositionAccumulator,
+    PlayerNameAccumulator,
+    ProtocolPatternAccumulator,
+    HeaderSketchAccumulator,
+)
+
+
+def run_stream_analysis(filename, accumulators=None, progress_every=100000):
+    """Feed every packet of a capture file through all accumulators once"""
+    if accumulators is None:
+        accumulators = [cls() for cls in DEFAULT_ACCUMULATORS]
+
+    reader = CaptureStreamReader(filename)
+    packet_count = 0
+    for packet in reader:
+        for accumulator in accumulators:
+            accumulator.add(packet)
+        packet_count += 1
+        if progress_every and packet_count % progress_every == 0:
+            print(f"   ... {packet_count} packets processed")
+
+    return reader.metadata, packet_count, {acc.name: acc for acc in accumulators}
@@ -0,0 +1,266 @@
+"""
+Albion Scanner - Streaming Packet Statistics
+Fixed-memory frequency statistics for live traffic: a count-min sketch
+answers "how often did X occur" for any key, and a space-saving summary
+tracks the top-k keys. Both are mergeable, so statistics from several
+sessions can be combined. StreamStatistics applies them to header bytes,
+opcodes, payload sizes and (header, size) pairs
+"""
+
+import json
+import hashlib
+import threading
+
+import numpy as np
+
+STATE_VERSION = 1
+
+
+def key_bytes(key):
+    """Stable byte encoding of a statistics key"""
+    if isinstance(key, bytes):
+        return key
+    return repr(key).encode('utf-8')
+
+
+class CountMinSketch:
+    """Approximate counts with one-sided error (never underestimates)"""
+
+    def __init__(self, width=2048, depth=4, seed=0):
+        self.width = width
+        self.depth = depth
+        self.seed = seed
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self.total = 0
+        self.rows = np.arange(depth)
+        self.salt = seed.to_bytes(8, 'little')
+
+    def indexes(self, key):
+        """Column of the key in each row (double hashing from one 128-bit digest)"""
+        digest = hashlib.blake2b(key_bytes(key), digest_size=16, salt=self.salt).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        return [(h1 + i * h2) % self.width for i in range(self.depth)]
+
+    def add(self, key, count=1):
+        columns = self.indexes(key)
+        self.table[self.rows, columns] += count
+        self.total += count
+        return int(self.table[self.rows, columns].min())
+
+    def estimate(self, key):
+        return int(self.table[self.rows, self.indexes(key)].min())
+
+    def error_bound(self):
+        """Overestimate bound (e/width * total) holding with probability 1 - e^-depth"""
+        return float(np.e / self.width * self.total)
+
+    def compatible(self, other):
+        return (self.width, self.depth, self.seed) == (other.width, other.depth, other.seed)
+
+    def merge(self, other):
+        if not self.compatible(other):
+            raise ValueError("Count-min sketches must share width, depth and seed to merge")
+        self.table += other.table
+        self.total += other.total
+        return self
+
+    def clear(self):
+        self.table.fill(0)
+        self.total = 0
+
+
+class SpaceSaving:
+    """Top-k heavy hitters in k counters (Metwally et al. space-saving).
+
+    Each tracked key carries (count, error): the true count lies in
+    [count - error, count].
+    """
+
+    def __init__(self, k=64):
+        self.k = k
+        self.counters = {}  # key -> [count, error]
+
+    def add(self, key, count=1):
+        counter = self.counters.get(key)
+        if counter is not None:
+            counter[0] += count
+        elif len(self.counters) < self.k:
+            self.counters[key] = [count, 0]
+        else:
+            # Replace the smallest counter; its count becomes the new key's error
+            victim = min(self.counters, key=lambda item: self.counters[item][0])
+            floor = self.counters.pop(victim)[0]
+            self.counters[key] = [floor + count, floor]
+
+    def min_count(self):
+        if len(self.counters) < self.k:
+            return 0
+        return min(counter[0] for counter in self.counters.values())
+
+    def top(self, n=None):
+        """[(key, count, error)] sorted by count"""
+        items = sorted(self.counters.items(), key=lambda item: item[1][0], reverse=True)
+        return [(key, count, error) for key, (count, error) in items[:n]]
+
+    def merge(self, other):
+        """Combine two summaries (keys missing on one side get its minimum as error)"""
+        mine, theirs = self.min_count(), other.min_count()
+        merged = {}
+        for key in self.counters.keys() | other.counters.keys():
+            a = self.counters.get(key, [mine, mine])
+            b = other.counters.get(key, [theirs, theirs])
+            merged[key] = [a[0] + b[0], a[1] + b[1]]
+        top = sorted(merged.items(), key=lambda item: item[1][0], reverse=True)[:self.k]
+        self.counters = dict(top)
+        return self
+
+    def clear(self):
+        self.counters.clear()
+
+
+class FrequencyTracker:
+    """Count-min sketch plus space-saving top-k for one kind of key"""
+
+    def __init__(self, k=64, width=2048, depth=4, seed=0):
+        self.sketch = CountMinSketch(width, depth, seed)
+        self.heavy = SpaceSaving(k)
+
+    def add(self, key, count=1):
+        self.sketch.add(key, count)
+        self.heavy.add(key, count)
+
+    def estimate(self, key):
+        return self.sketch.estimate(key)
+
+    def top(self, n=10):
+        """Heaviest keys with the tighter of the two upper bounds"""
+        total = self.sketch.total
+        results = []
+        for key, count, error in self.heavy.top(n):
+            estimate = min(count, self.sketch.estimate(key))
+            results.append({
+                'key': key,
+                'count': estimate,
+                'min_count': max(count - error, 0),
+                'share': estimate / total if total else 0.0
+            })
+        return results
+
+    def merge(self, other):
+        self.sketch.merge(other.sketch)
+        self.heavy.merge(other.heavy)
+        return self
+
+    def clear(self):
+        self.sketch.clear()
+        self.heavy.clear()
+
+
+class StreamStatistics:
+    """Header, opcode, size and (header, size) statistics in fixed memory"""
+    DIMENSIONS = ('header', 'opcode', 'size', 'header_size')
+
+    def __init__(self, k=64, width=2048, depth=4, seed=0):
+        self.params = {'k': k, 'width': width, 'depth': depth, 'seed': seed}
+        self.trackers = {name: FrequencyTracker(k, width, depth, seed) for name in self.DIMENSIONS}
+        self.packets = 0
+        self.lock = threading.Lock()
+
+    def add(self, header=None, size=None, opcode=None):
+        """Count one packet; any of the keys may be missing"""
+        with self.lock:
+            self.packets += 1
+            if header is not None:
+                self.trackers['header'].add(header)
+            if opcode is not None:
+                self.trackers['opcode'].add(opcode)
+            if size is not None:
+                self.trackers['size'].add(size)
+            if header is not None and size is not None:
+                self.trackers['header_size'].add(f'{header}/{size}')
+
+    def add_payload(self, payload):
+        """Count a raw payload: 4-byte header, 2-byte opcode prefix and size"""
+        self.add(header=payload[:4].hex(), size=len(payload), opcode=payload[:2].hex())
+
+    def top(self, dimension, n=10):
+        if dimension not in self.trackers:
+            raise KeyError(f"Unknown dimension {dimension!r}, expected one of {self.DIMENSIONS}")
+        with self.lock:
+            return self.trackers[dimension].top(n)
+
+    def estimate(self, dimension, key):
+        with self.lock:
+            return self.trackers[dimension].estimate(key)
+
+    def snapshot(self, n=10):
+        """Top-k of every dimension, for the dashboard"""
+        with self.lock:
+            return {
+                'packets': self.packets,
+                'top': {name: tracker.top(n) for name, tracker in self.trackers.items()},
+                'error_bound': self.trackers['header'].sketch.error_bound()
+            }
+
+    def merge(self, other):
+        with self.lock:
+            for name, tracker in self.trackers.items():
+                tracker.merge(other.trackers[name])
+            self.packets += other.packets
+        return self
+
+    def clear(self):
+        with self.lock:
+            for tracker in self.trackers.values():
+                tracker.clear()
+            self.packets = 0
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    # -- persistence for cross-session merging -------------------------------
+
+    def to_state(self):
+        with self.lock:
+            return {
+                'version': STATE_VERSION,
+                'params': self.params,
+                'packets': self.packets,
+                'trackers': {
+                    name: {
+                        'table': tracker.sketch.table.tolist(),
+                        'total': tracker.sketch.total,
+                        'heavy': [[key, count, error] for key, count, error in tracker.heavy.top()]
+                    }
+                    for name, tracker in self.trackers.items()
+                }
+            }
+
+    @classmethod
+    def from_state(cls, state):
+        if state.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported statistics state version {state.get('version')}")
+        stats = cls(**state['params'])
+        stats.packets = state['packets']
+        for name, data in state['trackers'].items():
+            tracker = stats.trackers[name]
+            tracker.sketch.table[:] = np.asarray(data['table'], dtype=np.int64)
+            tracker.sketch.total = data['total']
+            tracker.heavy.counters = {key: [count, error] for key, count, error in data['heavy']}
+        return stats
+
+    def save(self, filename):
+        with open(filename, 'w') as f:
+            json.dump(self.to_state(), f)
+
+    @classmethod
+    def load(cls, filename):
+        with open(filename, 'r') as f:
+            return cls.from_state(json.load(f))
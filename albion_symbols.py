@@ -0,0 +1,89 @@
+"""
+Albion Scanner - Symbol Table
+Interning pool for recurring strings (player names, guild tags, chat
+senders, item names): each distinct string is stored once and referred to by
+a small integer id, and the number of strings held is bounded by LRU
+eviction. Entity stores and event queues keep the ids; strings are
+materialized with lookup() only where data leaves the process (API
+responses, socket events, exports, SQLite)
+"""
+
+import threading
+from collections import OrderedDict
+
+# Id of the empty / unknown string
+NO_SYMBOL = 0
+
+# What lookup() returns for an id whose string has been evicted
+EVICTED = ''
+
+
+class SymbolTable:
+    """Bounded string <-> id table, least recently used strings evicted first
+
+    Names, guilds and chat senders come from heuristic matches on live
+    traffic, so the set of strings is open-ended; once max_symbols strings
+    are held, interning a new one evicts the least recently interned or
+    looked up string. Ids are never reused, so an evicted id can only turn
+    into the EVICTED placeholder, never into another string.
+    """
+
+    def __init__(self, max_symbols=100000):
+        self.max_symbols = max_symbols
+        self.ids = {'': NO_SYMBOL}
+        self.strings = OrderedDict()  # id -> string, least recently used first
+        self.next_symbol = NO_SYMBOL + 1
+        self.evictions = 0
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        return len(self.strings) + 1
+
+    def intern(self, value):
+        """Id of a string, adding it on first sight (None and '' map to NO_SYMBOL)"""
+        if not value:
+            return NO_SYMBOL
+        with self.lock:
+            symbol = self.ids.get(value)
+            if symbol is not None:
+                self.strings.move_to_end(symbol)
+                return symbol
+            symbol = self.next_symbol
+            self.next_symbol += 1
+            self.strings[symbol] = value
+            self.ids[value] = symbol
+            if len(self.strings) > self.max_symbols:
+                _, evicted = self.strings.popitem(last=False)
+                del self.ids[evicted]
+                self.evictions += 1
+        return symbol
+
+    def find(self, value):
+        """Id of an interned string (NO_SYMBOL for ''), or None"""
+        return self.ids.get(value or '')
+
+    def lookup(self, symbol):
+        """String of an id (EVICTED if it has been evicted)"""
+        if symbol == NO_SYMBOL:
+            return ''
+        with self.lock:
+            value = self.strings.get(symbol)
+            if value is None:
+                return EVICTED
+            self.strings.move_to_end(symbol)
+            return value
+
+    def get_stats(self):
+        with self.lock:
+            strings = list(self.strings.values())
+        return {
+            'symbols': len(strings),
+            'string_bytes': sum(len(value) for value in strings),
+            'max_symbols': self.max_symbols,
+            'evictions': self.evictions
+        }
+
+
+# Process-wide table shared by the decoder, dashboard and history store, so
+# an id means the same string everywhere
+symbols = SymbolTable()
@@ -0,0 +1,99 @@
+"""
+Albion Scanner - Text Extraction
+Byte-level extraction of player names, guild tags and chat lines: precompiled
+byte patterns run directly over the payload, matches are trimmed to the
+length announced by a uint8 / big-endian uint16 prefix when one fits, and
+only the matched slices are ever decoded
+"""
+
+import re
+
+NAME = re.compile(rb'[A-Za-z][A-Za-z0-9_]{2,19}')
+GUILD = re.compile(rb'\[([A-Z0-9]{2,8})\]')
+# Message text stops at the first control byte (printable ASCII / UTF-8 only)
+CHAT_LINE = re.compile(rb'([A-Za-z0-9_]{2,20}):[ \t]*([\x20-\x7e\x80-\xff]+)')
+# Chat markers, matched against the payload lowercased with a byte table
+CHAT_MARKERS = (b':', b'!', b'?', b'hello', b'hi', b'lol', b'gg')
+LOWERCASE = bytes.maketrans(bytes(range(ord('A'), ord('Z') + 1)), bytes(range(ord('a'), ord('z') + 1)))
+# NUL-delimited tokens without spaces or control characters
+NUL_DELIMITED = re.compile(rb'(?:(?<=\x00)|^)([^\x00-\x20\x7f]{3,80})(?=\x00|\Z)')
+
+PRINTABLE_ASCII = bytes(range(0x20, 0x7f))
+
+
+def as_text(value):
+    return value.decode('utf-8', errors='ignore')
+
+
+def prefixed_length(payload, start, available):
+    """Length announced by the uint16 / uint8 just before `start`, or 0"""
+    if start >= 2:
+        length = payload[start - 2] << 8 | payload[start - 1]
+        if 3 <= length <= available:
+            return length
+    if start >= 1:
+        length = payload[start - 1]
+        if 3 <= length <= available:
+            return length
+    return 0
+
+
+def extract_names(payload):
+    """Name-like tokens in payload order"""
+    names = []
+    for match in NAME.finditer(payload):
+        start, end = match.span()
+        length = prefixed_length(payload, start, end - start) or end - start
+        names.append(payload[start:start + length].decode('ascii'))
+    return names
+
+
+def has_name(payload):
+    """Whether extract_names() would find anything (first match only)"""
+    return NAME.search(payload) is not None
+
+
+def extract_guilds(payload):
+    """Guild tags written as [TAG]"""
+    return [tag.decode('ascii') for tag in GUILD.findall(payload)]
+
+
+def extract_chat(payload):
+    """(sender, message) of the first "sender: message" text, or None"""
+    match = CHAT_LINE.search(payload)
+    if match is None:
+        return None
+    start, end = match.span()
+    length = prefixed_length(payload, start, end - start)
+    if length > match.end(1) - start + 1:
+        end = start + length
+    message = payload[match.start(2):max(end, match.start(2))]
+    return as_text(match.group(1)), as_text(message).strip()
+
+
+def has_chat(payload):
+    """Whether extract_chat() would find a chat line"""
+    return CHAT_LINE.search(payload) is not None
+
+
+def looks_like_chat(payload):
+    # bytes substring search beats a regex alternation on zero-padded payloads
+    lowered = payload.translate(LOWERCASE)
+    return any(marker in lowered for marker in CHAT_MARKERS)
+
+
+def printable_ratio(payload):
+    """Fraction of payload bytes that are printable ASCII"""
+    if not payload:
+        return 0.0
+    return (len(payload) - len(payload.translate(None, PRINTABLE_ASCII))) / len(payload)
+
+
+def nul_delimited_names(payload, min_length=3, max_length=20):
+    """NUL-separated tokens that look like player names"""
+    names = []
+    for match in NUL_DELIMITED.finditer(payload):
+        token = as_text(match.group(1))
+        if min_length <= len(token) <= max_length and token.isprintable() and not token.isdigit():
+            names.append(token)
+    return names
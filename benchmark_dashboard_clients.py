@@ -0,0 +1,117 @@
+"""
+Albion Scanner - Dashboard Client Benchmark
+Simulates N concurrent socket.io clients against a running dashboard server
+(threaded or async mode) and reports connect, round-trip and broadcast latency
+"""
+
+import asyncio
+import argparse
+import time
+
+import socketio
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def describe(name, values_ms):
+    """Format latency percentiles for one metric"""
+    if not values_ms:
+        return f"   {name:<18} no samples"
+    return (f"   {name:<18} n={len(values_ms):<7} "
+            f"p50={percentile(values_ms, 50):7.2f}ms  "
+            f"p95={percentile(values_ms, 95):7.2f}ms  "
+            f"p99={percentile(values_ms, 99):7.2f}ms  "
+            f"max={max(values_ms):7.2f}ms")
+
+
+class SimulatedClient:
+    def __init__(self, url, results, ping_interval):
+        self.url = url
+        self.results = results
+        self.ping_interval = ping_interval
+        self.client = socketio.AsyncClient(reconnection=False)
+        self.client.on('player_update', self.on_player_update)
+
+    async def on_player_update(self, data):
+        # Server stamps player_update with time.time(); same host, so the
+        # difference is the broadcast delivery latency
+        sent = data.get('timestamp')
+        if sent:
+            self.results['broadcast'].append((time.time() - sent) * 1000)
+
+    async def run(self, duration):
+        start = time.perf_counter()
+        try:
+            await self.client.connect(self.url, transports=['websocket'])
+        except Exception:
+            self.results['failed'] += 1
+            return
+        self.results['connect'].append((time.perf_counter() - start) * 1000)
+
+        deadline = time.perf_counter() + duration
+        try:
+            while time.perf_counter() < deadline:
+                sent = time.perf_counter()
+                try:
+                    await self.client.call('ping_latency', {'t': sent}, timeout=5)
+                    self.results['rtt'].append((time.perf_counter() - sent) * 1000)
+                except Exception:
+                    self.results['timeouts'] += 1
+                await asyncio.sleep(self.ping_interval)
+        finally:
+            await self.client.disconnect()
+
+
+async def run_benchmark(url, clients, duration, ping_interval, ramp):
+    results = {'connect': [], 'rtt': [], 'broadcast': [], 'failed': 0, 'timeouts': 0}
+    sims = [SimulatedClient(url, results, ping_interval) for _ in range(clients)]
+
+    tasks = []
+    for sim in sims:
+        tasks.append(asyncio.create_task(sim.run(duration)))
+        if ramp:
+            await asyncio.sleep(ramp)
+    await asyncio.gather(*tasks)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Simulate N dashboard socket clients')
+    parser.add_argument('--url', default='http://localhost:5000')
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--duration', type=float, default=30.0, help='Seconds per client')
+    parser.add_argument('--ping-interval', type=float, default=0.5)
+    parser.add_argument('--ramp', type=float, default=0.005,
+                        help='Delay between client connects (seconds)')
+    args = parser.parse_args()
+
+    print(f"🧪 DASHBOARD CLIENT BENCHMARK")
+    print("=" * 60)
+    print(f"Server: {args.url}")
+    print(f"Clients: {args.clients} | Duration: {args.duration}s | Ping every {args.ping_interval}s")
+    print("-" * 60)
+
+    started = time.perf_counter()
+    results = asyncio.run(run_benchmark(
+        args.url, args.clients, args.duration, args.ping_interval, args.ramp
+    ))
+    elapsed = time.perf_counter() - started
+
+    print(f"Connected: {len(results['connect'])}/{args.clients} "
+          f"(failed {results['failed']}, ping timeouts {results['timeouts']})")
+    print(describe('connect', results['connect']))
+    print(describe('ping round-trip', results['rtt']))
+    print(describe('broadcast delay', results['broadcast']))
+    print(f"   Total runtime: {elapsed:.1f}s")
+    print("=" * 60)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,141 @@
+"""
+Albion Scanner - Decode Allocation Benchmark
+Measures per-packet memory allocations of the protocol decoder with
+tracemalloc: legacy dict output vs. unpooled and pooled DecodedRecord objects,
+for packets consumed one at a time and for packets held in a queue
+"""
+
+import argparse
+import random
+import struct
+import time
+import tracemalloc
+
+from albion_protocol_decoder import AlbionProtocolDecoder
+from albion_records import RecordPool
+
+MODES = ('dict', 'unpooled', 'pooled')
+
+
+def synthetic_payloads(count, seed=1):
+    """Movement-heavy mix of payloads matching the default message specs"""
+    rng = random.Random(seed)
+    names = [b'Archer_%d' % i for i in range(50)]
+    payloads = []
+    for _ in range(count):
+        kind = rng.random()
+        player_id = rng.randrange(1000, 50000)
+        if kind < 0.7:
+            payload = (b'\x01\x00\x00\x00' + struct.pack('<Ifff', player_id, rng.uniform(-2000, 2000),
+                                                        rng.uniform(-2000, 2000), rng.uniform(-50, 50)) + bytes(8))
+        elif kind < 0.85:
+            payload = b'\x02\x00\x00\x00' + struct.pack('<I', player_id) + rng.choice(names) + b'\x00[GUILD]'
+        elif kind < 0.95:
+            payload = b'\x04\x00\x00\x00' + rng.choice(names) + b': hello there!'
+        else:
+            payload = b'\x99\x99' + bytes(rng.randrange(256) for _ in range(30))
+        payloads.append(payload)
+    return payloads
+
+
+def make_decoder(mode):
+    decoder = AlbionProtocolDecoder()
+    if mode == 'unpooled':
+        decoder.pool = RecordPool(max_free=0)
+    return decoder
+
+
+def consume(decoder, payload, mode):
+    """Decode one packet the way a consumer of that mode sees it"""
+    record = decoder.decode_packet(payload, 'incoming')
+    if record is None:
+        return None
+    if mode == 'dict':
+        # What the decoder used to hand out: a fresh dict per packet
+        decoded = record.to_dict()
+        record.release()
+        return decoded
+    return record
+
+
+def finish(item, mode):
+    if item is not None and mode != 'dict':
+        item.release()
+
+
+def measure_streaming(payloads, mode):
+    """Average per-packet allocation peak when each packet is consumed at once"""
+    decoder = make_decoder(mode)
+    for payload in payloads:  # warm the pool and caches
+        finish(consume(decoder, payload, mode), mode)
+
+    tracemalloc.start()
+    total_peak = 0
+    for payload in payloads:
+        current, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        item = consume(decoder, payload, mode)
+        total_peak += tracemalloc.get_traced_memory()[1] - current
+        finish(item, mode)
+        del item
+    tracemalloc.stop()
+    return total_peak / len(payloads)
+
+
+def measure_queued(payloads, mode, depth):
+    """Live blocks and bytes per packet while batches of `depth` packets sit in a queue"""
+    decoder = make_decoder(mode)
+    batches = [payloads[i:i + depth] for i in range(0, len(payloads), depth)]
+    for batch in batches:  # warm the pool
+        for item in [consume(decoder, payload, mode) for payload in batch]:
+            finish(item, mode)
+
+    blocks = size = 0
+    tracemalloc.start()
+    for batch in batches:
+        held = [None] * len(batch)
+        before = tracemalloc.take_snapshot()
+        for index, payload in enumerate(batch):
+            held[index] = consume(decoder, payload, mode)
+        after = tracemalloc.take_snapshot()
+        for stat in after.compare_to(before, 'filename'):
+            blocks += stat.count_diff
+            size += stat.size_diff
+        for item in held:
+            finish(item, mode)
+        del held
+    tracemalloc.stop()
+    return blocks / len(payloads), size / len(payloads)
+
+
+def measure_speed(payloads, mode, repeat):
+    decoder = make_decoder(mode)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for payload in payloads:
+            finish(consume(decoder, payload, mode), mode)
+    return (time.perf_counter() - start) / (repeat * len(payloads)) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Per-packet allocation benchmark for the protocol decoder')
+    parser.add_argument('--packets', type=int, default=5000, help='synthetic packets per measurement')
+    parser.add_argument('--repeat', type=int, default=5, help='passes for the timing run')
+    parser.add_argument('--queue', type=int, default=256, help='packets held at once in the queued run')
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    payloads = synthetic_payloads(args.packets, args.seed)
+    print(f"🧪 Decode allocation benchmark: {len(payloads)} packets, queue depth {args.queue}")
+    print(f"   {'mode':<10} {'peak B/pkt':>11} {'queued blocks/pkt':>18} {'queued B/pkt':>13} {'µs/pkt':>8}")
+    for mode in MODES:
+        peak = measure_streaming(payloads, mode)
+        blocks, size = measure_queued(payloads, mode, args.queue)
+        speed = measure_speed(payloads, mode, args.repeat)
+        print(f"   {mode:<10} {peak:>11.1f} {blocks:>18.2f} {size:>13.1f} {speed:>8.2f}")
+    print("   peak = transient bytes while decoding one packet; queued = bytes/blocks")
+    print("   still allocated per packet while it waits for its consumer")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,408 @@
+"""
+Albion Scanner - Async Dashboard Server
+asyncio-native serving mode for the web dashboard: python-socketio on aiohttp,
+with the broadcaster, stats ticker and REST handlers running on one event loop
+"""
+
+import asyncio
+import threading
+import time
+import argparse
+
+import socketio
+from aiohttp import web
+
+from dashboard_server import DashboardServer
+from albion_static_assets import create_dashboard_assets
+
+
+class AsyncDashboardServer:
+    def __init__(self, packet_queue_size=10000, event_queue_size=10000, stats_interval=1.0):
+        self.sio = socketio.AsyncServer(async_mode='aiohttp', cors_allowed_origins='*')
+        self.app = web.Application()
+        self.sio.attach(self.app)
+
+        # Shared dashboard state; emits and scanner packets are routed
+        # through the event loop instead of threads
+        self.dashboard = DashboardServer(emit=self.emit, start_background=False)
+        self.dashboard.packet_sink = self.enqueue_packet
+        self.assets = create_dashboard_assets()
+
+        self.packet_queue_size = packet_queue_size
+        self.event_queue_size = event_queue_size
+        self.stats_interval = stats_interval
+
+        self.loop = None
+        self.loop_thread_id = None
+        self.server_thread = None  # set by start_in_thread
+        self.packet_queue = None
+        self.event_queue = None
+        self.tasks = []
+
+        self.stats = {
+            'packets_queued': 0,
+            'packets_dropped': 0,
+            'events_emitted': 0,
+            'events_dropped': 0,
+            'clients': 0
+        }
+
+        self.setup_routes()
+        self.setup_socket_events()
+        self.app.on_startup.append(self.on_startup)
+        self.app.on_cleanup.append(self.on_cleanup)
+
+    # ------------------------------------------------------------------
+    # Capture side -> event loop
+    # ------------------------------------------------------------------
+
+    def enqueue_packet(self, decoded_packet):
+        """Hand a decoded packet from the scanner thread to the event loop"""
+        if not decoded_packet or self.loop is None:
+            return
+        # The scanner releases its own reference when this returns; the
+        # queued one is released by the consumer (or on drop)
+        self.loop.call_soon_threadsafe(self.put_packet, decoded_packet.retain())
+
+    def put_packet(self, decoded_packet):
+        """Queue a decoded packet (runs on the loop), dropping when full"""
+        try:
+            self.packet_queue.put_nowait(decoded_packet)
+            self.stats['packets_queued'] += 1
+        except asyncio.QueueFull:
+            self.stats['packets_dropped'] += 1
+            decoded_packet.release()
+
+    def apply_packet(self, decoded_packet):
+        """Apply one queued packet to the dashboard and release it"""
+        try:
+            self.dashboard.process_scanner_packet(decoded_packet)
+        finally:
+            decoded_packet.release()
+
+    def emit(self, event, data):
+        """Queue an event for the broadcaster task"""
+        if self.loop is None:
+            return
+        if threading.get_ident() != self.loop_thread_id:
+            self.loop.call_soon_threadsafe(self.put_event, event, data)
+        else:
+            self.put_event(event, data)
+
+    def put_event(self, event, data):
+        """Queue an outgoing event (runs on the loop), dropping when full"""
+        try:
+            self.event_queue.put_nowait((event, data))
+        except asyncio.QueueFull:
+            self.stats['events_dropped'] += 1
+
+    # ------------------------------------------------------------------
+    # Background tasks
+    # ------------------------------------------------------------------
+
+    async def packet_consumer(self):
+        """Apply queued packets to the dashboard state in batches"""
+        while True:
+            self.apply_packet(await self.packet_queue.get())
+
+            # Drain whatever else is already waiting, then yield
+            for _ in range(min(self.packet_queue.qsize(), 256)):
+                self.apply_packet(self.packet_queue.get_nowait())
+
+            await asyncio.sleep(0)
+
+    async def broadcaster(self):
+        """Send queued events to all connected clients"""
+        while True:
+            event, data = await self.event_queue.get()
+            try:
+                await self.sio.emit(event, data)
+                self.stats['events_emitted'] += 1
+            except Exception as e:
+                print(f"Broadcast error ({event}): {e}")
+
+    async def stats_ticker(self):
+        """Periodic statistics/player updates and history flush"""
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            self.dashboard.update_statistics()
+            await self.loop.run_in_executor(None, self.dashboard.flush_history)
+
+    async def on_startup(self, app):
+        self.loop = asyncio.get_running_loop()
+        self.dashboard.open_history()
+        self.loop_thread_id = threading.get_ident()
+        self.packet_queue = asyncio.Queue(maxsize=self.packet_queue_size)
+        self.event_queue = asyncio.Queue(maxsize=self.event_queue_size)
+        self.tasks = [
+            asyncio.create_task(self.packet_consumer()),
+            asyncio.create_task(self.broadcaster()),
+            asyncio.create_task(self.stats_ticker())
+        ]
+
+    async def on_cleanup(self, app):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        self.dashboard.stop_scanner()
+        await self.loop.run_in_executor(None, self.dashboard.flush_history)
+
+    # ------------------------------------------------------------------
+    # REST handlers
+    # ------------------------------------------------------------------
+
+    def setup_routes(self):
+        routes = [
+            ('/', self.handle_index),
+            ('/static/{filename:.+}', self.handle_static),
+            ('/api/status', self.handle_status),
+            ('/api/players', self.handle_players),
+            ('/api/chat', self.handle_chat),
+            ('/api/statistics', self.handle_statistics),
+            ('/api/topk', self.handle_top_k),
+            ('/api/topk/{dimension}', self.handle_top_k),
+            ('/api/heatmap', self.handle_heatmap),
+            ('/api/positions', self.handle_positions),
+            ('/api/motion', self.handle_motion),
+            ('/api/motion/{player_id:\\d+}', self.handle_motion),
+            ('/api/server', self.handle_server_stats),
+            ('/api/history/players', self.handle_player_history),
+            ('/api/history/chat', self.handle_chat_history),
+            ('/api/history/movement/{player_id:\\d+}', self.handle_movement_history),
+        ]
+        for path, handler in routes:
+            self.app.router.add_get(path, handler)
+
+    def asset_response(self, request, name):
+        """Serve a cached asset with conditional/compressed response support"""
+        result = self.assets.respond(
+            name,
+            request.headers.get('Accept-Encoding'),
+            request.headers.get('If-None-Match')
+        )
+        if result is None:
+            return None
+        status, headers, body = result
+        return web.Response(body=body, status=status, headers=headers)
+
+    async def handle_index(self, request):
+        """Serve the dashboard HTML"""
+        response = self.asset_response(request, 'index')
+        if response is None:
+            return web.Response(
+                text="<h1>Dashboard HTML not found</h1>",
+                content_type='text/html'
+            )
+        return response
+
+    async def handle_static(self, request):
+        """Serve JS, images and other files from static/ out of memory"""
+        response = self.asset_response(request, f"static/{request.match_info['filename']}")
+        if response is None:
+            raise web.HTTPNotFound()
+        return response
+
+    async def handle_status(self, request):
+        return web.json_response(self.dashboard.get_status())
+
+    async def handle_players(self, request):
+        players = self.dashboard.get_active_players(limit=50)
+        return web.json_response({'players': players, 'count': len(players)})
+
+    async def handle_chat(self, request):
+        return web.json_response(self.dashboard.get_recent_chat(limit=20))
+
+    async def handle_statistics(self, request):
+        return web.json_response(self.dashboard.get_statistics())
+
+    async def handle_top_k(self, request):
+        """Top-k headers, opcodes, sizes and header/size pairs"""
+        try:
+            limit = int(request.query.get('limit', 10))
+        except ValueError:
+            limit = 10
+        try:
+            return web.json_response(
+                self.dashboard.get_top_k(request.match_info.get('dimension'), limit)
+            )
+        except KeyError as e:
+            return web.json_response({'error': str(e.args[0])}, status=404)
+    
+    async def handle_motion(self, request):
+        """Derived motion features, for all players or one player"""
+        player_id = request.match_info.get('player_id')
+        return web.json_response(
+            self.dashboard.get_motion(int(player_id) if player_id else None)
+        )
+
+    async def handle_positions(self, request):
+        """Dead-reckoned positions at ?t=<unix time> (default: now)"""
+        try:
+            timestamp = float(request.query['t']) if 't' in request.query else None
+        except ValueError:
+            raise web.HTTPBadRequest(text='t must be a unix timestamp')
+        return web.json_response(self.dashboard.get_position_estimates(timestamp))
+
+    async def handle_heatmap(self, request):
+        """Activity heatmap as a compact binary frame"""
+        try:
+            downsample = int(request.query.get('downsample', 1))
+        except ValueError:
+            downsample = 1
+        return web.Response(
+            body=self.dashboard.get_heatmap_frame(downsample),
+            content_type='application/octet-stream',
+            headers={'Cache-Control': 'no-store'}
+        )
+
+    async def handle_server_stats(self, request):
+        """Event loop queue depths and drop counters"""
+        return web.json_response({
+            **self.stats,
+            'packet_queue_depth': self.packet_queue.qsize(),
+            'event_queue_depth': self.event_queue.qsize()
+        })
+
+    async def run_history_query(self, kind, request, **path_params):
+        """History queries hit SQLite, so run them off the event loop"""
+        args = dict(request.query)
+        payload, status = await self.loop.run_in_executor(
+            None, lambda: self.dashboard.query_history(kind, args, **path_params)
+        )
+        return web.json_response(payload, status=status)
+
+    async def handle_player_history(self, request):
+        return await self.run_history_query('players', request)
+
+    async def handle_chat_history(self, request):
+        return await self.run_history_query('chat', request)
+
+    async def handle_movement_history(self, request):
+        player_id = int(request.match_info['player_id'])
+        return await self.run_history_query('movement', request, player_id=player_id)
+
+    # ------------------------------------------------------------------
+    # SocketIO events
+    # ------------------------------------------------------------------
+
+    def setup_socket_events(self):
+        sio = self.sio
+
+        @sio.event
+        async def connect(sid, environ):
+            self.stats['clients'] += 1
+            await sio.emit('stats_update', self.dashboard.get_statistics_snapshot(), to=sid)
+            await sio.emit('player_update', {
+                'players': self.dashboard.get_active_players(limit=20),
+                'timestamp': time.time()
+            }, to=sid)
+
+        @sio.event
+        async def disconnect(sid):
+            self.stats['clients'] -= 1
+
+        @sio.event
+        async def start_scanner(sid, data):
+            data = data or {}
+            success, message = self.dashboard.start_scanner(
+                data.get('interface', '5'), data.get('port', 5056)
+            )
+            await sio.emit('scanner_response', {
+                'action': 'start', 'success': success, 'message': message
+            }, to=sid)
+
+        @sio.event
+        async def stop_scanner(sid, data=None):
+            success, message = self.dashboard.stop_scanner()
+            await sio.emit('scanner_response', {
+                'action': 'stop', 'success': success, 'message': message
+            }, to=sid)
+
+        @sio.event
+        async def export_data(sid, data=None):
+            success, result = await self.loop.run_in_executor(None, self.dashboard.export_data)
+            await sio.emit('export_response', {
+                'success': success,
+                'filename': result if success else None,
+                'error': result if not success else None
+            }, to=sid)
+
+        @sio.event
+        async def clear_data(sid, data=None):
+            await self.loop.run_in_executor(None, self.dashboard.clear_data)
+            await sio.emit('data_cleared', {'success': True}, to=sid)
+            self.emit('stats_update', self.dashboard.get_statistics_snapshot())
+
+        @sio.event
+        async def ping_latency(sid, data):
+            return data
+
+    def run(self, host='0.0.0.0', port=5000):
+        """Run the server until interrupted"""
+        web.run_app(self.app, host=host, port=port, print=None)
+
+    def start_in_thread(self, host='0.0.0.0', port=5000, timeout=10.0):
+        """Serve from a daemon thread with its own event loop (returns once listening)"""
+        started = threading.Event()
+        errors = []
+
+        def serve():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            runner = web.AppRunner(self.app)
+            try:
+                loop.run_until_complete(runner.setup())
+                loop.run_until_complete(web.TCPSite(runner, host, port).start())
+            except Exception as e:
+                errors.append(e)
+                started.set()
+                loop.run_until_complete(runner.cleanup())
+                loop.close()
+                return
+            started.set()
+            try:
+                loop.run_forever()
+            finally:
+                loop.run_until_complete(runner.cleanup())
+                loop.close()
+
+        self.server_thread = threading.Thread(target=serve, name='dashboard-server', daemon=True)
+        self.server_thread.start()
+        started.wait(timeout)
+        if errors:
+            raise errors[0]
+        return self.server_thread
+
+    def stop_thread(self, timeout=5.0):
+        """Stop a server started with start_in_thread (runs the cleanup hooks)"""
+        if self.server_thread is None or self.loop is None:
+            return
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.server_thread.join(timeout)
+        self.server_thread = None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Albion dashboard (asyncio serving mode)')
+    parser.add_argument('--host', default='0.0.0.0')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--packet-queue', type=int, default=10000,
+                        help='Max decoded packets buffered between scanner and loop')
+    args = parser.parse_args()
+
+    print("🚀 Starting Albion Scanner Dashboard Server (async mode)")
+    print("=" * 50)
+    print(f"Dashboard URL: http://localhost:{args.port}")
+    print(f"API Base URL: http://localhost:{args.port}/api/")
+    print(f"Loop metrics: http://localhost:{args.port}/api/server")
+    print("=" * 50)
+
+    server = AsyncDashboardServer(packet_queue_size=args.packet_queue)
+    try:
+        server.run(host=args.host, port=args.port)
+    except KeyboardInterrupt:
+        print("\n⏹️ Server stopped by user")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,4 +1,4 @@
-from flask import Flask, render_template, jsonify, request
+from flask import Flask, render_template, jsonify, request, Response
 from flask_socketio import SocketIO, emit
 import json
 import time
@@ -9,23 +9,39 @@ import os
 
 # Import our scanner classes
 try:
-    from albion_protocol_decoder import AdvancedAlbionScanner, AlbionProtocolDecoder
+    from albion_protocol_decoder import AdvancedAlbionScanner, AlbionProtocolDecoder, release_record
 except ImportError:
     print("Warning: Scanner modules not found. Running in demo mode.")
     AdvancedAlbionScanner = None
     AlbionProtocolDecoder = None
 
-app = Flask(__name__)
+from albion_history_store import AlbionHistoryStore
+from albion_static_assets import create_dashboard_assets
+from albion_heatmap import DensityGrid
+from albion_movement import MovementTracker, PositionEstimator
+from albion_stream_stats import StreamStatistics
+from albion_symbols import symbols, NO_SYMBOL
+from albion_pipeline import Stage, tap, DROP_OLDEST
+
+app = Flask(__name__, static_folder=None)  # static/ is served by the asset cache
 app.config['SECRET_KEY'] = 'albion_scanner_secret_key'
 socketio = SocketIO(app, cors_allowed_origins="*")
 
 class DashboardServer:
-    def __init__(self):
+    def __init__(self, emit=None, start_background=True, history=None):
+        # Event emitter, the Flask-SocketIO broadcaster unless a serving
+        # mode (e.g. dashboard_async_server) provides its own
+        self.emit = emit or socketio.emit
+        
+        # Where decoded packets from the scanner thread are delivered
+        self.packet_sink = self.process_scanner_packet
+        
         self.scanner = None
         self.scanner_thread = None
         self.is_scanning = False
         
-        # Data storage
+        # Data storage; names, guilds and chat senders are held as symbol
+        # ids (albion_symbols) and only turned into strings for clients
         self.players = {}
         self.chat_messages = deque(maxlen=100)
         self.packet_stats = {
@@ -37,51 +53,110 @@ class DashboardServer:
             'unknown': 0
         }
         self.packets_per_second = 0
-        self.packet_buffer = deque(maxlen=50)
+        self.packet_buffer = deque(maxlen=50)  # arrival times for the rate
+        
+        # Indexed history for the paginated API (flushed by the stats loop).
+        # Opened by the serving process (open_history), so importing this
+        # module or building a DashboardServer never touches the database
+        self.history = history
+        self.history_path = 'albion_history.db'
+        
+        # Per-player movement rings; motion features are derived in one
+        # batch pass per stats tick and cached for the API
+        self.movement = MovementTracker(ring_size=16)
+        self.movement_stale_after = 300  # seconds; rings of players unseen longer are freed
+        self.motion = {}
+        self.estimator = PositionEstimator(self.movement)
+        
+        # Header/opcode/size top-k, filled by the scanner from raw payloads
+        self.header_stats = StreamStatistics()
+        
+        # Decaying activity heatmap, pushed to clients as a binary frame
+        self.heatmap = DensityGrid(cell_size=25.0, half_life=120.0)
+        self.heatmap_interval = 5  # seconds between heatmap_update events
+        self.last_heatmap_emit = 0
+        self.last_heatmap_version = -1
         
         # Performance tracking
         self.last_update = time.time()
         self.update_lock = threading.Lock()
         
         # Start background tasks
-        self.start_background_tasks()
+        if start_background:
+            self.start_background_tasks()
+    
+    def update_statistics(self):
+        """Recalculate rates and push periodic updates to clients"""
+        with self.update_lock:
+            # Calculate packets per second
+            current_time = time.time()
+            self.packets_per_second = sum(1 for arrived in self.packet_buffer
+                                          if current_time - arrived <= 1.0)
+            
+            # Derive speed/heading/state for every tracked player at once
+            self.movement.evict_stale(current_time - self.movement_stale_after)
+            self.motion = MovementTracker.features_to_records(
+                self.movement.compute_features()
+            )
+            
+            # Emit updates to connected clients
+            self.emit_statistics_update()
+            self.emit_player_update()
+            
+            # Idle periods still change the heatmap: it fades out
+            self.heatmap.apply_decay(current_time)
+            if (current_time - self.last_heatmap_emit >= self.heatmap_interval and
+                self.heatmap.version != self.last_heatmap_version):
+                self.emit('heatmap_update', self.heatmap.to_bytes(current_time))
+                self.last_heatmap_emit = current_time
+                self.last_heatmap_version = self.heatmap.version
+    
+    def open_history(self):
+        """Open the history database if it is not open yet; returns the store"""
+        if self.history is None:
+            self.history = AlbionHistoryStore(self.history_path)
+        return self.history
+    
+    def flush_history(self):
+        """Persist queued history rows (blocking I/O, keep off the update lock)"""
+        if self.history is None:
+            return
+        try:
+            self.history.flush()
+        except Exception as e:
+            print(f"History flush error: {e}")
     
     def start_background_tasks(self):
         """Start background tasks for data processing"""
+        self.open_history()
+        
         def stats_updater():
             while True:
                 time.sleep(1)
-                with self.update_lock:
-                    # Calculate packets per second
-                    current_time = time.time()
-                    recent_packets = [p for p in self.packet_buffer 
-                                    if current_time - p['timestamp'] <= 1.0]
-                    self.packets_per_second = len(recent_packets)
-                    
-                    # Emit updates to connected clients
-                    self.emit_statistics_update()
-                    self.emit_player_update()
+                self.update_statistics()
+                self.flush_history()
         
         stats_thread = threading.Thread(target=stats_updater, daemon=True)
         stats_thread.start()
     
     def process_scanner_packet(self, decoded_packet):
-        """Process packet from scanner and update dashboard data"""
+        """Process a decoded record from the scanner and update dashboard data
+        
+        The record is only borrowed: nothing here keeps a reference to it
+        once the call returns.
+        """
         if not decoded_packet:
             return
         
         with self.update_lock:
             # Update packet statistics
             self.packet_stats['total'] += 1
-            packet_type = decoded_packet.get('type', 'unknown')
+            packet_type = decoded_packet.type or 'unknown'
             if packet_type in self.packet_stats:
                 self.packet_stats[packet_type] += 1
             
             # Add to packet buffer for rate calculation
-            self.packet_buffer.append({
-                'timestamp': time.time(),
-                'type': packet_type
-            })
+            self.packet_buffer.append(time.time())
             
             # Process specific packet types
             if packet_type == 'movement':
@@ -92,114 +167,269 @@ class DashboardServer:
                 self.process_chat_packet(decoded_packet)
             
             # Emit packet update to clients
-            socketio.emit('packet_update', {
+            self.emit('packet_update', {
                 'type': packet_type,
-                'data': decoded_packet,
+                'data': decoded_packet.to_dict(),
                 'timestamp': time.time()
             })
     
     def process_movement_packet(self, packet):
         """Process movement packet"""
-        player_id = packet.get('player_id')
-        position = packet.get('position')
+        player_id = packet.player_id
         
-        if player_id and position:
+        if player_id and packet.x is not None:
             current_time = time.time()
+            x, y, z = packet.x, packet.y, packet.z
             
             if player_id not in self.players:
                 self.players[player_id] = {
                     'id': player_id,
-                    'name': f'Player_{player_id}',
-                    'guild': '',
-                    'position': position,
-                    'last_seen': current_time,
-                    'movement_history': deque(maxlen=10)
+                    'name_id': NO_SYMBOL,
+                    'guild_id': NO_SYMBOL,
+                    'position': {'x': x, 'y': y, 'z': z},
+                    'last_seen': current_time
                 }
             else:
                 player = self.players[player_id]
-                # Calculate movement speed
-                if player['position']:
-                    old_pos = player['position']
-                    distance = ((position['x'] - old_pos['x'])**2 + 
-                              (position['y'] - old_pos['y'])**2)**0.5
-                    time_diff = current_time - player['last_seen']
-                    speed = distance / time_diff if time_diff > 0 else 0
-                    
-                    player['movement_history'].append({
-                        'position': position.copy(),
-                        'timestamp': current_time,
-                        'speed': speed
-                    })
-                
-                player['position'] = position
+                position = player['position']
+                position['x'], position['y'], position['z'] = x, y, z
                 player['last_seen'] = current_time
+            
+            self.movement.record(player_id, x, y, z, current_time)
+            self.heatmap.add(x, y, current_time)
+            if self.history is not None:
+                self.history.record_movement(player_id, self.players[player_id]['position'], current_time)
     
     def process_player_info_packet(self, packet):
         """Process player info packet"""
-        player_id = packet.get('player_id')
-        name = packet.get('name')
-        guild = packet.get('guild')
+        player_id = packet.player_id
+        name = packet.name
+        guild = packet.guild
         
         if player_id and name:
             current_time = time.time()
+            name_id = symbols.intern(name)
+            guild_id = symbols.intern(guild)
             
             if player_id not in self.players:
                 self.players[player_id] = {
                     'id': player_id,
-                    'name': name,
-                    'guild': guild or '',
+                    'name_id': name_id,
+                    'guild_id': guild_id,
                     'position': {'x': 0, 'y': 0, 'z': 0},
-                    'last_seen': current_time,
-                    'movement_history': deque(maxlen=10)
+                    'last_seen': current_time
                 }
             else:
                 player = self.players[player_id]
-                player['name'] = name
-                if guild:
-                    player['guild'] = guild
+                player['name_id'] = name_id
+                if guild_id:
+                    player['guild_id'] = guild_id
                 player['last_seen'] = current_time
+            
+            if self.history is not None:
+                self.history.record_player(player_id, name_id, guild_id, current_time)
     
     def process_chat_packet(self, packet):
         """Process chat packet"""
-        sender = packet.get('sender')
-        message = packet.get('message')
+        sender = packet.sender
+        message = packet.text
         
         if sender and message:
             chat_entry = {
-                'sender': sender,
+                'sender_id': symbols.intern(sender),
                 'message': message,
                 'timestamp': time.time()
             }
             self.chat_messages.append(chat_entry)
+            if self.history is not None:
+                self.history.record_chat(chat_entry['sender_id'], message, chat_entry['timestamp'])
             
             # Emit chat update to clients
-            socketio.emit('chat_update', chat_entry)
+            self.emit('chat_update', self.chat_record(chat_entry))
     
     def emit_statistics_update(self):
         """Emit statistics update to all clients"""
-        active_players = self.get_active_players_count()
-        
-        socketio.emit('stats_update', {
-            'total_packets': self.packet_stats['total'],
-            'packets_per_second': self.packets_per_second,
-            'players_detected': len(self.players),
-            'active_players': active_players,
-            'packet_breakdown': self.packet_stats.copy()
-        })
+        self.emit('stats_update', self.get_statistics_snapshot())
     
     def emit_player_update(self):
         """Emit player data update to all clients"""
         active_players = self.get_active_players(limit=20)
         
-        socketio.emit('player_update', {
+        self.emit('player_update', {
             'players': active_players,
             'timestamp': time.time()
         })
     
+    def get_statistics_snapshot(self):
+        """Get the payload of a stats_update event"""
+        return {
+            'total_packets': self.packet_stats['total'],
+            'packets_per_second': self.packets_per_second,
+            'players_detected': len(self.players),
+            'active_players': self.get_active_players_count(),
+            'packet_breakdown': self.packet_stats.copy()
+        }
+    
+    def get_status(self):
+        """Get current scanner status"""
+        return {
+            'scanning': self.is_scanning,
+            'players_detected': len(self.players),
+            'active_players': self.get_active_players_count(),
+            'total_packets': self.packet_stats['total'],
+            'packets_per_second': self.packets_per_second
+        }
+    
+    def get_statistics(self):
+        """Get packet statistics"""
+        return {
+            'packet_stats': self.packet_stats,
+            'packets_per_second': self.packets_per_second,
+            'players_detected': len(self.players),
+            'active_players': self.get_active_players_count(),
+            'dispatch': self.scanner.decoder.get_dispatch_stats() if self.scanner else None,
+            'decode_cache': self.scanner.decoder.memo.get_stats() if self.scanner else None,
+            'pipeline': self.scanner.pipeline.get_metrics() if self.scanner and self.scanner.pipeline else None,
+            'symbols': symbols.get_stats()
+        }
+    
+    @staticmethod
+    def chat_record(entry):
+        """Client representation of a stored chat entry"""
+        return {
+            'sender': symbols.lookup(entry['sender_id']),
+            'message': entry['message'],
+            'timestamp': entry['timestamp']
+        }
+    
+    @staticmethod
+    def player_name(player):
+        """Display name of a stored player (id-based until name data arrives)"""
+        # Also falls back when the name was evicted from the symbol table
+        return symbols.lookup(player['name_id']) or f"Player_{player['id']}"
+    
+    def get_recent_chat(self, limit=20):
+        """Get the most recent chat messages"""
+        messages = [self.chat_record(entry) for entry in list(self.chat_messages)[-limit:]]
+        return {
+            'messages': messages,
+            'count': len(messages)
+        }
+    
+    def query_history(self, kind, args, **path_params):
+        """Run a history query from request arguments.
+        
+        Returns (payload, http_status). ``args`` is any mapping of query
+        string values so both serving modes can share it.
+        """
+        if self.history is None:
+            return {'error': 'History storage is not open on this server'}, 503
+        
+        queries = {
+            'players': ('players', self.history.query_players, {'name': 'name', 'guild': 'guild'}),
+            'chat': ('messages', self.history.query_chat, {'sender': 'sender', 'keyword': 'q'}),
+            'movement': ('track', self.history.query_movement, {}),
+        }
+        key, query, filter_args = queries[kind]
+        
+        try:
+            filters = {name: args.get(arg) for name, arg in filter_args.items()}
+            filters.update(path_params)
+            limit = args.get('limit')
+            since = args.get('since')
+            until = args.get('until')
+            result = query(
+                cursor=args.get('cursor'),
+                limit=int(limit) if limit else None,
+                since=float(since) if since else None,
+                until=float(until) if until else None,
+                **filters
+            )
+        except ValueError as e:
+            return {'error': str(e)}, 400
+        except TimeoutError as e:
+            return {'error': str(e)}, 503
+        
+        return {
+            key: result['items'],
+            'count': result['count'],
+            'next_cursor': result['next_cursor']
+        }, 200
+    
+    def get_motion(self, player_id=None):
+        """Get derived motion features (all players, or one with its track)"""
+        if player_id is None:
+            return {
+                'players': {str(pid): m for pid, m in self.motion.items()},
+                'count': len(self.motion)
+            }
+        
+        with self.update_lock:
+            features = MovementTracker.features_to_records(
+                self.movement.compute_features([player_id])
+            )
+            track = self.movement.track(player_id)
+        return {
+            'id': player_id,
+            'motion': features.get(player_id),
+            'track': track
+        }
+    
+    def get_position_estimates(self, timestamp=None):
+        """Interpolated/extrapolated positions of all tracked players"""
+        if timestamp is None:
+            timestamp = time.time()
+        with self.update_lock:
+            estimates = self.estimator.estimate(timestamp)
+        players = PositionEstimator.estimates_to_records(estimates)
+        return {
+            'timestamp': timestamp,
+            'players': players,
+            'count': len(players)
+        }
+    
+    def get_heatmap_frame(self, downsample=1):
+        """Get the current heatmap as a binary frame (see albion_heatmap)"""
+        with self.update_lock:
+            return self.heatmap.to_bytes(downsample=max(1, min(int(downsample), 16)))
+    
+    def get_top_k(self, dimension=None, limit=10):
+        """Live top-k headers/opcodes/sizes; all dimensions when none is given"""
+        limit = max(1, min(int(limit), 64))
+        if dimension is None:
+            return self.header_stats.snapshot(limit)
+        return {
+            'dimension': dimension,
+            'packets': self.header_stats.packets,
+            'top': self.header_stats.top(dimension, limit)
+        }
+    
+    def clear_data(self):
+        """Clear all collected data"""
+        with self.update_lock:
+            self.players.clear()
+            self.chat_messages.clear()
+            self.packet_stats = {
+                'total': 0,
+                'movement': 0,
+                'player_info': 0,
+                'chat': 0,
+                'items': 0,
+                'unknown': 0
+            }
+            self.packet_buffer.clear()
+            self.heatmap.clear()
+            self.movement.clear()
+            self.motion = {}
+        self.header_stats.clear()
+        if self.history is not None:
+            self.history.clear()
+    
     def get_active_players_count(self):
         """Get count of players seen in last 60 seconds"""
         current_time = time.time()
-        return sum(1 for player in self.players.values() 
+        # list() snapshot: REST handlers read while the scanner thread inserts
+        return sum(1 for player in list(self.players.values())
                   if current_time - player['last_seen'] < 60)
     
     def get_active_players(self, limit=None):
@@ -208,13 +438,14 @@ class DashboardServer:
         active = [
             {
                 'id': p['id'],
-                'name': p['name'],
-                'guild': p['guild'],
-                'position': p['position'],
+                'name': self.player_name(p),
+                'guild': symbols.lookup(p['guild_id']),
+                'position': dict(p['position']),  # snapshot, updated in place
                 'last_seen': p['last_seen'],
-                'time_since_seen': current_time - p['last_seen']
+                'time_since_seen': current_time - p['last_seen'],
+                'motion': self.motion.get(p['id'])
             }
-            for p in self.players.values()
+            for p in list(self.players.values())
             if current_time - p['last_seen'] < 300  # 5 minutes
         ]
         
@@ -226,6 +457,19 @@ class DashboardServer:
         
         return active
     
+    def attach_scanner(self, scanner):
+        """Make scanner the dashboard's data source; returns the pipeline stage to run it with"""
+        self.scanner = scanner
+        self.scanner.header_stats = self.header_stats
+        self.is_scanning = True
+        
+        # Feed the dashboard from a stage of the scanner pipeline (after
+        # the world state, before console output); when the dashboard
+        # falls behind, the oldest queued packets are dropped
+        return Stage('dashboard', tap(lambda decoded: self.packet_sink(decoded)),
+                     queue_size=scanner.config['queue_size'],
+                     backpressure=DROP_OLDEST, on_drop=release_record)
+    
     def start_scanner(self, interface='5', port=5056):
         """Start the packet scanner"""
         if self.is_scanning:
@@ -235,28 +479,15 @@ class DashboardServer:
             return False, "Scanner module not available"
         
         try:
-            self.scanner = AdvancedAlbionScanner(interface, port)
-            
-            # Override the scanner's packet processing to feed our dashboard
-            original_process = self.scanner.process_packet
-            
-            def dashboard_process_packet(packet):
-                # Call original processing
-                decoded = original_process(packet)
-                # Feed to dashboard
-                self.process_scanner_packet(decoded)
-                return decoded
-            
-            self.scanner.process_packet = dashboard_process_packet
+            dashboard_stage = self.attach_scanner(AdvancedAlbionScanner(interface, port))
             
             # Start scanner in separate thread
             self.scanner_thread = threading.Thread(
                 target=self.scanner.start_scanning,
+                kwargs={'stages': [dashboard_stage]},
                 daemon=True
             )
             self.scanner_thread.start()
-            
-            self.is_scanning = True
             return True, "Scanner started successfully"
             
         except Exception as e:
@@ -288,14 +519,15 @@ class DashboardServer:
             'players': {
                 str(pid): {
                     'id': p['id'],
-                    'name': p['name'],
-                    'guild': p['guild'],
-                    'position': p['position'],
+                    'name': self.player_name(p),
+                    'guild': symbols.lookup(p['guild_id']),
+                    'position': dict(p['position']),  # snapshot, updated in place
                     'last_seen': p['last_seen']
                 }
-                for pid, p in self.players.items()
+                # list() snapshots: exports run while the scanner thread inserts
+                for pid, p in list(self.players.items())
             },
-            'chat_messages': list(self.chat_messages),
+            'chat_messages': [self.chat_record(entry) for entry in list(self.chat_messages)],
             'active_player_count': self.get_active_players_count()
         }
         
@@ -308,34 +540,48 @@ class DashboardServer:
         except Exception as e:
             return False, str(e)
 
-# Global dashboard instance
-dashboard = DashboardServer()
+# Global dashboard instance (stats loop is started by the server entry point)
+dashboard = DashboardServer(start_background=False)
+
+# Dashboard page and static/ files, loaded once and pre-compressed
+assets = create_dashboard_assets()
+
+def asset_response(name):
+    """Serve a cached asset with conditional/compressed response support"""
+    result = assets.respond(
+        name,
+        request.headers.get('Accept-Encoding'),
+        request.headers.get('If-None-Match')
+    )
+    if result is None:
+        return None
+    status, headers, body = result
+    return Response(body, status=status, headers=headers)
 
 # Flask routes
 @app.route('/')
 def index():
     """Serve the dashboard HTML"""
-    # In a real deployment, you'd use render_template
-    # For now, serve the HTML file directly
-    try:
-        with open('albion_web_dashboard.html', 'r', encoding='utf-8') as f:
-            return f.read()
-    except FileNotFoundError:
+    response = asset_response('index')
+    if response is None:
         return """
         <h1>Dashboard HTML not found</h1>
         <p>Please make sure albion_web_dashboard.html is in the same directory as this script.</p>
         """
+    return response
+
+@app.route('/static/<path:filename>')
+def static_asset(filename):
+    """Serve JS, images and other files from static/ out of memory"""
+    response = asset_response(f'static/{filename}')
+    if response is None:
+        return jsonify({'error': 'Not found'}), 404
+    return response
 
 @app.route('/api/status')
 def get_status():
     """Get current scanner status"""
-    return jsonify({
-        'scanning': dashboard.is_scanning,
-        'players_detected': len(dashboard.players),
-        'active_players': dashboard.get_active_players_count(),
-        'total_packets': dashboard.packet_stats['total'],
-        'packets_per_second': dashboard.packets_per_second
-    })
+    return jsonify(dashboard.get_status())
 
 @app.route('/api/players')
 def get_players():
@@ -349,21 +595,61 @@ def get_players():
 @app.route('/api/chat')
 def get_chat():
     """Get recent chat messages"""
-    messages = list(dashboard.chat_messages)[-20:]  # Last 20 messages
-    return jsonify({
-        'messages': messages,
-        'count': len(messages)
-    })
+    return jsonify(dashboard.get_recent_chat(limit=20))
+
+@app.route('/api/history/players')
+def get_player_history():
+    """Query player history by name prefix, guild and time window"""
+    payload, status = dashboard.query_history('players', request.args)
+    return jsonify(payload), status
+
+@app.route('/api/history/chat')
+def get_chat_history():
+    """Query chat history by sender, keyword and time window"""
+    payload, status = dashboard.query_history('chat', request.args)
+    return jsonify(payload), status
+
+@app.route('/api/history/movement/<int:player_id>')
+def get_movement_history(player_id):
+    """Query the movement track of a single player"""
+    payload, status = dashboard.query_history('movement', request.args, player_id=player_id)
+    return jsonify(payload), status
+
+@app.route('/api/motion')
+def get_motion():
+    """Get speed, heading, acceleration and motion state of tracked players"""
+    return jsonify(dashboard.get_motion())
+
+@app.route('/api/motion/<int:player_id>')
+def get_player_motion(player_id):
+    """Get motion features and the recent movement ring of one player"""
+    return jsonify(dashboard.get_motion(player_id))
+
+@app.route('/api/positions')
+def get_positions():
+    """Dead-reckoned positions at ?t=<unix time> (default: now)"""
+    return jsonify(dashboard.get_position_estimates(request.args.get('t', type=float)))
+
+@app.route('/api/heatmap')
+def get_heatmap():
+    """Get the activity heatmap as a compact binary frame"""
+    frame = dashboard.get_heatmap_frame(request.args.get('downsample', 1, type=int))
+    return Response(frame, mimetype='application/octet-stream',
+                    headers={'Cache-Control': 'no-store'})
+
+@app.route('/api/topk')
+@app.route('/api/topk/<dimension>')
+def get_top_k(dimension=None):
+    """Top-k headers, opcodes, sizes and header/size pairs"""
+    try:
+        return jsonify(dashboard.get_top_k(dimension, request.args.get('limit', 10, type=int)))
+    except KeyError as e:
+        return jsonify({'error': str(e.args[0])}), 404
 
 @app.route('/api/statistics')
 def get_statistics():
     """Get packet statistics"""
-    return jsonify({
-        'packet_stats': dashboard.packet_stats,
-        'packets_per_second': dashboard.packets_per_second,
-        'players_detected': len(dashboard.players),
-        'active_players': dashboard.get_active_players_count()
-    })
+    return jsonify(dashboard.get_statistics())
 
 # SocketIO events
 @socketio.on('connect')
@@ -372,13 +658,7 @@ def handle_connect():
     print(f"Client connected: {request.sid}")
     
     # Send initial data to newly connected client
-    emit('stats_update', {
-        'total_packets': dashboard.packet_stats['total'],
-        'packets_per_second': dashboard.packets_per_second,
-        'players_detected': len(dashboard.players),
-        'active_players': dashboard.get_active_players_count(),
-        'packet_breakdown': dashboard.packet_stats.copy()
-    })
+    emit('stats_update', dashboard.get_statistics_snapshot())
     
     emit('player_update', {
         'players': dashboard.get_active_players(limit=20),
@@ -429,18 +709,7 @@ def handle_export_data():
 @socketio.on('clear_data')
 def handle_clear_data():
     """Handle clear data request"""
-    with dashboard.update_lock:
-        dashboard.players.clear()
-        dashboard.chat_messages.clear()
-        dashboard.packet_stats = {
-            'total': 0,
-            'movement': 0,
-            'player_info': 0,
-            'chat': 0,
-            'items': 0,
-            'unknown': 0
-        }
-        dashboard.packet_buffer.clear()
+    dashboard.clear_data()
     
     emit('data_cleared', {'success': True})
     
@@ -453,6 +722,26 @@ def handle_clear_data():
         'packet_breakdown': dashboard.packet_stats.copy()
     })
 
+@socketio.on('ping_latency')
+def handle_ping_latency(data):
+    """Echo a client timestamp back (used by the client benchmark)"""
+    return data
+
+def run_server(host='0.0.0.0', port=5000, debug=True, **options):
+    """Run the dashboard on the threaded Flask-SocketIO server (options go to socketio.run)"""
+    dashboard.start_background_tasks()
+    socketio.run(app, debug=debug, host=host, port=port, **options)
+
+def start_server_thread(host='0.0.0.0', port=5000):
+    """Serve the dashboard from a daemon thread (no debugger/reloader, quiet request log)"""
+    thread = threading.Thread(
+        target=run_server, args=(host, port, False),
+        kwargs={'use_reloader': False, 'log_output': False, 'allow_unsafe_werkzeug': True},
+        name='dashboard-server', daemon=True
+    )
+    thread.start()
+    return thread
+
 if __name__ == '__main__':
     print("🚀 Starting Albion Scanner Dashboard Server")
     print("=" * 50)
@@ -461,16 +750,25 @@ if __name__ == '__main__':
     print("-" * 50)
     print("Available endpoints:")
     print("  GET  /              - Dashboard web interface")
+    print("  GET  /static/<file> - Cached dashboard assets (JS, map images)")
     print("  GET  /api/status    - Scanner status")
     print("  GET  /api/players   - Active players list")
     print("  GET  /api/chat      - Recent chat messages")
     print("  GET  /api/statistics - Packet statistics")
+    print("  GET  /api/topk[/<header|opcode|size|header_size>]?limit= - Top-k packet keys")
+    print("  GET  /api/motion[/<player_id>] - Speed/heading/state per player")
+    print("  GET  /api/positions?t= - Interpolated/extrapolated positions")
+    print("  GET  /api/heatmap?downsample= - Binary activity heatmap frame")
+    print("  GET  /api/history/players?name=&guild=&since=&until=&cursor=&limit=")
+    print("  GET  /api/history/chat?sender=&q=&since=&until=&cursor=&limit=")
+    print("  GET  /api/history/movement/<player_id>?since=&until=&cursor=&limit=")
     print("-" * 50)
     print("SocketIO events:")
     print("  start_scanner - Start packet scanning")
     print("  stop_scanner  - Stop packet scanning")
     print("  export_data   - Export current data")
     print("  clear_data    - Clear all data")
+    print("  heatmap_update (server -> client) - Binary heatmap frame every 5s")
     print("=" * 50)
     
     # Install required packages if not available
@@ -482,7 +780,7 @@ if __name__ == '__main__':
         subprocess.check_call(['pip', 'install', 'flask', 'flask-socketio'])
     
     try:
-        socketio.run(app, debug=True, host='0.0.0.0', port=5000)
+        run_server()
     except KeyboardInterrupt:
         print("\n⏹️ Server stopped by user")
     except Exception as e:
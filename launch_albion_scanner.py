@@ -6,6 +6,7 @@ Menggabungkan packet capture, protocol decoding, dan web dashboard
 
 import sys
 import os
+import argparse
 import subprocess
 import time
 import threading
@@ -329,7 +330,13 @@ def analyze_existing_data():
             print(f"  {i}. {file.name}")
     
     try:
-        choice = int(input("\n🔢 Select file to analyze (number): ")) - 1
+        selection = input("\n🔢 Select file to analyze (number, or 'a' to batch analyze all): ").strip().lower()
+        if selection == 'a':
+            # Parallel analysis of every session file, with per-file caching
+            subprocess.run([sys.executable, 'albion_batch_analysis.py', '.'])
+            return
+        
+        choice = int(selection) - 1
         if 0 <= choice < len(albion_files):
             selected_file = albion_files[choice]
             print(f"\n🔍 Analyzing: {selected_file.name}")
@@ -424,6 +431,8 @@ def show_documentation():
     print("  3. Use advanced scanner for detailed protocol analysis")
     print("  4. Launch web dashboard for real-time visualization")
     print("  5. Analyze captured data for insights")
+    print("  Unattended: launch_albion_scanner.py --headless [--config scanner.json]")
+    print("  runs scanner + dashboard in one process and logs JSON metrics")
     
     print("\n📊 FEATURES:")
     print("  ✅ Real-time packet capture")
@@ -448,8 +457,20 @@ def show_documentation():
     print("  - Npcap: https://npcap.com/")
     print("  - PyShark docs: https://github.com/KimiNewt/pyshark")
 
-def main():
-    """Main application loop"""
+def main(argv=None):
+    """Main application loop (or the headless daemon with --headless)"""
+    argv = sys.argv[1:] if argv is None else list(argv)
+    if '--headless' in argv:
+        # Everything else is for the daemon (including --help)
+        from albion_daemon import main as run_daemon
+        return run_daemon([arg for arg in argv if arg != '--headless'])
+    
+    parser = argparse.ArgumentParser(description='Albion Online scanner suite (interactive menu)')
+    parser.add_argument('--headless', action='store_true',
+                        help='run capture, decoding and dashboard in this process without the menu; '
+                             'see --headless --help for its options')
+    parser.parse_args(argv)
+    
     print_banner()
     
     # Quick system check
@@ -497,7 +518,7 @@ def main():
 
 if __name__ == "__main__":
     try:
-        main()
+        sys.exit(main())
     except KeyboardInterrupt:
         print("\n\n👋 Application interrupted by user")
     except Exception as e:
@@ -1,18 +1,37 @@
+import io
 import json
 import struct
 import re
+import os
+import sys
+import contextlib
 from collections import defaultdict, Counter
 import matplotlib.pyplot as plt
 import numpy as np
 from datetime import datetime
+from albion_stream_analysis import run_stream_analysis, entity_id_before
+from albion_columnar_capture import ColumnarCapture
+from albion_result_cache import AnalysisResultCache
+from albion_entropy import batch_entropy, capture_entropy, high_entropy_segments
+
+# Bump when the stream accumulators change so stale cache entries are ignored
+STREAM_RESULT_VERSION = 2
 
 class AlbionPacketAnalyzer:
-    def __init__(self, analysis_file=None):
+    def __init__(self, analysis_file=None, cache_dir='.albion_cache'):
         self.analysis_file = analysis_file
+        
+        # Results and plots are cached per capture content; cache_dir=None disables
+        self.cache = AnalysisResultCache(cache_dir) if cache_dir else None
+        self.source_file = None
+        self.mode = None
         self.packets = []
         self.patterns = defaultdict(list)
         self.position_timeline = []
+        self.position_data = None
         self.movement_vectors = []
+        self.stream_results = None
+        self.capture = None
         
     def load_analysis_data(self, filename):
         """Load analysis data from JSON file"""
@@ -22,6 +41,8 @@ class AlbionPacketAnalyzer:
             
             self.packets = data.get('packets', [])
             self.patterns = data.get('packet_patterns', {})
+            self.source_file = filename
+            self.mode = 'packets'
             
             print(f"✅ Loaded {len(self.packets)} packets from {filename}")
             return True
@@ -30,11 +51,83 @@ class AlbionPacketAnalyzer:
             print(f"❌ Error loading analysis data: {e}")
             return False
     
+    def load_columnar(self, path):
+        """Memory-map a columnar capture (.acap directory) for vectorized analysis"""
+        try:
+            self.capture = ColumnarCapture(path)
+        except Exception as e:
+            print(f"❌ Error loading columnar capture: {e}")
+            return False
+        
+        self.patterns = self.capture.meta.get('capture_info', {}).get('packet_patterns', {})
+        self.source_file = path
+        self.mode = 'columnar'
+        print(f"✅ Mapped {len(self.capture)} packets ({self.capture.position_count} positions) from {path}")
+        return True
+    
+    def analyze_stream(self, filename):
+        """Run all analyses over a capture file in a single streaming pass.
+        
+        Unlike load_analysis_data this never holds the packet list in
+        memory, so it works for hour-long captures (.jsonl or .json). The
+        accumulated results are cached per capture content, so re-running
+        on an unchanged capture skips the pass entirely.
+        """
+        print(f"📂 Streaming analysis of {filename}...")
+        try:
+            if self.cache is not None:
+                hits = self.cache.stats['hits']
+                metadata, packet_count, results = self.cache.get_or_compute(
+                    filename, 'stream', {'version': STREAM_RESULT_VERSION},
+                    lambda: run_stream_analysis(filename)
+                )
+                if self.cache.stats['hits'] > hits:
+                    print("♻️ Reusing cached results for unchanged capture")
+            else:
+                metadata, packet_count, results = run_stream_analysis(filename)
+        except Exception as e:
+            print(f"❌ Error streaming analysis data: {e}")
+            return None
+        
+        self.patterns = metadata.get('packet_patterns', {})
+        self.stream_results = results
+        self.source_file = filename
+        self.mode = 'stream'
+        self.position_timeline = results['positions'].timeline()
+        print(f"✅ Processed {packet_count} packets from {filename}")
+        
+        for accumulator in results.values():
+            accumulator.report()
+        return results
+    
+    def cached(self, analysis, compute, **params):
+        """Run an analysis through the result cache, replaying its report on hits"""
+        if self.cache is None or not self.source_file:
+            return compute()
+        
+        def run():
+            output = io.StringIO()
+            with contextlib.redirect_stdout(output):
+                result = compute()
+            return output.getvalue(), result
+        
+        output, result = self.cache.get_or_compute(
+            self.source_file, analysis, {'mode': self.mode, **params}, run
+        )
+        print(output, end='')
+        return result
+    
     def analyze_packet_patterns(self):
         """Analyze patterns dalam packet headers dan payload"""
+        return self.cached('packet_patterns', self.compute_packet_patterns)
+    
+    def compute_packet_patterns(self):
         print(f"\n🔍 PACKET PATTERN ANALYSIS")
         print("=" * 50)
         
+        if self.capture is not None:
+            return self.analyze_packet_patterns_columnar()
+        
         # Header patterns
         header_patterns = Counter()
         payload_sizes = []
@@ -74,66 +167,104 @@ class AlbionPacketAnalyzer:
         print(f"\n🎯 POSITION ANALYSIS")
         print("=" * 50)
         
-        all_positions = []
-        position_timeline = []
+        if self.capture is not None:
+            return self.analyze_positions_columnar()
+        
+        positions, entities = self.extract_position_arrays()
+        return self.report_positions(positions, entities)
+    
+    def extract_position_arrays(self):
+        """Positions as one (n, 3) float64 array plus the entity id of each row"""
+        coords = []
+        entities = []
         
         for packet in self.packets:
-            positions = packet.get('parsed_data', {}).get('positions', [])
-            timestamp = packet.get('timestamp', '')
+            positions = packet.get('parsed_data', {}).get('positions')
+            if not positions:
+                continue
             
+            payload = None
             for pos in positions:
-                all_positions.append((pos['x'], pos['y'], pos['z']))
-                position_timeline.append({
-                    'timestamp': timestamp,
-                    'x': pos['x'],
-                    'y': pos['y'],
-                    'z': pos['z'],
-                    'direction': packet.get('direction', 'unknown')
-                })
-        
-        if not all_positions:
+                coords += (pos['x'], pos['y'], pos['z'])
+                entity = pos.get('player_id')
+                if entity is None:
+                    # Older captures: recover the id from the raw payload
+                    if payload is None:
+                        payload = bytes.fromhex(packet.get('payload_hex', ''))
+                    entity = entity_id_before(payload, pos.get('offset', 0))
+                entities.append(entity)
+        
+        return (np.array(coords, dtype=np.float64).reshape(-1, 3),
+                np.array(entities, dtype=np.uint32))
+    
+    @staticmethod
+    def movement_statistics(positions, entities, noise_threshold=0.1):
+        """Per-entity movement steps, computed with array operations.
+        
+        Positions are stably sorted by entity so every entity's samples form
+        one run in capture order; steps across run boundaries are dropped.
+        Returns the step distances and per-entity (ids, steps, total, max).
+        """
+        order = np.argsort(entities, kind='stable')
+        sorted_entities = entities[order]
+        steps = np.diff(positions[order], axis=0)
+        distances = np.sqrt(np.einsum('ij,ij->i', steps, steps))
+        
+        moving = (sorted_entities[1:] == sorted_entities[:-1]) & (distances > noise_threshold)
+        distances = distances[moving].astype(np.float64)
+        moved_entities = sorted_entities[1:][moving]
+        if not distances.size:
+            empty = np.empty(0)
+            return distances, (empty.astype(np.uint32), empty.astype(np.int64), empty, empty)
+        
+        # moved_entities is still sorted, so each entity is a contiguous run
+        starts = np.flatnonzero(np.r_[True, moved_entities[1:] != moved_entities[:-1]])
+        ids = moved_entities[starts]
+        counts = np.diff(np.r_[starts, distances.size])
+        totals = np.add.reduceat(distances, starts)
+        maxima = np.maximum.reduceat(distances, starts)
+        return distances, (ids, counts, totals, maxima)
+    
+    def report_positions(self, positions, entities):
+        """Print position ranges and per-entity movement statistics"""
+        if not len(positions):
             print("❌ No positions found in packets")
             return
         
-        # Position statistics
-        x_coords = [pos[0] for pos in all_positions]
-        y_coords = [pos[1] for pos in all_positions]
-        z_coords = [pos[2] for pos in all_positions]
-        
-        print(f"📊 Position statistics ({len(all_positions)} positions):")
-        print(f"   X range: {min(x_coords):.2f} to {max(x_coords):.2f}")
-        print(f"   Y range: {min(y_coords):.2f} to {max(y_coords):.2f}")
-        print(f"   Z range: {min(z_coords):.2f} to {max(z_coords):.2f}")
-        
-        # Movement analysis
-        if len(position_timeline) >= 2:
-            movements = []
-            for i in range(1, len(position_timeline)):
-                prev = position_timeline[i-1]
-                curr = position_timeline[i]
-                
-                distance = ((curr['x'] - prev['x'])**2 + 
-                           (curr['y'] - prev['y'])**2 + 
-                           (curr['z'] - prev['z'])**2)**0.5
-                
-                if distance > 0.1:  # Filter out noise
-                    movements.append(distance)
+        mins = positions.min(axis=0)
+        maxs = positions.max(axis=0)
+        print(f"📊 Position statistics ({len(positions)} positions):")
+        for axis, name in enumerate('XYZ'):
+            print(f"   {name} range: {mins[axis]:.2f} to {maxs[axis]:.2f}")
+        
+        distances, (ids, counts, totals, maxima) = self.movement_statistics(positions, entities)
+        if distances.size:
+            print(f"\n🏃 Movement analysis:")
+            print(f"   Average movement: {distances.mean():.2f} units")
+            print(f"   Max movement: {distances.max():.2f} units")
+            print(f"   Total movements detected: {distances.size}")
             
-            if movements:
-                print(f"\n🏃 Movement analysis:")
-                print(f"   Average movement: {np.mean(movements):.2f} units")
-                print(f"   Max movement: {max(movements):.2f} units")
-                print(f"   Total movements detected: {len(movements)}")
+            print(f"\n👥 Movement by entity ({len(np.unique(entities))} tracked, {len(ids)} moving):")
+            for i in np.argsort(totals)[::-1][:10]:
+                label = 'unknown' if ids[i] == 0 else ids[i]
+                print(f"   {label}: {counts[i]} moves, {totals[i]:.1f} units total, "
+                      f"avg {totals[i] / counts[i]:.2f}, max {maxima[i]:.2f}")
         
         # Save position data for visualization
-        self.position_timeline = position_timeline
-        return position_timeline
+        self.position_data = (positions, entities)
+        return ids, counts, totals, maxima
     
     def analyze_player_names(self):
         """Analyze player names found in packets"""
+        return self.cached('player_names', self.compute_player_names)
+    
+    def compute_player_names(self):
         print(f"\n👤 PLAYER NAME ANALYSIS")
         print("=" * 50)
         
+        if self.capture is not None:
+            return self.analyze_player_names_columnar()
+        
         all_names = []
         name_patterns = defaultdict(int)
         
@@ -168,9 +299,15 @@ class AlbionPacketAnalyzer:
     
     def find_protocol_patterns(self):
         """Try to identify Albion protocol patterns"""
+        return self.cached('protocol_patterns', self.compute_protocol_patterns, min_packets=3)
+    
+    def compute_protocol_patterns(self):
         print(f"\n🔬 PROTOCOL PATTERN ANALYSIS")
         print("=" * 50)
         
+        if self.capture is not None:
+            return self.find_protocol_patterns_columnar()
+        
         # Group packets by header patterns
         header_groups = defaultdict(list)
         
@@ -208,6 +345,163 @@ class AlbionPacketAnalyzer:
             if name_count > 0:
                 print(f"   👤 Contains player names in {name_count}/{len(packets)} packets")
     
+    def analyze_entropy(self, high_threshold=7.0):
+        """Per-header payload entropy, to spot compressed/encrypted opcodes"""
+        return self.cached('entropy', lambda: self.compute_entropy(high_threshold),
+                           high_threshold=high_threshold)
+    
+    def compute_entropy(self, high_threshold):
+        print(f"\n🎲 PAYLOAD ENTROPY ANALYSIS")
+        print("=" * 50)
+        
+        if self.capture is not None:
+            entropies = capture_entropy(self.capture)
+            headers = np.array([self.capture.header_hex(h) for h in self.capture.header])
+            payload_of = self.capture.get_payload
+        else:
+            payloads = [bytes.fromhex(p.get('payload_hex', '')) for p in self.packets]
+            entropies = batch_entropy(payloads)
+            headers = np.array([p.get('analysis', {}).get('header', '') for p in self.packets])
+            payload_of = payloads.__getitem__
+        
+        if not entropies.size:
+            print("❌ No payloads found")
+            return
+        
+        print(f"📊 Entropy over {entropies.size} payloads: "
+              f"mean {entropies.mean():.2f}, median {np.median(entropies):.2f} bits/byte")
+        high = entropies >= high_threshold
+        print(f"🔐 High entropy (>= {high_threshold}): {int(high.sum())} packets ({high.mean() * 100:.1f}%)")
+        
+        # Per-header mean entropy
+        unique_headers, group, counts = np.unique(headers, return_inverse=True, return_counts=True)
+        group = group.ravel()
+        means = np.bincount(group, weights=entropies) / counts
+        print(f"\n📋 Entropy by header (most common first):")
+        for g in np.argsort(counts)[::-1][:10]:
+            print(f"   {unique_headers[g]}: mean {means[g]:.2f} bits/byte over {counts[g]} packets")
+        
+        # Where inside the payload the randomness sits, for the largest high-entropy packet
+        if high.any():
+            candidates = np.flatnonzero(high)
+            row = int(candidates[np.argmax([len(payload_of(i)) for i in candidates[:1000]])])
+            segments = high_entropy_segments(payload_of(row))
+            print(f"\n🔎 Packet {row} ({headers[row]}) high-entropy segments: {segments[:5]}")
+        
+        return {'mean': float(entropies.mean()), 'high_fraction': float(high.mean())}
+    
+    # ------------------------------------------------------------------
+    # Vectorized analyses over a memory-mapped columnar capture
+    # ------------------------------------------------------------------
+    
+    def analyze_packet_patterns_columnar(self):
+        """Header, size and direction statistics from the packet columns"""
+        capture = self.capture
+        if not len(capture):
+            print("❌ No packets found")
+            return
+        
+        headers, header_counts = np.unique(capture.header, return_counts=True)
+        print(f"📋 Most common headers:")
+        for i in np.argsort(header_counts, kind='stable')[::-1][:10]:
+            percentage = (header_counts[i] / len(capture)) * 100
+            print(f"   {capture.header_hex(headers[i])}: {header_counts[i]} packets ({percentage:.1f}%)")
+        
+        lengths = capture.length
+        sizes, size_counts = np.unique(lengths, return_counts=True)
+        print(f"\n📏 Payload size statistics:")
+        print(f"   Min: {lengths.min()} bytes")
+        print(f"   Max: {lengths.max()} bytes")
+        print(f"   Average: {lengths.mean():.1f} bytes")
+        print(f"   Most common: {(int(sizes[size_counts.argmax()]), int(size_counts.max()))}")
+        
+        direction_counts = np.bincount(capture.direction, minlength=len(capture.directions))
+        print(f"\n📡 Traffic direction:")
+        total = int(direction_counts.sum())
+        for direction, count in zip(capture.directions, direction_counts):
+            if count or direction != 'unknown':
+                percentage = (count / total) * 100 if total > 0 else 0
+                print(f"   {direction}: {count} packets ({percentage:.1f}%)")
+    
+    def analyze_positions_columnar(self):
+        """Position and movement statistics straight from the float32 columns"""
+        return self.report_positions(self.capture.positions(), self.capture.position_entities())
+    
+    def analyze_player_names_columnar(self):
+        """Name frequencies from the name blob"""
+        capture = self.capture
+        if not capture.name_count:
+            print("❌ No player names found in packets")
+            return
+        
+        name_counts = Counter(capture.iter_names())
+        print(f"📋 Found {capture.name_count} name instances ({len(name_counts)} unique)")
+        
+        print(f"\n🏆 Most frequent names:")
+        for name, count in name_counts.most_common(10):
+            print(f"   {name}: {count} times")
+        
+        name_lengths = np.fromiter((len(name) for name in name_counts), dtype=np.int64)
+        print(f"\n📏 Name length statistics:")
+        print(f"   Average: {name_lengths.mean():.1f} characters")
+        print(f"   Range: {name_lengths.min()} to {name_lengths.max()} characters")
+        
+        return set(name_counts)
+    
+    def find_protocol_patterns_columnar(self):
+        """Per-header length/direction profile via grouped NumPy reductions"""
+        capture = self.capture
+        n = len(capture)
+        if not n:
+            return
+        
+        headers, group, group_sizes = np.unique(capture.header, return_inverse=True, return_counts=True)
+        group = group.ravel()
+        n_directions = len(capture.directions)
+        
+        has_positions = np.bincount(capture.pos_packet, minlength=n)[:n] > 0
+        has_names = np.bincount(capture.name_packet, minlength=n)[:n] > 0
+        position_counts = np.bincount(group, weights=has_positions, minlength=len(headers)).astype(np.int64)
+        name_counts = np.bincount(group, weights=has_names, minlength=len(headers)).astype(np.int64)
+        direction_counts = np.bincount(
+            group * n_directions + capture.direction, minlength=len(headers) * n_directions
+        ).reshape(len(headers), n_directions)
+        
+        # Lengths sorted by group so each header is one contiguous slice
+        order = np.argsort(group, kind='stable')
+        sorted_lengths = np.asarray(capture.length)[order]
+        bounds = np.concatenate(([0], np.cumsum(group_sizes)))
+        
+        for g, header in enumerate(headers):
+            count = int(group_sizes[g])
+            if count < 3:  # Skip rare headers
+                continue
+            
+            lengths = sorted_lengths[bounds[g]:bounds[g + 1]]
+            values, value_counts = np.unique(lengths, return_counts=True)
+            top_direction = int(direction_counts[g].argmax())
+            
+            print(f"\n📋 Header {capture.header_hex(header)} ({count} packets):")
+            print(f"   Length range: {lengths.min()} - {lengths.max()} bytes")
+            print(f"   Most common length: {(int(values[value_counts.argmax()]), int(value_counts.max()))}")
+            print(f"   Direction: {(capture.directions[top_direction], int(direction_counts[g, top_direction]))}")
+            
+            if position_counts[g] > count * 0.5:
+                print(f"   🎯 Likely position update packet (contains positions in {position_counts[g]}/{count} packets)")
+            if name_counts[g] > 0:
+                print(f"   👤 Contains player names in {name_counts[g]}/{count} packets")
+    
+    def position_coordinates(self):
+        """X and Y coordinate arrays for plotting"""
+        if self.capture is not None:
+            return self.capture.pos_x, self.capture.pos_y
+        if self.position_data is not None:
+            positions = self.position_data[0]
+            return positions[:, 0], positions[:, 1]
+        x_coords = np.array([pos['x'] for pos in self.position_timeline])
+        y_coords = np.array([pos['y'] for pos in self.position_timeline])
+        return x_coords, y_coords
+    
     def create_visualizations(self):
         """Create visualizations untuk analysis results"""
         print(f"\n📊 CREATING VISUALIZATIONS")
@@ -215,7 +509,7 @@ class AlbionPacketAnalyzer:
         
         try:
             # Position heatmap
-            if self.position_timeline:
+            if len(self.position_coordinates()[0]):
                 self.plot_position_heatmap()
                 self.plot_movement_timeline()
             
@@ -227,31 +521,55 @@ class AlbionPacketAnalyzer:
         except Exception as e:
             print(f"❌ Error creating visualizations: {e}")
     
+    def save_plot(self, filename, render, dpi=300):
+        """Write a rendered plot, reusing cached PNG bytes for the same capture"""
+        if self.cache is not None and self.source_file:
+            png = self.cache.get_or_compute(
+                self.source_file, f'plot:{filename}', {'mode': self.mode, 'dpi': dpi},
+                lambda: render(dpi)
+            )
+        else:
+            png = render(dpi)
+        
+        if png:
+            with open(filename, 'wb') as f:
+                f.write(png)
+    
+    @staticmethod
+    def figure_png(dpi):
+        """PNG bytes of the current figure (closes it)"""
+        buffer = io.BytesIO()
+        plt.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight')
+        plt.close()
+        return buffer.getvalue()
+    
     def plot_position_heatmap(self):
         """Create heatmap of player positions"""
-        if not self.position_timeline:
+        self.save_plot('position_heatmap.png', self.render_position_heatmap)
+    
+    def render_position_heatmap(self, dpi):
+        x_coords, y_coords = self.position_coordinates()
+        if not len(x_coords):
             return
         
-        x_coords = [pos['x'] for pos in self.position_timeline]
-        y_coords = [pos['y'] for pos in self.position_timeline]
-        
         plt.figure(figsize=(10, 8))
         plt.hexbin(x_coords, y_coords, gridsize=30, cmap='YlOrRd')
         plt.colorbar(label='Position Frequency')
         plt.xlabel('X Coordinate')
         plt.ylabel('Y Coordinate')
         plt.title('Player Position Heatmap')
-        plt.savefig('position_heatmap.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        return self.figure_png(dpi)
     
     def plot_movement_timeline(self):
         """Plot position changes over time"""
-        if len(self.position_timeline) < 2:
+        self.save_plot('movement_timeline.png', self.render_movement_timeline)
+    
+    def render_movement_timeline(self, dpi):
+        x_coords, y_coords = self.position_coordinates()
+        if len(x_coords) < 2:
             return
         
-        timestamps = range(len(self.position_timeline))
-        x_coords = [pos['x'] for pos in self.position_timeline]
-        y_coords = [pos['y'] for pos in self.position_timeline]
+        timestamps = np.arange(len(x_coords))
         
         plt.figure(figsize=(12, 6))
         plt.subplot(2, 1, 1)
@@ -266,36 +584,55 @@ class AlbionPacketAnalyzer:
         plt.legend()
         
         plt.suptitle('Player Movement Timeline')
-        plt.savefig('movement_timeline.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        return self.figure_png(dpi)
     
     def plot_packet_distribution(self):
         """Plot packet size and type distribution"""
-        payload_sizes = []
-        directions = []
-        
-        for packet in self.packets:
-            payload_sizes.append(packet.get('payload_length', 0))
-            directions.append(packet.get('direction', 'unknown'))
+        self.save_plot('packet_distribution.png', self.render_packet_distribution)
+    
+    def render_packet_distribution(self, dpi):
+        if self.capture is not None:
+            capture = self.capture
+            sizes, size_counts = np.unique(capture.length, return_counts=True)
+            payload_sizes = sizes
+            size_weights = size_counts
+            direction_counts = Counter({
+                direction: int(count)
+                for direction, count in zip(capture.directions, np.bincount(capture.direction, minlength=len(capture.directions)))
+                if count
+            })
+        elif self.stream_results:
+            # Streaming mode only keeps the counters
+            patterns = self.stream_results['packet_patterns']
+            payload_sizes = list(patterns.sizes.keys())
+            size_weights = list(patterns.sizes.values())
+            direction_counts = Counter({d: c for d, c in patterns.directions.items() if c})
+        else:
+            payload_sizes = []
+            directions = []
+            
+            for packet in self.packets:
+                payload_sizes.append(packet.get('payload_length', 0))
+                directions.append(packet.get('direction', 'unknown'))
+            size_weights = None
+            direction_counts = Counter(directions)
         
         plt.figure(figsize=(12, 5))
         
         # Packet size histogram
         plt.subplot(1, 2, 1)
-        plt.hist(payload_sizes, bins=30, alpha=0.7, edgecolor='black')
+        plt.hist(payload_sizes, bins=30, weights=size_weights, alpha=0.7, edgecolor='black')
         plt.xlabel('Payload Size (bytes)')
         plt.ylabel('Frequency')
         plt.title('Packet Size Distribution')
         
         # Direction pie chart
         plt.subplot(1, 2, 2)
-        direction_counts = Counter(directions)
         plt.pie(direction_counts.values(), labels=direction_counts.keys(), autopct='%1.1f%%')
         plt.title('Traffic Direction Distribution')
         
         plt.tight_layout()
-        plt.savefig('packet_distribution.png', dpi=300, bbox_inches='tight')
-        plt.close()
+        return self.figure_png(dpi)
     
     def generate_report(self):
         """Generate comprehensive analysis report"""
@@ -306,7 +643,8 @@ class AlbionPacketAnalyzer:
             f.write("ALBION ONLINE PACKET ANALYSIS REPORT\n")
             f.write("=" * 50 + "\n")
             f.write(f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-            f.write(f"Total packets analyzed: {len(self.packets)}\n\n")
+            total = len(self.capture) if self.capture is not None else len(self.packets)
+            f.write(f"Total packets analyzed: {total}\n\n")
             
             # Add analysis results
             # (Implementation would capture all the print output from analysis functions)
@@ -322,12 +660,34 @@ def main():
     print("This tool analyzes captured packet data.")
     print("First run albion_packet_parser.py to capture data.\n")
     
+    # Analysis of a capture given on the command line: columnar captures
+    # are memory-mapped, JSON/JSON Lines files are streamed
+    if len(sys.argv) > 1:
+        filename = sys.argv[1]
+        if os.path.isdir(filename):
+            if analyzer.load_columnar(filename):
+                analyzer.analyze_packet_patterns()
+                analyzer.analyze_positions()
+                analyzer.analyze_player_names()
+                analyzer.find_protocol_patterns()
+                analyzer.analyze_entropy()
+                analyzer.create_visualizations()
+        else:
+            analyzer.analyze_stream(filename)
+            analyzer.create_visualizations()
+        if analyzer.cache is not None:
+            analyzer.cache.report()
+        return
+    
     # Example usage:
+    # analyzer.analyze_stream("albion_packets_20231201_143022.jsonl")
+    # analyzer.load_columnar("albion_packets_20231201_143022.acap")
     # analyzer.load_analysis_data("albion_analysis_20231201_143022.json")
     # analyzer.analyze_packet_patterns()
     # analyzer.analyze_positions()
     # analyzer.analyze_player_names()
     # analyzer.find_protocol_patterns()
+    # analyzer.analyze_entropy()
     # analyzer.create_visualizations()
     # analyzer.generate_report()
 
@@ -8,17 +8,28 @@ import pyshark
 import time
 import sys
 import os
-from collections import defaultdict, deque
+import argparse
+from collections import deque
+from albion_stream_stats import StreamStatistics
+from albion_pipeline import Pipeline, Stage
+from albion_console import ConsoleRenderer, CONSOLE_MODES
 
 # Set encoding for Windows console
 if sys.platform.startswith('win'):
     os.system('chcp 65001 >nul 2>&1')
 
 class SimpleAlbionMonitor:
-    def __init__(self, interface='5', port=5056):
+    def __init__(self, interface='5', port=5056, queue_size=4096, console='lines',
+                 refresh_rate=2.0, event_log=None):
         self.interface = interface
         self.port = port
         self.running = False
+        self.queue_size = queue_size  # per pipeline stage
+        self.pipeline = None
+        
+        # Packet lines printed one by one or aggregated into a status panel
+        self.console = ConsoleRenderer('ALBION MONITOR', mode=console,
+                                       refresh_rate=refresh_rate, event_log=event_log)
         
         # Statistics
         self.stats = {
@@ -31,7 +42,7 @@ class SimpleAlbionMonitor:
         }
         
         # Traffic analysis
-        self.packet_sizes = defaultdict(int)
+        self.size_stats = StreamStatistics(k=32)  # Fixed-memory size top-k
         self.traffic_timeline = deque(maxlen=100)
         
     def analyze_packet_pattern(self, length, direction):
@@ -66,10 +77,14 @@ class SimpleAlbionMonitor:
         # Format output
         if direction == "incoming":
             endpoint = f"{src_ip}:{src_port} -> Local:{dst_port}"
+            talker = f"{src_ip}:{src_port}"
         else:
             endpoint = f"Local:{src_port} -> {dst_ip}:{dst_port}"
+            talker = f"{dst_ip}:{dst_port}"
         
-        print(f"[{timestamp}] {direction_symbol} #{packet_num:4d} | {endpoint:35} | {length:4d}B | {pattern}")
+        self.console.event(pattern,
+                           f"[{timestamp}] {direction_symbol} #{packet_num:4d} | {endpoint:35} | {length:4d}B | {pattern}",
+                           talker=talker, size=length)
     
     def display_statistics(self):
         """Display current statistics"""
@@ -91,10 +106,9 @@ class SimpleAlbionMonitor:
         
         # Most common packet sizes
         print(f"\nMost common packet sizes:")
-        sorted_sizes = sorted(self.packet_sizes.items(), key=lambda x: x[1], reverse=True)
-        for size, count in sorted_sizes[:10]:
-            percentage = (count / self.stats['total_packets']) * 100
-            print(f"  {size:3d} bytes: {count:3d} packets ({percentage:.1f}%)")
+        for item in self.size_stats.top('size', 10):
+            percentage = item['share'] * 100
+            print(f"  {item['key']:3d} bytes: {item['count']:3d} packets ({percentage:.1f}%)")
         
         print("=" * 70)
     
@@ -112,7 +126,6 @@ class SimpleAlbionMonitor:
         
         self.running = True
         self.stats['start_time'] = time.time()
-        last_stats_display = time.time()
         
         try:
             # Create capture with BPF filter
@@ -124,62 +137,12 @@ class SimpleAlbionMonitor:
             print("SUCCESS: Monitoring started...")
             print()
             
-            for packet in capture.sniff_continuously():
-                if not self.running:
-                    break
-                
-                try:
-                    # Extract basic packet info
-                    src_ip = packet.ip.src
-                    dst_ip = packet.ip.dst
-                    src_port = int(packet.udp.srcport)
-                    dst_port = int(packet.udp.dstport)
-                    length = int(packet.length)
-                    
-                    # Determine direction
-                    direction = "incoming" if src_port == self.port else "outgoing"
-                    
-                    # Update statistics
-                    self.stats['total_packets'] += 1
-                    self.packet_sizes[length] += 1
-                    
-                    if direction == "incoming":
-                        self.stats['incoming'] += 1
-                        self.stats['bytes_in'] += length
-                    else:
-                        self.stats['outgoing'] += 1
-                        self.stats['bytes_out'] += length
-                    
-                    # Store for timeline
-                    self.traffic_timeline.append({
-                        'timestamp': time.time(),
-                        'direction': direction,
-                        'length': length
-                    })
-                    
-                    # Display packet info
-                    self.display_packet_info(
-                        self.stats['total_packets'],
-                        src_ip, src_port, dst_ip, dst_port,
-                        length, direction
-                    )
-                    
-                    # Display statistics every 30 seconds
-                    current_time = time.time()
-                    if current_time - last_stats_display > 30:
-                        self.display_statistics()
-                        last_stats_display = current_time
-                    
-                    # Check duration limit
-                    if duration and (current_time - self.stats['start_time'] > duration):
-                        print(f"\nTIMEOUT: Duration limit reached ({duration}s)")
-                        break
-                
-                except Exception as e:
-                    print(f"ERROR: Error processing packet: {e}")
-                    continue
-            
-            capture.close()
+            # capture (this thread) -> extract -> record (statistics, display)
+            self.pipeline = self.build_pipeline()
+            try:
+                self.pipeline.run(self.captured_packets(capture, duration))
+            finally:
+                capture.close()
             
         except KeyboardInterrupt:
             print(f"\nSTOPPED: Monitoring stopped by user")
@@ -187,11 +150,77 @@ class SimpleAlbionMonitor:
             print(f"ERROR: Monitoring failed: {e}")
         finally:
             self.running = False
+            self.console.close()
             self.display_statistics()
             
             # Save traffic data
             self.save_traffic_data()
     
+    def captured_packets(self, capture, duration):
+        """Capture stage: packets until stopped or the duration limit is reached"""
+        for packet in capture.sniff_continuously():
+            if not self.running:
+                break
+            yield packet
+            
+            # Check duration limit
+            if duration and (time.time() - self.stats['start_time'] > duration):
+                print(f"\nTIMEOUT: Duration limit reached ({duration}s)")
+                break
+    
+    def extract_packet_info(self, packet):
+        """Extract stage: pyshark packet -> (src_ip, src_port, dst_ip, dst_port, length, direction)"""
+        src_ip = packet.ip.src
+        dst_ip = packet.ip.dst
+        src_port = int(packet.udp.srcport)
+        dst_port = int(packet.udp.dstport)
+        length = int(packet.length)
+        
+        # Determine direction
+        direction = "incoming" if src_port == self.port else "outgoing"
+        return src_ip, src_port, dst_ip, dst_port, length, direction
+    
+    def record_packet(self, info):
+        """Record stage: update statistics and display the packet"""
+        src_ip, src_port, dst_ip, dst_port, length, direction = info
+        
+        # Update statistics
+        self.stats['total_packets'] += 1
+        self.size_stats.add(size=length)
+        
+        if direction == "incoming":
+            self.stats['incoming'] += 1
+            self.stats['bytes_in'] += length
+        else:
+            self.stats['outgoing'] += 1
+            self.stats['bytes_out'] += length
+        
+        # Store for timeline
+        self.traffic_timeline.append({
+            'timestamp': time.time(),
+            'direction': direction,
+            'length': length
+        })
+        
+        # Display packet info
+        self.display_packet_info(
+            self.stats['total_packets'],
+            src_ip, src_port, dst_ip, dst_port,
+            length, direction
+        )
+    
+    def build_pipeline(self):
+        """extract -> record stages; the record stage shows statistics every 30
+        seconds (or keeps the status panel fresh in panel mode)"""
+        if self.console.mode == 'panel':
+            periodic = [(self.console.refresh_interval or 0.5, self.console.tick)]
+        else:
+            periodic = [(30, self.display_statistics)]
+        return Pipeline('monitor', [
+            Stage('extract', self.extract_packet_info, queue_size=self.queue_size),
+            Stage('record', self.record_packet, queue_size=self.queue_size, periodic=periodic)
+        ])
+    
     def save_traffic_data(self):
         """Save traffic data to file"""
         timestamp = time.strftime("%Y%m%d_%H%M%S")
@@ -215,10 +244,9 @@ class SimpleAlbionMonitor:
                 
                 # Packet sizes
                 f.write("PACKET SIZES:\n")
-                sorted_sizes = sorted(self.packet_sizes.items(), key=lambda x: x[1], reverse=True)
-                for size, count in sorted_sizes:
-                    percentage = (count / self.stats['total_packets']) * 100
-                    f.write(f"{size:3d} bytes: {count:3d} packets ({percentage:.1f}%)\n")
+                for item in self.size_stats.top('size', 32):
+                    percentage = item['share'] * 100
+                    f.write(f"{item['key']:3d} bytes: {item['count']:3d} packets ({percentage:.1f}%)\n")
             
             print(f"SAVED: Traffic data saved to: {filename}")
             
@@ -227,9 +255,19 @@ class SimpleAlbionMonitor:
 
 def main():
     """Main function"""
+    parser = argparse.ArgumentParser(description='Simple Albion Online traffic monitor')
+    parser.add_argument('--console', choices=CONSOLE_MODES, default='panel',
+                        help='status panel (default) or one line per packet')
+    parser.add_argument('--refresh-rate', type=float, default=2.0, help='panel redraws per second')
+    parser.add_argument('--event-log', help='also write every packet line to this file')
+    args = parser.parse_args()
+    
     monitor = SimpleAlbionMonitor(
         interface='5',  # USB Tethering
-        port=5056       # Albion port
+        port=5056,      # Albion port
+        console=args.console,
+        refresh_rate=args.refresh_rate,
+        event_log=args.event_log
     )
     
     try:
@@ -0,0 +1,62 @@
+import struct
+
+import numpy as np
+import pytest
+
+from albion_columnar_capture import ColumnarCapture, ColumnarCaptureWriter
+
+
+def movement_payload(entity, x, y, z):
+    return b'\x01\x00\x10\x00' + struct.pack('<Ifff', entity, x, y, z)
+
+
+def test_round_trip(tmp_path):
+    path = str(tmp_path / 'session.acap')
+    packets = [
+        (1000.0, 'incoming', movement_payload(4242, 10.5, -3.0, 7.25),
+         [{'offset': 8, 'x': 10.5, 'y': -3.0, 'z': 7.25}], []),
+        ('2025-05-31T18:42:03', 'outgoing', b'\x02\x00\x00\x00Player\x00', [], ['Player']),
+        (1002.0, 'unknown', b'\x07', [], []),
+        (1003.0, 'incoming', movement_payload(77777, 1.0, 2.0, 3.0),
+         [{'offset': 8, 'x': 1.0, 'y': 2.0, 'z': 3.0}], ['Ünïcode']),
+    ]
+    # flush_every=2 makes the rows span several column appends
+    with ColumnarCaptureWriter(path, flush_every=2, capture_info={'interface': 'test'}) as writer:
+        for timestamp, direction, payload, positions, names in packets:
+            writer.append(timestamp, direction, payload, positions, names)
+
+    capture = ColumnarCapture(path)
+    assert len(capture) == 4
+    assert [capture.get_payload(row) for row in range(4)] == [p[2] for p in packets]
+    assert list(capture.length) == [len(p[2]) for p in packets]
+    assert [capture.directions[code] for code in capture.direction] == [p[1] for p in packets]
+    assert capture.timestamp[0] == 1000.0 and not np.isnan(capture.timestamp[1])
+    assert ColumnarCapture.header_hex(capture.header[0]) == '01001000'
+    assert capture.header[2] == 0x07000000  # short payloads are zero padded
+
+    assert list(capture.iter_names()) == ['Player', 'Ünïcode']
+    assert list(capture.name_packet) == [1, 3]
+    np.testing.assert_allclose(capture.positions(), [[10.5, -3.0, 7.25], [1.0, 2.0, 3.0]])
+    assert list(capture.pos_packet) == [0, 3]
+    assert list(capture.position_entities()) == [4242, 77777]
+    assert capture.meta['capture_info'] == {'interface': 'test'}
+
+
+def test_empty_capture(tmp_path):
+    path = str(tmp_path / 'empty.acap')
+    ColumnarCaptureWriter(path).close()
+
+    capture = ColumnarCapture(path)
+    assert len(capture) == 0
+    assert capture.positions().shape == (0, 3)
+    assert list(capture.iter_names()) == []
+
+
+def test_unclosed_capture_is_rejected(tmp_path):
+    path = str(tmp_path / 'partial.acap')
+    writer = ColumnarCaptureWriter(path)
+    writer.append(0.0, 'incoming', b'\x01\x02\x03\x04')
+    writer.flush()
+
+    with pytest.raises(ValueError):
+        ColumnarCapture(path)
@@ -0,0 +1,45 @@
+from albion_decode_memo import DecodeMemo, UNDECODABLE
+from albion_records import RecordPool
+
+
+def record_of(pool, packet_type, **slots):
+    record = pool.acquire()
+    record.type = packet_type
+    for slot, value in slots.items():
+        setattr(record, slot, value)
+    return record
+
+
+def test_hit_replays_snapshot_into_fresh_record():
+    pool, memo = RecordPool(), DecodeMemo()
+    original = record_of(pool, 'movement', player_id=5000, x=1.0, y=2.0, z=3.0)
+    memo.put(b'payload', original)
+    original.release()
+
+    assert memo.get(b'other') is None
+    replayed = pool.restore(memo.get(b'payload'))
+    assert replayed.to_dict()['position'] == {'x': 1.0, 'y': 2.0, 'z': 3.0}
+    assert replayed.player_id == 5000
+    assert memo.get_stats()['hits'] == 1 and memo.get_stats()['misses'] == 1
+
+
+def test_undecodable_and_oversized_payloads():
+    memo = DecodeMemo(max_payload=8)
+    memo.put(b'junk', None)
+    memo.put(b'x' * 9, None)
+
+    assert memo.get(b'junk') is UNDECODABLE
+    assert memo.get(b'x' * 9) is None
+    assert len(memo) == 1
+
+
+def test_least_recently_used_entry_is_evicted():
+    pool, memo = RecordPool(), DecodeMemo(max_entries=2)
+    for payload in (b'a', b'b'):
+        memo.put(payload, record_of(pool, 'unknown', size=1))
+    memo.get(b'a')  # b is now the oldest
+    memo.put(b'c', None)
+
+    assert memo.get(b'b') is None
+    assert memo.get(b'a') is not None and memo.get(b'c') is UNDECODABLE
+    assert memo.stats['evictions'] == 1
@@ -0,0 +1,77 @@
+import time
+
+import pytest
+
+from albion_history_store import AlbionHistoryStore
+from albion_symbols import symbols
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = AlbionHistoryStore(str(tmp_path / 'history.db'))
+    yield store
+    store.close()
+
+
+def test_players_page_through_cursor(store):
+    now = time.time()
+    guild = symbols.intern('Guild')
+    for player_id in range(1000, 1005):
+        store.record_player(player_id, symbols.intern(f'Player{player_id}'), guild, now + player_id)
+    store.flush()
+
+    first = store.query_players(limit=3)
+    second = store.query_players(cursor=first['next_cursor'], limit=3)
+    assert [p['id'] for p in first['items']] == [1004, 1003, 1002]
+    assert [p['id'] for p in second['items']] == [1001, 1000]
+    assert second['next_cursor'] is None
+
+
+def test_chat_and_movement_cursors(store):
+    now = time.time()
+    sender = symbols.intern('Sender')
+    for index in range(3):
+        store.record_chat(sender, f'message {index}', now)
+        store.record_movement(1234, {'x': index, 'y': 0.0, 'z': 0.0}, now + index)
+    store.flush()
+
+    chat = store.query_chat(limit=2)
+    assert [m['message'] for m in store.query_chat(cursor=chat['next_cursor'])['items']] == ['message 0']
+    track = store.query_movement(1234, limit=2)
+    assert len(store.query_movement(1234, cursor=track['next_cursor'])['items']) == 1
+
+
+@pytest.mark.parametrize('values', [[{}], ['a', 'b', 'c'], [1, 2], ['7'], [True], {'id': 1}, 5])
+def test_malformed_cursor_values_raise_value_error(store, values):
+    cursor = store.encode_cursor(values)
+    with pytest.raises(ValueError):
+        store.query_chat(cursor=cursor)
+    with pytest.raises(ValueError):
+        store.query_movement(1234, cursor=cursor)
+
+
+@pytest.mark.parametrize('values', [[{}], [1.5, 'x'], [1.5, 2, 3], [None, 1], [1.5, 2.5]])
+def test_malformed_player_cursor_raises_value_error(store, values):
+    with pytest.raises(ValueError):
+        store.query_players(cursor=store.encode_cursor(values))
+
+
+def test_undecodable_cursor_raises_value_error(store):
+    with pytest.raises(ValueError):
+        store.query_players(cursor='not base64 json!')
+
+
+def test_dashboard_opens_history_only_when_serving(tmp_path, monkeypatch):
+    pytest.importorskip('flask_socketio')
+    monkeypatch.chdir(tmp_path)
+    from dashboard_server import DashboardServer
+
+    dashboard = DashboardServer(start_background=False)
+    assert dashboard.history is None and list(tmp_path.iterdir()) == []
+    assert dashboard.query_history('chat', {})[1] == 503
+
+    dashboard.history_path = str(tmp_path / 'served.db')
+    store = dashboard.open_history()
+    assert dashboard.open_history() is store
+    assert dashboard.query_history('chat', {'cursor': store.encode_cursor([{}])})[1] == 400
+    store.close()
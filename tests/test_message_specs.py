@@ -0,0 +1,69 @@
+import json
+import struct
+
+import pytest
+
+from albion_message_specs import CompiledMessage, MessageTable
+
+
+def table_of(*specs):
+    table = MessageTable()
+    for spec in specs:
+        table.add(CompiledMessage(spec))
+    return table
+
+
+def test_compiled_message_unpacks_fields_at_offsets():
+    message = CompiledMessage({'name': 'pos', 'header': '0100', 'type': 'movement', 'fields': [
+        {'name': 'y', 'offset': 10, 'format': 'f'},
+        {'name': 'entity_id', 'offset': 2, 'format': 'I', 'min': 1000},
+        {'name': 'label', 'offset': 14, 'format': '6s', 'kind': 'string'},
+    ]})
+    payload = b'\x01\x00' + struct.pack('<I', 5000) + b'\xff' * 4 + struct.pack('<f', 2.5) + b'abc\x00\x00\x00'
+
+    assert message.size == 20
+    assert message.decode(payload) == {'entity_id': 5000, 'y': 2.5, 'label': 'abc'}
+    assert message.decode(payload[:12]) is None  # too short
+    assert message.decode(b'\x01\x00' + struct.pack('<I', 5) + payload[6:]) is None  # below min
+
+
+def test_compiled_message_rejects_overlapping_fields():
+    with pytest.raises(ValueError):
+        CompiledMessage({'name': 'bad', 'header': '01', 'fields': [
+            {'name': 'a', 'offset': 0, 'format': 'I'}, {'name': 'b', 'offset': 2, 'format': 'H'}]})
+
+
+def test_lookup_prefers_longer_prefix_then_exact_length():
+    table = table_of(
+        {'name': 'byte', 'header': '05'},
+        {'name': 'short', 'header': '0500'},
+        {'name': 'long', 'header': '050001'},
+        {'name': 'sized', 'header': '0500', 'length': 6},
+    )
+
+    assert table.lookup(b'\x05\x00\x01\x00\x00\x00').name == 'long'
+    assert table.lookup(b'\x05\x00\x02\x00\x00\x00').name == 'sized'
+    assert table.lookup(b'\x05\x00\x02\x00').name == 'short'
+    assert table.lookup(b'\x05\x7f\x00').name == 'byte'  # one-byte prefix fills 256 slots
+    assert table.lookup(b'\x06\x00\x00') is None
+    assert table.lookup(b'\x05') is None
+
+
+def test_add_replaces_same_prefix_and_length():
+    table = table_of({'name': 'old', 'header': '0900'}, {'name': 'new', 'header': '0900'})
+    assert len(table) == 1
+    assert table.lookup(b'\x09\x00\x00').name == 'new'
+
+
+def test_load_spec_file(tmp_path):
+    filename = tmp_path / 'specs.json'
+    filename.write_text(json.dumps({'version': 1, 'byte_order': '>', 'messages': [
+        {'name': 'be', 'header': '0a00', 'fields': [{'name': 'value', 'offset': 2, 'format': 'H'}]}]}))
+    table = MessageTable()
+
+    assert table.load(str(filename)) == 1
+    assert table.lookup(b'\x0a\x00\x01\x02').decode(b'\x0a\x00\x01\x02') == {'value': 0x0102}
+
+    filename.write_text(json.dumps({'version': 99, 'messages': []}))
+    with pytest.raises(ValueError):
+        table.load(str(filename))
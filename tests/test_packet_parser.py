@@ -0,0 +1,57 @@
+import struct
+from datetime import datetime
+
+import pytest
+
+pytest.importorskip('pyshark')
+from albion_packet_parser import AlbionPacketParser
+
+
+def captured(payload, direction='incoming'):
+    """Parse-stage output of one packet (see parse_packet_view)"""
+    return (payload, '10.0.0.1', '10.0.0.2', 5056, 60000, datetime.now(), direction)
+
+
+def count_scans(parser, monkeypatch):
+    calls = []
+    for method in ('try_parse_player_position', 'try_parse_player_name'):
+        original = getattr(parser, method)
+        monkeypatch.setattr(parser, method,
+                            lambda payload, original=original: calls.append(payload) or original(payload))
+    return calls
+
+
+def movement_payload(x):
+    return b'\x03\x00\x00\x00' + struct.pack('<Ifff', 4242, x, 2.0, 3.0) + bytes(4)
+
+
+def test_bounded_mode_without_log_defers_field_scans(monkeypatch):
+    parser = AlbionPacketParser(save_packets=False, bounded=True, ring_packets=4, recent_packets=100)
+    parser.start_time = 0
+    calls = count_scans(parser, monkeypatch)
+    for number in range(1, 7):
+        parser.store_parsed((number, captured(movement_payload(float(number)))))
+
+    assert calls == []
+    positions = parser.summary_fields('positions')
+    # Only the 4 views still in the ring are scanned, and only once
+    assert len(calls) == 4
+    assert {pos['x'] for pos in positions if pos['offset'] == 8} == {3.0, 4.0, 5.0, 6.0}
+    parser.summary_fields('positions')
+    assert len(calls) == 4
+
+
+def test_bounded_mode_logs_fields_once_per_packet(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    parser = AlbionPacketParser(bounded=True)
+    parser.start_time = 0
+    parser.open_packet_log()
+    calls = count_scans(parser, monkeypatch)
+    for number in range(1, 4):
+        parser.store_parsed((number, captured(movement_payload(float(number)))))
+    parser.summary_fields('positions')
+    parser.summary_fields('names')
+    parser.close_packet_log()
+
+    assert len(calls) == 3 * 2  # positions + names per packet, reused by the summary
+    assert parser.packet_log_filename.endswith('.acap')
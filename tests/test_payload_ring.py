@@ -0,0 +1,62 @@
+import pytest
+
+from albion_payload_ring import PayloadRing, RingPacket, MAX_PAYLOAD
+
+
+def payload(fill, size):
+    return bytes([fill]) * size
+
+
+def test_append_and_read_back():
+    ring = PayloadRing()
+    first = ring.append(b'\x01\x02\x03\x04hello', timestamp=1.5, direction='incoming')
+    second = ring.append(b'world', direction='outgoing')
+
+    assert (first, second) == (0, 1)
+    assert ring.get(first) == b'\x01\x02\x03\x04hello'
+    assert bytes(ring.view(second)) == b'world'
+    assert ring.timestamps[first] == 1.5
+    assert list(ring.recent(5)) == [0, 1]
+    assert ring.get_stats()['bytes_used'] == 14
+
+
+def test_wrap_evicts_only_overwritten_packets():
+    ring = PayloadRing(capacity_bytes=MAX_PAYLOAD)
+    seqs = [ring.append(payload(n, 30000)) for n in range(3)]
+
+    # The third payload does not fit at the tail, wraps to 0 and overwrites the first
+    assert ring.wrapped_bytes == MAX_PAYLOAD - 60000
+    assert not ring.contains(seqs[0]) and ring.get(seqs[0]) is None
+    assert ring.get(seqs[1]) == payload(1, 30000)
+    assert ring.get(seqs[2]) == payload(2, 30000)
+    assert len(ring) == 2 and ring.evicted == 1
+
+
+def test_max_packets_bounds_slot_count():
+    ring = PayloadRing(max_packets=4)
+    for n in range(6):
+        ring.append(payload(n, 10))
+
+    assert len(ring) == 4
+    assert ring.oldest_seq == 2 and ring.evicted == 2
+    assert [ring.get(seq)[0] for seq in ring.recent(10)] == [2, 3, 4, 5]
+
+
+def test_rejects_oversized_payload_and_tiny_ring():
+    with pytest.raises(ValueError):
+        PayloadRing().append(bytes(MAX_PAYLOAD + 1))
+    with pytest.raises(ValueError):
+        PayloadRing(capacity_bytes=1024)
+
+
+def test_ring_packet_reports_eviction():
+    ring = PayloadRing(max_packets=1)
+    seq = ring.append(b'\xaa\xbb\xcc\xdd\x00')
+    packet = RingPacket(ring, seq, None, '10.0.0.1', '10.0.0.2', 5056, 5056, 0.0, 'incoming', 5)
+    assert packet.header == 'aabbccdd'
+    assert packet.payload == b'\xaa\xbb\xcc\xdd\x00'
+
+    ring.append(b'next')
+    assert packet.header == ''
+    with pytest.raises(LookupError):
+        packet.payload
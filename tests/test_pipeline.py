@@ -0,0 +1,100 @@
+import threading
+
+import pytest
+
+from albion_pipeline import Pipeline, Stage, tap, BLOCK, DROP_NEWEST, DROP_OLDEST
+
+
+def gated_stage(backpressure, queue_size=2, on_drop=None):
+    """Stage whose handler holds its first item until `gate` is set"""
+    entered, gate, seen = threading.Event(), threading.Event(), []
+
+    def handler(item):
+        entered.set()
+        gate.wait(5)
+        seen.append(item)
+
+    stage = Stage('gated', handler, queue_size=queue_size, backpressure=backpressure, on_drop=on_drop)
+    stage.start(None)
+    stage.put(1)
+    assert entered.wait(5)  # item 1 is in the handler, the queue is empty
+    return stage, gate, seen
+
+
+def test_pipeline_passes_items_through_stages_in_order():
+    results = []
+    pipeline = Pipeline('test', [
+        Stage('double', lambda item: item * 2),
+        Stage('skip_odd_tens', lambda item: None if item % 20 == 10 else item),
+        Stage('collect', tap(results.append))
+    ])
+    pipeline.run(range(1, 101))
+
+    assert results == [n * 2 for n in range(1, 101) if (n * 2) % 20 != 10]
+    metrics = pipeline.get_metrics()
+    assert metrics['source']['captured'] == 100
+    assert [stage['processed'] for stage in metrics['stages']] == [100, 100, len(results)]
+    assert not pipeline.running
+
+
+def test_drop_newest_discards_incoming_item():
+    dropped = []
+    stage, gate, seen = gated_stage(DROP_NEWEST, on_drop=dropped.append)
+    assert stage.put(2) and stage.put(3)
+    assert stage.put(4) is False
+    gate.set()
+    stage.close(5)
+
+    assert seen == [1, 2, 3]
+    assert dropped == [4]
+    assert stage.metrics['dropped'] == 1
+
+
+def test_drop_oldest_makes_room_for_incoming_item():
+    dropped = []
+    stage, gate, seen = gated_stage(DROP_OLDEST, on_drop=dropped.append)
+    for item in (2, 3, 4, 5):
+        assert stage.put(item)
+    gate.set()
+    stage.close(5)
+
+    assert seen == [1, 4, 5]
+    assert dropped == [2, 3]
+
+
+def test_block_waits_for_room_without_dropping():
+    dropped = []
+    stage, gate, seen = gated_stage(BLOCK, queue_size=1, on_drop=dropped.append)
+    assert stage.put(2)
+    blocked = threading.Thread(target=stage.put, args=(3,))
+    blocked.start()
+    blocked.join(0.3)
+    assert blocked.is_alive()  # queue full, producer waits
+
+    gate.set()
+    blocked.join(5)
+    stage.close(5)
+    assert seen == [1, 2, 3]
+    assert dropped == []
+    assert stage.metrics['blocked_seconds'] > 0
+
+
+def test_abort_releases_blocked_producer_and_drops_its_item():
+    dropped = []
+    stage, gate, seen = gated_stage(BLOCK, queue_size=1, on_drop=dropped.append)
+    stage.put(2)
+    accepted = []
+    blocked = threading.Thread(target=lambda: accepted.append(stage.put(3)))
+    blocked.start()
+    stage.abort()
+    blocked.join(5)
+    gate.set()
+    stage.close(5)
+
+    assert accepted == [False]
+    assert 3 in dropped
+
+
+def test_stage_rejects_unknown_policy():
+    with pytest.raises(ValueError):
+        Stage('bad', lambda item: item, backpressure='drop_everything')
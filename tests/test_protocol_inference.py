@@ -0,0 +1,59 @@
+import struct
+
+import numpy as np
+
+from albion_columnar_capture import ColumnarCapture, ColumnarCaptureWriter
+from albion_protocol_inference import infer_specs, export_specs, cluster_packets
+from albion_protocol_decoder import AlbionProtocolDecoder
+
+HEADER = bytes.fromhex('2a000100')  # not claimed by the default spec file
+
+
+def movement_payload(rng):
+    entity = int(rng.integers(1000, 1000000))
+    x, y, z = rng.uniform(1.0, 1000.0, 3) * rng.choice((-1.0, 1.0), 3)
+    return HEADER + struct.pack('<Ifff', entity, x, y, z)
+
+
+def synthetic_corpus(path, count=200):
+    """Movement packets of one shape plus random noise packets"""
+    rng = np.random.default_rng(7)
+    with ColumnarCaptureWriter(path) as writer:
+        for row in range(count):
+            writer.append(float(row), 'incoming', movement_payload(rng))
+            if row % 4 == 0:
+                writer.append(float(row), 'outgoing', rng.bytes(int(rng.integers(8, 64))))
+    return ColumnarCapture(path)
+
+
+def test_cluster_packets_groups_by_header_and_length():
+    headers = np.array([1, 1, 2, 1, 2, 3], dtype=np.uint32)
+    lengths = np.array([20, 20, 20, 20, 20, 9], dtype=np.uint32)
+    clusters = cluster_packets(headers, lengths, min_count=2)
+
+    assert [(header, length, list(rows)) for header, length, rows in clusters] == [
+        (1, 20, [0, 1, 3]), (2, 20, [2, 4])]
+
+
+def test_inferred_specs_load_into_decoder(tmp_path):
+    capture = synthetic_corpus(str(tmp_path / 'corpus.acap'))
+    specs = infer_specs(capture, min_count=50)
+
+    movement = [m for m in specs['messages'] if m['header'] == HEADER.hex()]
+    assert len(movement) == 1
+    message = movement[0]
+    assert message['type'] == 'movement' and message['length'] == 20 and message['count'] == 200
+    assert [(f['name'], f['offset']) for f in message['fields']] == [
+        ('entity_id', 4), ('x', 8), ('y', 12), ('z', 16)]
+
+    filename = export_specs(specs, str(tmp_path / 'specs.json'))
+    decoder = AlbionProtocolDecoder(spec_file=filename)
+    payload = HEADER + struct.pack('<Ifff', 31337, 12.5, -40.0, 3.0)
+    record = decoder.decode_packet(payload, 'incoming')
+
+    assert decoder.dispatch_stats['table'] == 1
+    assert record.type == 'movement' and record.spec == message['name']
+    assert record.player_id == 31337
+    assert record.position == {'x': 12.5, 'y': -40.0, 'z': 3.0}
+    assert record.fields['entity_id'] == 31337
+    record.release()
@@ -0,0 +1,57 @@
+import threading
+import time
+
+from albion_records import RecordPool
+
+
+def test_last_release_returns_record_to_pool():
+    pool = RecordPool()
+    record = pool.acquire()
+    record.type = 'chat'
+    record.retain()
+
+    record.release()
+    assert pool.get_stats()['free'] == 0
+    record.release()
+    assert pool.get_stats()['free'] == 1
+    assert record.type is None
+    assert pool.acquire() is record
+
+
+def test_lazy_fields_decode_once_across_threads():
+    pool = RecordPool()
+    calls = []
+
+    def lazy(record):
+        calls.append(threading.get_ident())
+        time.sleep(0.05)  # readers arrive while the fields are being filled
+        record._sender, record._text = 'Alice', 'hi'
+
+    for _ in range(5):
+        record = pool.acquire()
+        record.type = 'chat'
+        record.lazy = lazy
+        seen = []
+        readers = [threading.Thread(target=lambda: seen.append((record.sender, record.text)))
+                   for _ in range(4)]
+        for reader in readers:
+            reader.start()
+        for reader in readers:
+            reader.join()
+        assert seen == [('Alice', 'hi')] * 4
+        assert record.to_dict()['message'] == 'hi'
+        record.release()
+
+    assert len(calls) == 5
+
+
+def test_snapshot_restores_deferred_fields():
+    pool = RecordPool()
+    record = pool.acquire()
+    record.type, record.payload = 'unknown', b'\x01\x02\x03\x04\x05\x06\x07\x08\x09'
+    record.lazy = lambda r: setattr(r, '_header', r.payload[:8].hex())
+    snapshot = record.snapshot()
+    record.release()
+
+    restored = pool.restore(snapshot)
+    assert restored.header == '0102030405060708'
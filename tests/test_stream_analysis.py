@@ -0,0 +1,42 @@
+import pickle
+import struct
+
+from albion_stream_analysis import PositionAccumulator
+
+
+def position_packet(entity, x, y=0.0, z=0.0):
+    return {'timestamp': '', 'direction': 'incoming',
+            'parsed_data': {'positions': [{'offset': 4, 'player_id': entity, 'x': x, 'y': y, 'z': z}]}}
+
+
+def test_interleaved_entities_produce_no_cross_entity_steps():
+    accumulator = PositionAccumulator(chunk_size=3)  # steps also cross chunk flushes
+    for step in range(6):
+        accumulator.add(position_packet(1, 0.0 + step))       # entity 1 walks 1 unit per packet
+        accumulator.add(position_packet(2, 1000.0 + 2 * step))  # entity 2, far away, 2 units
+    accumulator.flush()
+
+    assert accumulator.movement_count == 10
+    assert accumulator.movement_sum == 5 * 1.0 + 5 * 2.0
+    assert accumulator.movement_max == 2.0
+
+
+def test_entity_recovered_from_payload_for_older_captures():
+    accumulator = PositionAccumulator()
+    for entity, x in ((7, 0.0), (8, 500.0), (7, 3.0)):
+        payload = struct.pack('<Ifff', entity, x, 0.0, 0.0)
+        accumulator.add({'payload_hex': payload.hex(),
+                         'parsed_data': {'positions': [{'offset': 4, 'x': x, 'y': 0.0, 'z': 0.0}]}})
+    accumulator.flush()
+
+    assert (accumulator.movement_count, accumulator.movement_max) == (1, 3.0)
+
+
+def test_pickled_accumulator_keeps_last_positions():
+    accumulator = PositionAccumulator(chunk_size=4)
+    accumulator.add(position_packet(1, 0.0))
+    restored = pickle.loads(pickle.dumps(accumulator))
+    restored.add(position_packet(1, 4.0))
+    restored.flush()
+
+    assert (restored.count, restored.movement_count, restored.movement_sum) == (2, 1, 4.0)
@@ -0,0 +1,62 @@
+import random
+from collections import Counter
+
+from albion_stream_stats import SpaceSaving, CountMinSketch
+
+
+def skewed_stream(seed, count=5000):
+    """Zipf-like keys: a few heavy hitters and a long tail"""
+    rng = random.Random(seed)
+    return [f'h{min(int(rng.paretovariate(1.2)), 500)}' for _ in range(count)]
+
+
+def assert_bounds(summary, truth):
+    for key, count, error in summary.top():
+        assert count - error <= truth[key] <= count
+
+
+def test_space_saving_counts_bracket_true_counts():
+    stream = skewed_stream(1)
+    summary = SpaceSaving(k=20)
+    for key in stream:
+        summary.add(key)
+
+    truth = Counter(stream)
+    assert_bounds(summary, truth)
+    assert [key for key, _, _ in summary.top(3)] == [key for key, _ in truth.most_common(3)]
+
+
+def test_space_saving_merge_keeps_bounds_and_heavy_hitters():
+    left, right = skewed_stream(2), skewed_stream(3)
+    a, b = SpaceSaving(k=20), SpaceSaving(k=20)
+    for key in left:
+        a.add(key)
+    for key in right:
+        b.add(key)
+
+    merged = a.merge(b)
+    truth = Counter(left) + Counter(right)
+    assert merged is a and len(merged.counters) == 20
+    assert_bounds(merged, truth)
+    assert [key for key, _, _ in merged.top(3)] == [key for key, _ in truth.most_common(3)]
+
+
+def test_space_saving_merge_of_unfilled_summaries_is_exact():
+    a, b = SpaceSaving(k=8), SpaceSaving(k=8)
+    a.add('x', 3)
+    a.add('y')
+    b.add('x', 2)
+    b.add('z', 4)
+
+    assert a.merge(b).top() == [('x', 5, 0), ('z', 4, 0), ('y', 1, 0)]
+
+
+def test_count_min_never_underestimates_and_merges():
+    stream = skewed_stream(4)
+    a, b = CountMinSketch(width=256), CountMinSketch(width=256)
+    for index, key in enumerate(stream):
+        (a if index % 2 else b).add(key)
+
+    a.merge(b)
+    for key, count in Counter(stream).items():
+        assert count <= a.estimate(key) <= count + a.error_bound()